@@ -3,7 +3,7 @@
 # Input AWS profile to use.
 echo ""
 echo -e "\033[96mThis script updates the existing alarm(s) Period, number of Datapoints and Evaluation Periods." 
-echo -e "It can also create alarms for existing instance(s).\033[0m"
+echo -e "It can also create alarms for existing instance(s) or reconcile the alarms with the configuration.\033[0m"
 PERIOD=0
 DATAPOINTS=0
 EVALUATION_PERIODS=0
@@ -35,6 +35,7 @@ function take_input {
     echo -e "\033[1mDo you want to?: "
     echo -e "\033[96m1.\033[0m \033[1mUpdate configuration of existing alarms."
     echo -e "\033[96m2.\033[0m \033[1mCreate alarms for existing instances.\033[0m"
+    echo -e "\033[96m3.\033[0m \033[1mReconcile alarms, write only the alarms which differ from the configuration.\033[0m"
     read SELECTION
     if [[ $SELECTION == '1' ]]
     then
@@ -43,6 +44,11 @@ function take_input {
     elif [[ $SELECTION == '2' ]]
     then 
         ACTION="create"
+    elif [[ $SELECTION == '3' ]]
+    then
+        ACTION="reconcile"
+        echo -e "\033[1mEnter 0 to keep the current configuration.\033[0m"
+        input_new_configuration
     else 
         echo -e "\033[1mInvalid selection. \033[96m$SELECTION\033[0m"
         exit 1
@@ -66,6 +72,10 @@ function confirm_and_execute {
     echo -e "\033[1mAWS region: \033[0m\033[96m $REGION \033[0m"
     echo -e "\033[1mAWS account: \033[0m\033[96m$AWS_ACCOUNT_NUMBER\033[0m"
     echo -e "\033[1mDeployment Id: \033[0m\033[96m$DEPLOYMENT_ID\033[0m"
+    if [[ $ACTION == 'reconcile' ]]
+    then
+        plan
+    fi
     echo -e "\033[1mPlease confirm to $ACTION alarms config. \033[0m\033[96m[y/n]: \033[0m"
     read CONFIRM
     if [[ $CONFIRM == 'y' ]] || [[ $CONFIRM == 'Y' ]]
@@ -90,6 +100,18 @@ function maintenance {
     echo $RESULT
 }
 
+# Show how many alarms the reconciliation creates, updates and deletes before anything is applied.
+function plan {
+    PLAN=$(python3 utils/maintenance.py $PROFILE $REGION $DEPLOYMENT_ID $AWS_ACCOUNT_NUMBER plan $PERIOD $DATAPOINTS $EVALUATION_PERIODS)
+    if [[ $PLAN == 1 ]]
+    then
+        echo -e "\033[1mFailed to plan the reconciliation for deployment \033[0m\033[96m$DEPLOYMENT_ID.\033[0m"
+        echo -e "Check logs for details."
+        exit 1
+    fi
+    echo -e "\033[1mPlan: \033[0m\033[96m$PLAN\033[0m"
+}
+
 function input_new_configuration {
     echo -e "\033[1mEnter new Period in seconds: \033[0m "
     read PERIOD
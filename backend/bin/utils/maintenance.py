@@ -4,6 +4,7 @@ import json
 import sys
 from typing import Dict, Any
 from datetime import datetime
+from botocore.config import Config
 
 
 def main(aws_profile: str,
@@ -18,6 +19,8 @@ def main(aws_profile: str,
     This function pushes create or update alarm notifcations to the maintenance SNS topic to update or create alarms for existing burstable instances.
     The SNS topic invokes lambda function which puts events to the EventBridge bus to trigger various create-alarm functions.
     It takes operation type as input with value as 'create' to put alarms for existing instance and 'update' as input to modify config of alarms. 
+    The 'plan' operation invokes the maintenance function directly and prints how many alarms 'reconcile' would create, update and delete.
+    The 'reconcile' operation writes only those alarms.
     '''
     try:
         
@@ -30,31 +33,29 @@ def main(aws_profile: str,
         ssm_client = aws_session.client('ssm', region_name=aws_region)
         # Step 1. Update the alarm configuration SSM parameters with new values.
         # Do not do if the operation type is create.
-        if (operation == 'update'):
+        config_versions: Dict[str, int] = {}
+        if (operation == 'plan'):
+            print(plan(aws_session, aws_region, ssm_client, deployment_id,
+                       period, datapoints, evaluation_periods, OUTPUT))
+            return
+        if (operation in ['update', 'reconcile']):
             # update for only non zero values.
-            if (period !=0 and datapoints !=0  and evaluation_periods !=0):
+            # The values are passed as strings by the calling script.
+            if (int(period) != 0 and int(datapoints) != 0 and int(evaluation_periods) != 0):
                 try:
-                    ssm_client.put_parameter(
-                        Name=f'/rift/{deployment_id}/config/alarms/period',
-                        Description='Period',
-                        Value=period,
-                        Type='String',
-                        Overwrite=True
-                    )
-                    ssm_client.put_parameter(
-                        Name=f'/rift/{deployment_id}/config/alarms/datapoints',
-                        Description='Period',
-                        Value=datapoints,
-                        Type='String',
-                        Overwrite=True
-                    )
-                    ssm_client.put_parameter(
-                        Name=f'/rift/{deployment_id}/config/alarms/evaluation-periods',
-                        Description='Period',
-                        Value=evaluation_periods,
-                        Type='String',
-                        Overwrite=True
-                    )
+                    for name, value in [('period', period),
+                                        ('datapoints', datapoints),
+                                        ('evaluation-periods', evaluation_periods)]:
+                        parameter_name: str = f'/rift/{deployment_id}/config/alarms/{name}'
+                        put_parameter_response = ssm_client.put_parameter(
+                            Name=parameter_name,
+                            Description='Period',
+                            Value=value,
+                            Type='String',
+                            Overwrite=True
+                        )
+                        # The functions refresh their cached configuration when they see a newer version.
+                        config_versions[parameter_name] = put_parameter_response['Version']
                     
                     print(f'New value for Period={period}, Datapoints={datapoints}, Evaluation Periods={evaluation_periods}',file=OUTPUT)
 
@@ -74,7 +75,8 @@ def main(aws_profile: str,
         # Step 3. Publish the notification.
         response = sns_client.publish(
             TopicArn=maintenance_topic_arn,
-            Message=json.dumps({'OPERATION_TYPE': operation}),
+            Message=json.dumps({'OPERATION_TYPE': operation,
+                                'CONFIG_VERSIONS': config_versions}),
             Subject=operation+' alarms',
             MessageStructure='String'
         )
@@ -88,12 +90,48 @@ def main(aws_profile: str,
         print(0)  # Pass 0 for success.
 
 
+def plan(aws_session,
+         aws_region: str,
+         ssm_client,
+         deployment_id: str,
+         period: int,
+         datapoints: int,
+         evaluation_periods: int,
+         OUTPUT) -> str:
+    '''
+    Invoke the maintenance function with a dry run of the reconcile operation.
+    The new values are passed as overrides as they are put in the parameter store only when the plan is applied.
+    '''
+    # The function pages through all the alarms and instances, wait for it.
+    lambda_client = aws_session.client('lambda', region_name=aws_region,
+                                       config=Config(read_timeout=900))
+    maintenance_function: str = ssm_client.get_parameter(
+        Name=f'/rift/{deployment_id}/lambda/maintenance')['Parameter']['Value']
+    config_overrides: Dict[str, str] = {}
+    if (int(period) != 0 and int(datapoints) != 0 and int(evaluation_periods) != 0):
+        config_overrides = {'period': period,
+                            'datapoints': datapoints,
+                            'evaluation-periods': evaluation_periods}
+    response = lambda_client.invoke(
+        FunctionName=maintenance_function,
+        InvocationType='RequestResponse',
+        Payload=json.dumps({'Records': [{'Sns': {'Message': json.dumps({'OPERATION_TYPE': 'plan',
+                                                                       'CONFIG_OVERRIDES': config_overrides})}}]})
+    )
+    result: Dict[str, Any] = json.loads(response['Payload'].read())
+    print(f'Plan of deployment {deployment_id}: {result}', file=OUTPUT)
+    if not result or 'plan' not in result:
+        raise Exception('The maintenance function failed to plan, check its logs.')
+    counts: Dict[str, int] = result['plan']
+    return f'create={counts["create"]} update={counts["update"]} delete={counts["delete"]} unchanged={counts["unchanged"]}'
+
+
 if __name__ == '__main__':
     main(sys.argv[1]  # profile
          , sys.argv[2]  # region
          , sys.argv[3]  # deployment id
          , sys.argv[4]  # account
-         , sys.argv[5]  # operation type [update or create]
+         , sys.argv[5]  # operation type [update, create, plan or reconcile]
          , sys.argv[6]  # alarm period
          , sys.argv[7]  # alarm datapoints
          , sys.argv[8])  # alarm evaluation periods
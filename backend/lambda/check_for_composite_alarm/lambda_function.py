@@ -1,23 +1,21 @@
-
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 import os
 import json
 from typing import List, Dict, Any
 from pprint import pprint
-from botocore import config
-from botocore.config import Config
-custom_boto3_config = Config(
-   retries = {
-      'max_attempts': 10,
-      'mode': 'standard'
-   }
-)
+from rift.instance_cache import instance_cache, event_timestamp
+from rift.events import event_publisher
+from util.events_util import publish_events_at_exit
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
 
-ec2_resource = boto3.resource('ec2',config=custom_boto3_config)
-cloudwatch_client = boto3.client('cloudwatch',config=custom_boto3_config)
-event_bridge = boto3.client('events',config=custom_boto3_config)
+aws_services.record_imports(imports_started_at)
 
 
+@put_api_metrics_at_exit
+@report_cold_start
+@publish_events_at_exit
 def lambda_handler(event, context):
     '''
     This program checks if a composite alarm exists for the instance.
@@ -29,21 +27,21 @@ def lambda_handler(event, context):
         instance_id: str = event['detail']['instance-id']
         out_event['instance-id'] = instance_id
         app: str = ''
-        instance = ec2_resource.Instance(instance_id)
-        try:
-            for tag in instance.tags:
-                if tag['Key'] == 'Name':
-                    app = tag['Value']
-        except Exception as err:
+        instance: Dict[str, Any] = instance_cache.get(instance_id, aws_services['ec2_client'], event_timestamp(event))
+        if instance is None:
+            raise Exception(f'Instance {instance_id} does not exist.')
+        for tag in instance.get('Tags', []):
+            if tag['Key'] == 'Name':
+                app = tag['Value']
+        if app == '':
             print(f'{instance_id} does not have a Name tag')
-            app = ''
-        instance_type: str = instance.instance_type
+        instance_type: str = instance['InstanceType']
         print(
             f'Find composite alarm for instance {instance_id} of app {app}, having instance type as {instance_type}')
 
         alarm_name: str = f'{instance_id}-{instance_type}-Composite-Alarm-CPUCreditBalance-And-CPUUtilization-Thresholds-Breached'
         print(f'Alarm name to look {alarm_name}')
-        existing_alarms = cloudwatch_client.describe_alarms(
+        existing_alarms = aws_services['cloudwatch_client'].describe_alarms(
             AlarmNames=[alarm_name],
             AlarmTypes=['CompositeAlarm']
         )
@@ -61,10 +59,7 @@ def lambda_handler(event, context):
                 'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
             }
             print(complete_out_event)
-            response = event_bridge.put_events(
-                Entries=[complete_out_event]
-            )
-            print(f'{response}')
+            event_publisher.put(complete_out_event, aws_services['eventbridge_client'])
         else:
             print(f'Alarm already exists. Do not create new.')
 
@@ -74,4 +69,5 @@ def lambda_handler(event, context):
         raise err
     else:
         print('Successfully executed')
+        print(f'Instance cache: {instance_cache.stats()}')
         return out_event
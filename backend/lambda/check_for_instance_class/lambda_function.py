@@ -1,21 +1,38 @@
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 import os
 import json
 from typing import List, Dict, Any
 from pprint import pprint
-from botocore.config import Config
+from rift.thresholds import AlarmConfigurationParams
+from rift.config import get_configuration_data
+from rift.events import event_publisher, put_events_in_batches
+from rift.instance_cache import instance_cache, event_timestamp
+from util.onboarding_util import onboard_instance
+from util.batch_util import (StateChangeRecord,
+                             is_batch_event,
+                             parse_state_change_records,
+                             batch_item_failures)
+from util.events_util import publish_events_at_exit
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
 
-custom_boto3_config = Config(
-   retries = {
-      'max_attempts': 10,
-      'mode': 'standard'
-   }
-)
-ec2_resource = boto3.resource('ec2',config=custom_boto3_config)
-event_bridge = boto3.client('events',config=custom_boto3_config)
+aws_services.record_imports(imports_started_at)
 
+# The fused onboarding mode creates the alarms in this function instead of the downstream functions.
+onboarding_mode: str = os.environ.get('ONBOARDING_MODE', 'chain')
+
+
+@put_api_metrics_at_exit
+@report_cold_start
+@publish_events_at_exit
 def lambda_handler(event, context) -> Dict[str, Any]:
-    '''The program checks for the instance class and triggers event to create alarms if the instance is of burstable type.'''
+    '''The program checks for the instance class and triggers event to create alarms if the instance is of burstable type.
+    In the fused onboarding mode it creates the cpu credit, cpu utilization and composite alarms itself
+    and triggers a single completion event.'''
+
+    if is_batch_event(event):
+        return process_batch(event, context)
 
     out_event: Dict[str, Any] = {}
     try:
@@ -24,8 +41,11 @@ def lambda_handler(event, context) -> Dict[str, Any]:
         out_event['instance-id'] = instance_id
         print(
             f'Triggered by {state} state notification of instance {instance_id}')
-        instance = ec2_resource.Instance(instance_id)
-        instance_type: str = instance.instance_type
+        # The instance may have been resized while it was stopped, so a description from before this start is refreshed.
+        instance: Dict[str, Any] = instance_cache.get(instance_id, aws_services['ec2_client'], event_timestamp(event))
+        if instance is None:
+            raise Exception(f'Instance {instance_id} does not exist.')
+        instance_type: str = instance['InstanceType']
         first_character_of_instane_type = instance_type[0]
         if first_character_of_instane_type != 't':
             print(
@@ -33,6 +53,12 @@ def lambda_handler(event, context) -> Dict[str, Any]:
         else:
             out_event['function-name'] = [context.function_name]
             out_event['function-outcome'] = [os.environ.get('FN_OUTCOME')]
+            if onboarding_mode == 'fused':
+                out_event.update(onboard_instance(instance_id,
+                                                  instance_type,
+                                                  instance.get('Tags', []),
+                                                  aws_services))
+                out_event['function-outcome'] = [os.environ.get('ONBOARDED_FN_OUTCOME')]
             complete_out_event:Dict[str,Any] = {
                         'Source': "lambda.amazonaws.com",
                         'DetailType': os.environ.get('NOTIFICATION_FROM_FN'),
@@ -40,10 +66,7 @@ def lambda_handler(event, context) -> Dict[str, Any]:
                         'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
                     }
             print(complete_out_event)
-            response = event_bridge.put_events(
-                Entries=[complete_out_event]
-            )
-            print(f'{response}')
+            event_publisher.put(complete_out_event, aws_services['eventbridge_client'])
 
         print(f'{instance_type}')
         first_two_character_of_type: str = instance_type[:2]
@@ -56,5 +79,66 @@ def lambda_handler(event, context) -> Dict[str, Any]:
         raise err
     else:
         print('Successfully completed')
+        print(f'Instance cache: {instance_cache.stats()}')
         pprint(out_event, indent=4)
         return out_event
+
+
+def process_batch(event, context) -> Dict[str, Any]:
+    '''
+    Process the state change notifications buffered in the queue in one invocation.
+    The instances are resolved with a single DescribeInstances call and the events to create alarms are put in batches of 10.
+    Only the messages of the instances which failed are reported back to be retried.
+    '''
+    failed_message_ids: List[str] = []
+    records: List[StateChangeRecord] = parse_state_change_records(event)
+    print(f'Triggered by {len(records)} state notifications.')
+    instances: Dict[str, Dict[str, Any]] = instance_cache.get_many(
+        [record.instance_id for record in records], aws_services['ec2_client'],
+        {record.instance_id: record.time for record in records})
+
+    config: AlarmConfigurationParams = None
+    if onboarding_mode == 'fused':
+        config = get_configuration_data(aws_services['ssm_client'])
+
+    entries: List[Dict[str, Any]] = []
+    entries_message_ids: List[str] = []
+    for record in records:
+        try:
+            instance: Dict[str, Any] = instances.get(record.instance_id)
+            if instance is None:
+                print(f'Instance {record.instance_id} does not exist.')
+                continue
+            instance_type: str = instance['InstanceType']
+            if instance_type[0] != 't':
+                print(
+                    f'Do not create CPUCreditBalance alarm as instance {record.instance_id} is of type {instance_type}')
+                continue
+            out_event: Dict[str, Any] = {'instance-id': record.instance_id,
+                                         'function-name': [context.function_name],
+                                         'function-outcome': [os.environ.get('FN_OUTCOME')]}
+            if onboarding_mode == 'fused':
+                out_event.update(onboard_instance(record.instance_id,
+                                                  instance_type,
+                                                  instance.get('Tags', []),
+                                                  aws_services,
+                                                  config))
+                out_event['function-outcome'] = [os.environ.get('ONBOARDED_FN_OUTCOME')]
+            entries.append({
+                'Source': "lambda.amazonaws.com",
+                'DetailType': os.environ.get('NOTIFICATION_FROM_FN'),
+                'Detail': json.dumps(out_event),
+                'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
+            })
+            entries_message_ids.append(record.message_id)
+        except Exception as err:
+            print(err)
+            print(f'Failed to process instance {record.instance_id} because of above error.')
+            failed_message_ids.append(record.message_id)
+
+    for index in put_events_in_batches(entries, aws_services['eventbridge_client']):
+        failed_message_ids.append(entries_message_ids[index])
+
+    print(f'Processed {len(records)} notifications, {len(failed_message_ids)} failed.')
+    print(f'Instance cache: {instance_cache.stats()}')
+    return batch_item_failures(failed_message_ids)
@@ -0,0 +1,76 @@
+import time
+imports_started_at: float = time.perf_counter()
+from typing import List, Dict, Any
+from pprint import pprint
+from rift.instance_cache import describe_instances
+from util.reconcile_util import describe_rift_alarms, alarm_instance, delete_alarms
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
+
+aws_services.record_imports(imports_started_at)
+
+# Monthly price of a standard resolution metric alarm and of a composite alarm in USD.
+METRIC_ALARM_MONTHLY_COST = 0.10
+COMPOSITE_ALARM_MONTHLY_COST = 0.50
+# States of the instances which do not need alarms any more.
+GONE_INSTANCE_STATES: List[str] = ['shutting-down', 'terminated']
+
+
+@put_api_metrics_at_exit
+@report_cold_start
+def lambda_handler(event, context):
+    '''
+    This program deletes the orphaned alarms. It is triggered by a schedule.
+    An alarm is orphaned when its instance does not exist any more, is terminated or
+    has a different instance type than the one in the alarm name, which happens when a
+    termination event is missed or the instance is resized.
+    '''
+    try:
+        alarms: Dict[str, Dict[str, Any]] = describe_rift_alarms(
+            aws_services['cloudwatch_client'])
+        instances: Dict[str, Dict[str, Any]] = describe_instances(
+            [alarm_instance(alarm_name)[0] for alarm_name in alarms], aws_services['ec2_client'])
+        orphaned_alarms: List[str] = find_orphaned_alarms(alarms, instances)
+        print(f'Found {len(orphaned_alarms)} orphaned alarms out of {len(alarms)}.')
+        report: Dict[str, Any] = delete_orphaned_alarms(
+            orphaned_alarms, alarms)
+    except Exception as err:
+        print(err)
+        print('Aborted! because of above error.')
+        raise err
+    else:
+        pprint(report)
+        return report
+
+
+def find_orphaned_alarms(alarms: Dict[str, Dict[str, Any]],
+                         instances: Dict[str, Dict[str, Any]]) -> List[str]:
+    orphaned_alarms: List[str] = []
+    for alarm_name in alarms:
+        instance_id, instance_type = alarm_instance(alarm_name)
+        instance: Dict[str, Any] = instances.get(instance_id)
+        if instance is None or instance['State']['Name'] in GONE_INSTANCE_STATES or \
+                instance['InstanceType'] != instance_type:
+            orphaned_alarms.append(alarm_name)
+    return orphaned_alarms
+
+
+def delete_orphaned_alarms(orphaned_alarms: List[str],
+                           alarms: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    '''Delete the composite alarms before the metric alarms they refer to. Returns the reclaimed alarms and the monthly cost saved.'''
+    composite_alarms: List[str] = [name for name in orphaned_alarms
+                                   if 'AlarmRule' in alarms[name]]
+    metric_alarms: List[str] = [name for name in orphaned_alarms
+                                if 'AlarmRule' not in alarms[name]]
+    reclaimed: Dict[str, int] = {}
+    for alarm_type, alarms_names in [('composite-alarms', composite_alarms),
+                                     ('metric-alarms', metric_alarms)]:
+        failed: int = delete_alarms(alarms_names, aws_services['cloudwatch_client'])
+        reclaimed[alarm_type] = len(alarms_names) - failed
+    monthly_cost_saved: float = reclaimed['composite-alarms'] * COMPOSITE_ALARM_MONTHLY_COST + \
+        reclaimed['metric-alarms'] * METRIC_ALARM_MONTHLY_COST
+    return {'scanned-alarms': len(alarms),
+            'orphaned-alarms': len(orphaned_alarms),
+            'reclaimed-composite-alarms': reclaimed['composite-alarms'],
+            'reclaimed-metric-alarms': reclaimed['metric-alarms'],
+            'monthly-cost-saved-usd': round(monthly_cost_saved, 2)}
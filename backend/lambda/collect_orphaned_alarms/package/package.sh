@@ -0,0 +1,6 @@
+#!/bin/bash +xe
+DEPLOYMENT_PATH="../../../../../deployment/terraform/services/"
+SERVICE="collect-orphaned-alarms"
+rm -rf $DEPLOYMENT_PATH/$SERVICE/src
+mkdir -p $DEPLOYMENT_PATH/$SERVICE/src
+cp ../lambda_function.py $DEPLOYMENT_PATH/$SERVICE/src
\ No newline at end of file
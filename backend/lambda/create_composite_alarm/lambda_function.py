@@ -1,19 +1,17 @@
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 import os
 from typing import List, Dict, Any
 from pprint import pprint
-from botocore.config import Config
+from util.alarm_util import composite_alarm_name, put_composite_alarm
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
 
-custom_boto3_config = Config(
-    retries={
-        'max_attempts': 10,
-        'mode': 'standard'
-    }
-)
-
-cloudwatch_client = boto3.client('cloudwatch', config=custom_boto3_config)
+aws_services.record_imports(imports_started_at)
 
 
+@put_api_metrics_at_exit
+@report_cold_start
 def lambda_handler(event, context):
     '''
     This program creates a composite alarm. It needs the names of the child alarms, instance ID, instance type and name of the application
@@ -33,23 +31,13 @@ def lambda_handler(event, context):
         print(
             f'Create composite alarm for {cpu_credit_alarm_name} and {cpu_utilization_alarm_name}')
 
-        desc: str = f'Composite alarm for {cpu_credit_alarm_name} and {cpu_utilization_alarm_name}'
-        alarm_name: str = f'{instance_id}-{instance_type}-Composite-Alarm-CPUCreditBalance-And-CPUUtilization-Thresholds-Breached'
-        alarm_created_response = cloudwatch_client.put_composite_alarm(
-            ActionsEnabled=True,
-            AlarmActions=action,
-            AlarmDescription=desc,
-            AlarmName=alarm_name,
-            AlarmRule=f'ALARM({cpu_credit_alarm_name}) AND ALARM({cpu_utilization_alarm_name})',
-            Tags=[
-                {
-                    'Key': 'App',
-                    'Value': 'AutomatedAndDynamicAlarmForCPUCredits'
-                },
-            ]
-        )
-
-        print(f'{alarm_created_response}')
+        alarm_name: str = composite_alarm_name(instance_id, instance_type)
+        put_composite_alarm(instance_id,
+                            instance_type,
+                            cpu_credit_alarm_name,
+                            cpu_utilization_alarm_name,
+                            action,
+                            aws_services['cloudwatch_client'])
 
         print(
             f'Created composite alarm {alarm_name} for instance {instance_id} of application {app}')
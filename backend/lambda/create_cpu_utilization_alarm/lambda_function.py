@@ -1,60 +1,27 @@
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 import os
 import json
 from typing import List, Dict, Any
-from botocore.config import Config
-from dataclasses import dataclass
-
-custom_boto3_config = Config(
-    retries={
-        'max_attempts': 10,
-        'mode': 'standard'
-    }
-)
-
-ec2_resource = boto3.resource('ec2', config=custom_boto3_config)
-cloudwatch_client = boto3.client('cloudwatch', config=custom_boto3_config)
-event_bridge = boto3.client('events', config=custom_boto3_config)
-ssm_client  = boto3.client('ssm',config=custom_boto3_config)
-
-baseline_cpu_utilization: Dict[str, float] = {
-    't2.nano': 5,
-    't2.micro': 10,
-    't2.small': 20,
-    't2.medium': 20,
-    't2.large': 30,
-    't2.xlarge': 22.5,
-    't2.2xlarge': 17,
-    't3.nano': 5,
-    't3.micro': 10,
-    't3.small': 20,
-    't3.medium': 20,
-    't3.large': 30,
-    't3.xlarge': 40,
-    't3.2xlarge': 40,
-    't3a.nano': 5,
-    't3a.micro': 10,
-    't3a.small': 20,
-    't3a.medium': 20,
-    't3a.large': 30,
-    't3a.xlarge': 40,
-    't3a.2xlarge': 40,
-    't4g.nano': 5,
-    't4g.micro': 10,
-    't4g.small': 20,
-    't4g.medium': 20,
-    't4g.large': 30,
-    't4g.xlarge': 40,
-    't4g.2xlarge': 40
-}
-
-@dataclass
-class AlarmConfigurationParams:
-    threshold: str
-    period: str
-    datapoints: str
-    evaluation_periods: str
-
+from rift.thresholds import (AlarmConfigurationParams,
+                             apply_compute_intensive_workloads_config,
+                             cpu_utilization_threshold)
+from rift.config import configuration_loader
+from rift.instance_cache import instance_cache, event_timestamp
+from util.alarm_util import (cpu_utilization_alarm_name,
+                             get_name_tag,
+                             put_cpu_utilization_alarm_for_below_th)
+from rift.events import event_publisher
+from util.events_util import publish_events_at_exit
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
+
+aws_services.record_imports(imports_started_at)
+
+
+@put_api_metrics_at_exit
+@report_cold_start
+@publish_events_at_exit
 def lambda_handler(event, context):
     '''
     This lambda program creates cpu utilization alarm for instance of T class.
@@ -67,52 +34,35 @@ def lambda_handler(event, context):
 
     out_event: Dict[str, Any] = {}
 
-    compute_intensive_workloads_regix_list: List[str] = []
-    compute_intensive_workloads_regix_env: str = os.environ.get(
-        'COMPUTE_INTENSIVE_WORKLOADS_REGIX_LIST')
-    if compute_intensive_workloads_regix_env is not None:
-        compute_intensive_workloads_regix_list = compute_intensive_workloads_regix_env.split(
-            ',')
     try:
         instance_id: str = event['detail']['instance-id']
         out_event['instance-id'] = instance_id
         cpu_credit_alarm_name: str = event['detail']['cpu-credit-alarm-name']
         out_event['cpu-credit-alarm-name'] = cpu_credit_alarm_name
 
-        instance = ec2_resource.Instance(instance_id)
-        instance_type = instance.instance_type
+        instance: Dict[str, Any] = instance_cache.get(instance_id, aws_services['ec2_client'], event_timestamp(event))
+        if instance is None:
+            raise Exception(f'Instance {instance_id} does not exist.')
+        instance_type: str = instance['InstanceType']
         print(f'Instance type is {instance_type}')
 
         # Get the alarm configration data from ssm parameter store.
-        config:AlarmConfigurationParams = get_configuration_data(instance_type)
+        config_versions: Dict[str, int] = event['detail'].get('config-versions', {})
+        config:AlarmConfigurationParams = get_configuration_data(instance_type, config_versions)
 
         print('Running for below arguments.')
         print(f'period={config.period} datapoints={config.datapoints} evaluation_periods={config.evaluation_periods}')
         print(f'Threshold used is {config.threshold}')
 
         '''Get the tags to name the alarm'''
-        tags: List[Dict[str, str]] = instance.tags
-        name: str = ''
+        name: str = get_name_tag(instance.get('Tags'))
         alarm_name: str = ''
-        try:
-            for tag in tags:
-                if tag['Key'] == 'Name':
-                    name = tag['Value']
-                    break
-        except Exception as err:
-            print(err)
+        if name == '':
             print(f'{instance_id} does not have a Name tag.')
-            name = ''
-        else:
-            '''Check if the application is compute intensive'''
-            for regix in compute_intensive_workloads_regix_list:
-                if regix in name:
-                    config.datapoints = os.environ.get('ADDITIONAL_DATAPOINTS')
-                    config.evaluation_periods = os.environ.get(
-                        'ADDITIONAL_EVALUATION_PERIODS')
+        '''Check if the application is compute intensive'''
+        config = apply_compute_intensive_workloads_config(config, name)
 
-        alarm_name = '{}-{}-CPUUtilization-More-Than-Baseline-Percentage'.format(
-            instance_id, instance_type)
+        alarm_name = cpu_utilization_alarm_name(instance_id, instance_type)
 
         put_cpu_utilization_alarm_for_below_th(alarm_name,
                                                instance_id,
@@ -120,7 +70,8 @@ def lambda_handler(event, context):
                                                float(config.threshold),
                                                int(config.period),
                                                int(config.datapoints),
-                                               int(config.evaluation_periods))
+                                               int(config.evaluation_periods),
+                                               aws_services['cloudwatch_client'])
 
     except Exception as err:
         print(err)
@@ -128,6 +79,7 @@ def lambda_handler(event, context):
         raise err
     else:
         print('Successfully completed')
+        print(f'Instance cache: {instance_cache.stats()}')
         out_event['cpu-utilization-alarm-name'] = alarm_name
         out_event['app'] = name
         out_event['instance-type'] = instance_type
@@ -140,77 +92,21 @@ def lambda_handler(event, context):
             'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
         }
         print(complete_out_event)
-        response = event_bridge.put_events(
-            Entries=[complete_out_event]
-        )
-        print(f'{response}')
+        event_publisher.put(complete_out_event, aws_services['eventbridge_client'])
         return out_event
 
 
-'''This function creates or updates a CPUUtilization alarm.
-If the alarm does not exist a new alarm is created or else existing alarm is updated'''
-
-
-def put_cpu_utilization_alarm_for_below_th(alarm_name: str,
-                                           instance_id: str,
-                                           instance_type: str,
-                                           threshold: float,
-                                           period: int,
-                                           datapoints: int,
-                                           evaluation_periods: int):
-
-    desc: str = 'Raise alarm when CPUUtilization is above baseline utlization of instance type {}: {}'.format(
-        instance_type, threshold)
-
-    try:
-        api_response = cloudwatch_client.put_metric_alarm(
-            AlarmName=alarm_name,
-            AlarmDescription=desc,
-            ActionsEnabled=True,
-            MetricName='CPUUtilization',
-            Namespace='AWS/EC2',
-            Dimensions=[
-                {
-                    'Name': 'InstanceId',
-                    'Value': instance_id
-                }
-            ],
-            Statistic='Maximum',
-            Period=period,
-            Threshold=threshold,
-            ComparisonOperator='GreaterThanOrEqualToThreshold',
-            EvaluationPeriods=evaluation_periods,
-            DatapointsToAlarm=datapoints,
-            # AlarmActions=alarm_action,
-            Tags=[
-                {
-                    'Key': 'App',
-                    'Value': 'AutomatedAndDynamicAlarmForCPUCredits'
-                },
-            ]
-        )
-        print(f'Response:{api_response}')
-    except Exception as err:
-        print(err)
-        print(f'Failed {alarm_name} because of above error')
-    else:
-        if api_response['ResponseMetadata']['HTTPStatusCode'] == 200:
-            print(f'Successfully created/updated alarm {alarm_name}')
-
 # Get alarm bases config values.
-def get_configuration_data(instance_type):
+def get_configuration_data(instance_type, config_versions = None):
     try:
         '''Use per vCPU core utilization as baseline for CPU alarm'''
-        threshold = baseline_cpu_utilization[instance_type]
-
-        get_period:Dict[str,Any] = ssm_client.get_parameter(Name=os.environ.get('PERIOD'))
-        period = get_period['Parameter']['Value']
-
-        get_datapoints:Dict[str,Any] = ssm_client.get_parameter(Name=os.environ.get('DATAPOINTS'))
-        datapoints = get_datapoints['Parameter']['Value']
+        threshold = cpu_utilization_threshold(instance_type)
 
-        get_evaluation_periods:Dict[str,Any] = ssm_client.get_parameter(Name=os.environ.get('EVALUATION_PERIODS'))
-        evaluation_periods = get_evaluation_periods['Parameter']['Value']
+        names:List[str] = [os.environ.get('PERIOD'),
+                           os.environ.get('DATAPOINTS'),
+                           os.environ.get('EVALUATION_PERIODS')]
+        parameters:Dict[str,str] = configuration_loader.get_parameters(names, aws_services['ssm_client'], config_versions)
+        period, datapoints, evaluation_periods = [parameters[name] for name in names]
     except Exception as err:
         print(err)
         raise err
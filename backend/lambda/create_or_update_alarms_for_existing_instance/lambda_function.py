@@ -1,79 +1,251 @@
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 import os
 import json
 from pprint import pprint
 from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from botocore.exceptions import ClientError
-from botocore.config import Config
-
-custom_boto3_config = Config(
-    retries={
-        'max_attempts': 10,
-        'mode': 'standard'
-    }
-)
-aws_services: Dict[str, Any] = {}
-aws_services['ec2_resource'] = boto3.resource(
-    'ec2', config=custom_boto3_config)
-aws_services['eventbridge_client'] = boto3.client(
-    'events', config=custom_boto3_config)
+from rift.thresholds import AlarmConfigurationParams
+from rift.config import get_configuration_data
+from rift.events import put_events_with_retry, PUT_EVENTS_ENTRIES_LIMIT
+from util.batch_util import chunks
+from util.alarm_util import (composite_alarm_name,
+                             get_name_tag,
+                             build_instance_alarms)
+from util.alarm_writer_util import AlarmWriter
+from util.reconcile_util import (ReconcilePlan,
+                                 describe_rift_alarms,
+                                 describe_burstable_instances,
+                                 plan_reconcile,
+                                 apply_plan)
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
+
+aws_services.record_imports(imports_started_at)
 
 event_detail_type: Dict[str, str] = {'update': os.environ.get('UPDATE_ALARMS_CONFIG_NOTIFICATION'),
                                      'create': os.environ.get('CREATE_ALARMS_FOR_EXISTING_INSTANCES_NOTIFICATION')}
 event_detail: Dict[str, str] = {'update': os.environ.get('UPDATE_ALARMS_OPERATION_TYPE'),
                                 'create': os.environ.get('CREATE_ALARMS_OPERATION_TYPE')}
 
+# Operations which compare the desired alarms with the existing ones instead of publishing events.
+RECONCILE_OPERATIONS = ['plan', 'reconcile']
+
+# Number of PutEvents calls in flight.
+publish_workers: int = int(os.environ.get('PUBLISH_WORKERS', 8))
+# events publishes an event per instance for the create alarm functions, direct writes the alarms from this function.
+maintenance_mode: str = os.environ.get('MAINTENANCE_MODE', 'events')
+# Number of threads writing alarms and the CloudWatch TPS they share.
+alarm_writer_workers: int = int(os.environ.get('ALARM_WRITER_WORKERS', 8))
+alarm_writes_per_second: float = float(
+    os.environ.get('ALARM_WRITES_PER_SECOND', 10))
+
 
+@put_api_metrics_at_exit
+@report_cold_start
 def lambda_handler(event, context):
-    '''The function puts events to create alarms or update configuration of existing instances.'''
-
-    try:
-        message: str = event['Records'][0]['Sns']['Message']
-        # Need to do this as Sns Message is a str not Dict.
-        operation_detials: Dict[str:Any] = json.loads(message)
-        operation_type: str = operation_detials['OPERATION_TYPE']
-        '''Find all instances in an account'''
-        instances = aws_services['ec2_resource'].instances
-        ec2_instances: List[Any] = instances.all()
-        '''Filter all T class instances'''
-        t_class_instances = ec2_instances.filter(
-            Filters=[{
-                'Name': 'instance-type',
-                'Values': ['t2.*', 't3.*', 't3a.*']
-            }, 
-            {
-                'Name': 'instance-state-name', 
-                'Values': ['running']
-            }]
-        )
-        out_event: Dict[str, Any] = {}
-        '''Publish event for the burstable class instances only.'''
-        count=0
-        for instance in t_class_instances.all():
-            count=+1
-            instance_id: str = instance.id
-            instance_type: str = instance.instance_type
-            out_event['instance-id'] = instance_id
-            out_event['instance-type'] = instance_type
-            out_event['operation-type'] = event_detail[operation_type]
-            out_event['function-name'] = [context.function_name]
-
-            complete_out_event: Dict[str, Any] = {
-                'Source': "lambda.amazonaws.com",
-                'DetailType': event_detail_type[operation_type],
-                'Detail': json.dumps(out_event),
-                'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
-            }
-            print(f'Published event to {operation_type} alarms.')
-            print(complete_out_event)
-            response = aws_services['eventbridge_client'].put_events(
-                Entries=[complete_out_event]
-            )
-            print(response)
-
-    except (Exception, ClientError) as err:
-        print(err)
-        print('Aborted! because of above error..')
-    else:
-        print(f'Total number of events published is {count}')
-        print('Successfully completed.')
+    '''
+    The function puts events to create alarms or update configuration of existing instances.
+    The plan operation returns the alarms which would be created, updated or deleted to match
+    the configuration and the reconcile operation writes only those alarms.
+    All the operations of the invocation are run, an operation sent more than once in the batch is run once.
+    Returns the outcome of each record.
+    '''
+    results: Dict[str, Any] = {}
+    outcomes: List[Dict[str, Any]] = []
+    for record in event['Records']:
+        outcome: Dict[str, Any] = {'message-id': record['Sns'].get('MessageId')}
+        outcomes.append(outcome)
+        try:
+            message: str = record['Sns']['Message']
+            # Need to do this as Sns Message is a str not Dict.
+            operation_detials: Dict[str:Any] = json.loads(message)
+            outcome['operation-type'] = operation_detials['OPERATION_TYPE']
+            # The same operation with the same configuration versions is not run twice.
+            operation_key: str = json.dumps(operation_detials, sort_keys=True)
+            if operation_key in results:
+                print(f'Operation {outcome["operation-type"]} of message {outcome["message-id"]} is already run.')
+                outcome['outcome'] = 'duplicate'
+                outcome['result'] = results[operation_key]
+                continue
+            results[operation_key] = run_operation(operation_detials, context)
+            outcome['outcome'] = 'completed'
+            outcome['result'] = results[operation_key]
+
+        except (Exception, ClientError) as err:
+            print(err)
+            print('Aborted! because of above error..')
+            outcome['outcome'] = 'failed'
+            outcome['error'] = str(err)
+    pprint(outcomes)
+    # The maintenance script invokes the plan with one record and reads its result.
+    if len(outcomes) == 1 and 'result' in outcomes[0]:
+        return outcomes[0]['result']
+    return {'records': outcomes}
+
+
+def run_operation(operation_detials: Dict[str, Any], context) -> Dict[str, Any]:
+    operation_type: str = operation_detials['OPERATION_TYPE']
+    # Versions of the configuration parameters written by the maintenance script.
+    config_versions: Dict[str, int] = operation_detials.get('CONFIG_VERSIONS', {})
+    if operation_type in RECONCILE_OPERATIONS:
+        return reconcile_alarms(operation_type == 'plan',
+                                config_versions,
+                                operation_detials.get('CONFIG_OVERRIDES', {}),
+                                context)
+    if maintenance_mode == 'direct':
+        return write_alarms_for_burstable_instances(operation_type,
+                                                    config_versions,
+                                                    context)
+    summary: Dict[str, int] = publish_events_for_burstable_instances(operation_type,
+                                                                     config_versions,
+                                                                     context)
+    print(f'Total number of events published is {summary["published"]}')
+    pprint(summary)
+    print('Successfully completed.' if summary['failed'] == 0 else
+          f'Completed with {summary["failed"]} events which failed to publish.')
+    return summary
+
+
+def burstable_instances_pages():
+    '''Stream the running T class instances page by page.'''
+    paginator = aws_services['ec2_client'].get_paginator('describe_instances')
+    for page in paginator.paginate(Filters=[{
+            'Name': 'instance-type',
+            'Values': ['t2.*', 't3.*', 't3a.*', 't4g.*']
+        },
+        {
+            'Name': 'instance-state-name',
+            'Values': ['running']
+    }], PaginationConfig={'PageSize': 1000}):
+        yield [instance for reservation in page['Reservations'] for instance in reservation['Instances']]
+
+
+def publish_events_for_burstable_instances(operation_type: str,
+                                           config_versions: Dict[str, int],
+                                           context) -> Dict[str, int]:
+    '''
+    Publish event for the burstable class instances only.
+    The events are packed 10 per PutEvents call and sent from a bounded thread pool.
+    Failed entries are redriven with backoff and the summary counts what was really published.
+    '''
+    summary: Dict[str, int] = {'instances': 0,
+                               'published': 0,
+                               'failed': 0,
+                               'put-events-batches': 0}
+    in_flight = set()
+
+    def collect(futures):
+        for future in futures:
+            published, failed_entries = future.result()
+            summary['published'] += published
+            summary['failed'] += len(failed_entries)
+            for entry in failed_entries:
+                print(f'Failed to publish event {entry["Detail"]}')
+
+    with ThreadPoolExecutor(max_workers=publish_workers) as executor:
+        for instances in burstable_instances_pages():
+            entries: List[Dict[str, Any]] = []
+            for instance in instances:
+                out_event: Dict[str, Any] = {}
+                out_event['instance-id'] = instance['InstanceId']
+                out_event['instance-type'] = instance['InstanceType']
+                out_event['operation-type'] = event_detail[operation_type]
+                out_event['config-versions'] = config_versions
+                out_event['function-name'] = [context.function_name]
+                entries.append({
+                    'Source': "lambda.amazonaws.com",
+                    'DetailType': event_detail_type[operation_type],
+                    'Detail': json.dumps(out_event),
+                    'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
+                })
+            summary['instances'] += len(instances)
+            print(f'Publish events to {operation_type} alarms of {len(instances)} instances.')
+            for entries_chunk in chunks(entries, PUT_EVENTS_ENTRIES_LIMIT):
+                # Keep the number of pending batches bounded while the pages are streamed.
+                if len(in_flight) >= publish_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(executor.submit(put_events_with_retry,
+                                              entries_chunk,
+                                              aws_services['eventbridge_client']))
+                summary['put-events-batches'] += 1
+        collect(wait(in_flight).done)
+    return summary
+
+
+def reconcile_alarms(dry_run: bool,
+                     config_versions: Dict[str, int],
+                     config_overrides: Dict[str, str],
+                     context) -> Dict[str, Any]:
+    '''
+    Page through the riFT alarms and the T class instances once and write only the alarms whose spec differs.
+    The plan counts are printed before anything is applied. A dry run returns the plan only.
+    The config overrides let the maintenance script plan with new values before they are put in the parameter store.
+    '''
+    config: AlarmConfigurationParams = get_configuration_data(
+        aws_services['ssm_client'], config_versions)
+    config.period = config_overrides.get('period', config.period)
+    config.datapoints = config_overrides.get('datapoints', config.datapoints)
+    config.evaluation_periods = config_overrides.get(
+        'evaluation-periods', config.evaluation_periods)
+    existing_alarms: Dict[str, Dict[str, Any]] = describe_rift_alarms(
+        aws_services['cloudwatch_client'])
+    instances: List[Dict[str, Any]] = describe_burstable_instances(
+        aws_services['ec2_client'])
+    plan: ReconcilePlan = plan_reconcile(instances,
+                                         existing_alarms,
+                                         config,
+                                         [os.environ.get('ACTION')])
+    result: Dict[str, Any] = {'plan': plan.counts()}
+    print(f'Plan for {len(instances)} instances and {len(existing_alarms)} existing alarms: {result["plan"]}')
+    print(f'Alarms to delete: {plan.delete}')
+    if not dry_run:
+        result['applied'] = apply_plan(plan,
+                                       existing_alarms,
+                                       aws_services['cloudwatch_client'],
+                                       new_alarm_writer(),
+                                       time_left_in_seconds(context))
+        print(f'Applied: {result["applied"]}')
+    return result
+
+
+def new_alarm_writer() -> AlarmWriter:
+    return AlarmWriter(aws_services['cloudwatch_client'],
+                       alarm_writer_workers,
+                       alarm_writes_per_second)
+
+
+def time_left_in_seconds(context):
+    return lambda: context.get_remaining_time_in_millis() / 1000
+
+
+def write_alarms_for_burstable_instances(operation_type: str,
+                                         config_versions: Dict[str, int],
+                                         context) -> Dict[str, Any]:
+    '''
+    Create or update the alarms of the running burstable instances from this function, without the
+    create alarm functions. The thresholds are computed here with the credit and baseline tables and the
+    alarms are written from a bounded pool of threads. The create operation skips the instances which already
+    have a composite alarm, as the check-for-composite-alarm function does.
+    '''
+    config: AlarmConfigurationParams = get_configuration_data(
+        aws_services['ssm_client'], config_versions)
+    existing_alarms: Dict[str, Dict[str, Any]] = describe_rift_alarms(
+        aws_services['cloudwatch_client']) if operation_type == 'create' else {}
+    action: List[str] = [os.environ.get('ACTION')]
+
+    def instances_alarms():
+        for instances in burstable_instances_pages():
+            for instance in instances:
+                if composite_alarm_name(instance['InstanceId'], instance['InstanceType']) in existing_alarms:
+                    continue
+                yield build_instance_alarms(instance['InstanceId'],
+                                            instance['InstanceType'],
+                                            get_name_tag(instance.get('Tags')),
+                                            config,
+                                            action)
+
+    print(f'Write alarms to {operation_type} alarms of the running instances.')
+    return new_alarm_writer().write(instances_alarms(), time_left_in_seconds(context))
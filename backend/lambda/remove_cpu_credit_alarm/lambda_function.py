@@ -1,53 +1,53 @@
-
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from pprint import pprint
-from botocore.config import Config
+from util.batch_util import (StateChangeRecord,
+                             is_batch_event,
+                             parse_state_change_records,
+                             chunks,
+                             batch_item_failures)
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
 
-custom_boto3_config = Config(
-    retries={
-        'max_attempts': 10,
-        'mode': 'standard'
-    }
-)
+aws_services.record_imports(imports_started_at)
 
-cloudwatch_client = boto3.client('cloudwatch', config=custom_boto3_config)
+# DeleteAlarms accepts at most 100 alarm names in one call.
+DELETE_ALARMS_LIMIT = 100
 
 
+@put_api_metrics_at_exit
+@report_cold_start
 def lambda_handler(event, context):
     '''
-    This program deletes the alarms for a terminated instance.
+    This program deletes the alarms for a terminated instance, or for the list of instances in detail['instance-ids'].
     It deletes those alarms which have instance Id as prefix in the alarm name.
     It is triggered by the EventBridge, based on instance state change
     notification events.
+    In the batched intake mode it is triggered by the queue which buffers the notification events.
     '''
+    if is_batch_event(event):
+        return process_batch(event, context)
 
     try:
-        instance_id: str = event['detail']['instance-id']
+        # A scale-in burst can be passed as a list of terminated instances.
+        instance_ids: List[str] = event['detail'].get(
+            'instance-ids') or [event['detail']['instance-id']]
         state: str = event['detail']['state']
 
         print(
-            f'Triggered by {state} state notification of instance {instance_id}')
-
-        '''Check for alarms using the instance ID as prefix'''
-        available_alarms = cloudwatch_client.describe_alarms(
-            AlarmNamePrefix=f'{instance_id}',
-            AlarmTypes=['CompositeAlarm', 'MetricAlarm']
-        )
+            f'Triggered by {state} state notification of instances {instance_ids}')
 
         composite_alarms_names: List[str] = []
-        for alarm in available_alarms['CompositeAlarms']:
-            composite_alarms_names.append(alarm['AlarmName'])
-
         metric_alarms_names: List[str] = []
-        for alarm in available_alarms['MetricAlarms']:
-            metric_alarms_names.append(alarm['AlarmName'])
+        for instance_composite_alarms_names, instance_metric_alarms_names in find_alarms(instance_ids).values():
+            composite_alarms_names.extend(instance_composite_alarms_names)
+            metric_alarms_names.extend(instance_metric_alarms_names)
 
         '''Delete the composite alarms first.'''
         if len(composite_alarms_names) != 0:
-            cloudwatch_client.delete_alarms(
-                AlarmNames=composite_alarms_names)
+            delete_alarms(composite_alarms_names)
             print(
                 f'Successfully deleted these composite alarms {composite_alarms_names}')
         else:
@@ -57,8 +57,7 @@ def lambda_handler(event, context):
 
         '''Delete the metric alarms'''
         if len(metric_alarms_names) != 0:
-            cloudwatch_client.delete_alarms(
-                AlarmNames=metric_alarms_names)
+            delete_alarms(metric_alarms_names)
             print(
                 f'Successfully deleted these metrics alarms {metric_alarms_names}')
         else:
@@ -74,3 +73,78 @@ def lambda_handler(event, context):
         print('Successfully executed')
         event['status_code'] = 200
         return event
+
+
+def find_alarms(instance_ids: List[str]) -> Dict[str, Tuple[List[str], List[str]]]:
+    '''
+    Check for alarms using each instance ID as prefix.
+    The instance IDs are random, so the prefix they share is about 'i-0' and a single call for all of them would page
+    through nearly every alarm of the account. One prefixed call per instance reads only the alarms of the instance.
+    All the pages are followed as the instance has alarms of every instance type it had.
+    The prefix ends with a hyphen so the alarms of a longer instance ID starting with the same characters are not matched.
+    Returns the composite and metric alarm names of each instance.
+    '''
+    alarms: Dict[str, Tuple[List[str], List[str]]] = {}
+    paginator = aws_services['cloudwatch_client'].get_paginator('describe_alarms')
+    for instance_id in dict.fromkeys(instance_ids):
+        composite_alarms_names: List[str] = []
+        metric_alarms_names: List[str] = []
+        for page in paginator.paginate(AlarmNamePrefix=f'{instance_id}-',
+                                       AlarmTypes=['CompositeAlarm', 'MetricAlarm']):
+            for alarm in page.get('CompositeAlarms', []):
+                composite_alarms_names.append(alarm['AlarmName'])
+            for alarm in page.get('MetricAlarms', []):
+                metric_alarms_names.append(alarm['AlarmName'])
+        alarms[instance_id] = (composite_alarms_names, metric_alarms_names)
+
+    return alarms
+
+
+def delete_alarms(alarms_names: List[str]):
+    '''DeleteAlarms fails the whole call for more than 100 names, so the names are deleted in chunks.'''
+    for alarms_names_chunk in chunks(alarms_names, DELETE_ALARMS_LIMIT):
+        aws_services['cloudwatch_client'].delete_alarms(AlarmNames=alarms_names_chunk)
+
+
+def process_batch(event, context) -> Dict[str, Any]:
+    '''
+    Delete the alarms of all the terminated instances buffered in the queue.
+    The alarms are deleted with one DeleteAlarms call per 100 alarms, composite alarms before metric alarms.
+    Only the messages of the instances whose alarms failed to delete are reported back to be retried.
+    '''
+    failed_message_ids: List[str] = []
+    records: List[StateChangeRecord] = parse_state_change_records(event)
+    print(f'Triggered by {len(records)} state notifications.')
+
+    composite_alarms: Dict[str, str] = {}
+    metric_alarms: Dict[str, str] = {}
+    for record in records:
+        try:
+            composite_alarms_names, metric_alarms_names = find_alarms(
+                [record.instance_id])[record.instance_id]
+        except Exception as err:
+            print(err)
+            print(f'Failed to find alarms of instance {record.instance_id} because of above error.')
+            failed_message_ids.append(record.message_id)
+        else:
+            composite_alarms.update(
+                {name: record.message_id for name in composite_alarms_names})
+            metric_alarms.update(
+                {name: record.message_id for name in metric_alarms_names})
+
+    for alarms in [composite_alarms, metric_alarms]:
+        # Metric alarms can not be deleted while a composite alarm still refers to them.
+        alarms_to_delete: List[str] = [name for name, message_id in alarms.items()
+                                       if message_id not in failed_message_ids]
+        for alarms_names_chunk in chunks(alarms_to_delete, DELETE_ALARMS_LIMIT):
+            try:
+                aws_services['cloudwatch_client'].delete_alarms(AlarmNames=alarms_names_chunk)
+                print(f'Successfully deleted these alarms {alarms_names_chunk}')
+            except Exception as err:
+                print(err)
+                print(f'Failed to delete {alarms_names_chunk} because of above error.')
+                failed_message_ids.extend(
+                    [alarms[name] for name in alarms_names_chunk])
+
+    print(f'Processed {len(records)} notifications, {len(failed_message_ids)} failed.')
+    return batch_item_failures(failed_message_ids)
@@ -0,0 +1,11 @@
+'''
+The core of riFT shared by the functions through the rift lambda layer.
+The submodules are not imported here, so a function only imports the ones it uses.
+
+credits         credit and baseline utilization tables of the T class instance types.
+thresholds      alarm configuration and threshold math.
+config          configuration loader of the parameter store.
+instance_cache  cache of the DescribeInstances data of the instances.
+platforms       cache of the platform of the AMIs.
+events          EventBridge publisher.
+'''
@@ -0,0 +1,90 @@
+import os
+import time
+from typing import List, Dict, Any
+
+from .thresholds import AlarmConfigurationParams
+
+# GetParameters accepts at most 10 names in one call.
+GET_PARAMETERS_LIMIT = 10
+
+
+class ConfigurationLoader:
+    '''
+    Loads the /rift/<deployment-id>/config/... parameters with one GetParameters call and caches them
+    for the lifetime of the warm container.
+    The cache is refreshed after the TTL or earlier when an event carries a newer version of a parameter,
+    which is the case once the maintenance script has updated the alarms configuration.
+    '''
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.parameters: Dict[str, Dict[str, Any]] = {}
+        self.loaded_at: float = 0.0
+        self.counters: Dict[str, int] = {'hits': 0, 'refreshes': 0}
+
+    def get_parameters(self, names: List[str], ssm_client, min_versions: Dict[str, int] = None) -> Dict[str, str]:
+        '''Returns the values of the parameters keyed by their names.'''
+        if self.is_stale(names, min_versions or {}):
+            self.refresh(names, ssm_client)
+        else:
+            self.counters['hits'] += 1
+        return {name: self.parameters[name]['Value'] for name in names}
+
+    def is_stale(self, names: List[str], min_versions: Dict[str, int]) -> bool:
+        if time.monotonic() - self.loaded_at > self.ttl_seconds:
+            return True
+        for name in names:
+            if name not in self.parameters:
+                return True
+            if self.parameters[name]['Version'] < int(min_versions.get(name, 0)):
+                print(f'Parameter {name} has a newer version {min_versions[name]}.')
+                return True
+        return False
+
+    def refresh(self, names: List[str], ssm_client):
+        names_to_load: List[str] = list(
+            dict.fromkeys(list(self.parameters) + names))
+        parameters: Dict[str, Dict[str, Any]] = {}
+        invalid_parameters: List[str] = []
+        for offset in range(0, len(names_to_load), GET_PARAMETERS_LIMIT):
+            response: Dict[str, Any] = ssm_client.get_parameters(
+                Names=names_to_load[offset:offset + GET_PARAMETERS_LIMIT])
+            for parameter in response['Parameters']:
+                parameters[parameter['Name']] = {'Value': parameter['Value'],
+                                                 'Version': parameter['Version']}
+            invalid_parameters.extend(response.get('InvalidParameters', []))
+        missing_parameters: List[str] = [
+            name for name in names if name not in parameters]
+        if len(missing_parameters) != 0:
+            raise Exception(
+                f'Parameters {missing_parameters} are not available in the parameter store.')
+        if len(invalid_parameters) != 0:
+            print(f'Parameters {invalid_parameters} are not available any more.')
+        self.parameters = parameters
+        self.loaded_at = time.monotonic()
+        self.counters['refreshes'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
+
+
+configuration_loader = ConfigurationLoader(
+    float(os.environ.get('CONFIG_CACHE_TTL_SECONDS', 300)))
+
+
+def get_configuration_data(ssm_client, min_versions: Dict[str, int] = None) -> AlarmConfigurationParams:
+    '''Get config values of the cpu credit alarm from parameter store. The values are cached across warm invocations.'''
+    try:
+        names: List[str] = [os.environ.get('THRESHOLD'),
+                            os.environ.get('PERIOD'),
+                            os.environ.get('DATAPOINTS'),
+                            os.environ.get('EVALUATION_PERIODS')]
+        parameters: Dict[str, str] = configuration_loader.get_parameters(
+            names, ssm_client, min_versions)
+        threshold, period, datapoints, evaluation_periods = [
+            parameters[name] for name in names]
+    except Exception as err:
+        print(err)
+        raise err
+    else:
+        return AlarmConfigurationParams(threshold, period, datapoints, evaluation_periods)
@@ -0,0 +1,71 @@
+from typing import Dict
+from collections import namedtuple
+
+EC2typeSpec = namedtuple(
+    'EC2typeSpec', ['instance_type', 'max_cpu_credit', 'vCPU_count'])
+
+'''Credit table'''
+instances_credit_table: Dict[str, EC2typeSpec] = {
+    't3.nano': EC2typeSpec('t3.nano', 144, 2),
+    't3.micro': EC2typeSpec('t3.micro', 288, 2),
+    't3.small': EC2typeSpec('t3.small', 576, 2),
+    't3.medium': EC2typeSpec('t3.medium', 576, 2),
+    't3.large': EC2typeSpec('t3.large', 864, 2),
+    't3.xlarge': EC2typeSpec('t3.xlarge', 2304, 4),
+    't3.2xlarge': EC2typeSpec('t3.2xlarge', 4608, 8),
+    't3a.nano': EC2typeSpec('t3a.nano', 144, 2),
+    't3a.micro': EC2typeSpec('t3a.micro', 288, 2),
+    't3a.small': EC2typeSpec('t3a.small', 576, 2),
+    't3a.medium': EC2typeSpec('t3a.medium', 576, 2),
+    't3a.large': EC2typeSpec('t3a.large', 864, 2),
+    't3a.xlarge': EC2typeSpec('t3a.xlarge', 2304, 4),
+    't3a.2xlarge': EC2typeSpec('t3a.2xlarge', 4608, 8),
+    't4g.nano': EC2typeSpec('t4g.nano', 144, 2),
+    't4g.micro': EC2typeSpec('t4g.micro', 288, 2),
+    't4g.small': EC2typeSpec('t4g.small', 576, 2),
+    't4g.medium': EC2typeSpec('t4g.medium', 576, 2),
+    't4g.large': EC2typeSpec('t4g.large', 864, 2),
+    't4g.xlarge': EC2typeSpec('t4g.xlarge', 2304, 4),
+    't4g.2xlarge': EC2typeSpec('t4g.2xlarge', 4608, 8)
+}
+
+launch_credits: Dict[str, float] = {
+    't2.nano': 30,
+    't2.micro': 30,
+    't2.small': 30,
+    't2.medium': 60,
+    't2.large': 60,
+    't2.xlarge': 120,
+    't2.2xlarge': 240
+}
+
+baseline_cpu_utilization: Dict[str, float] = {
+    't2.nano': 5,
+    't2.micro': 10,
+    't2.small': 20,
+    't2.medium': 20,
+    't2.large': 30,
+    't2.xlarge': 22.5,
+    't2.2xlarge': 17,
+    't3.nano': 5,
+    't3.micro': 10,
+    't3.small': 20,
+    't3.medium': 20,
+    't3.large': 30,
+    't3.xlarge': 40,
+    't3.2xlarge': 40,
+    't3a.nano': 5,
+    't3a.micro': 10,
+    't3a.small': 20,
+    't3a.medium': 20,
+    't3a.large': 30,
+    't3a.xlarge': 40,
+    't3a.2xlarge': 40,
+    't4g.nano': 5,
+    't4g.micro': 10,
+    't4g.small': 20,
+    't4g.medium': 20,
+    't4g.large': 30,
+    't4g.xlarge': 40,
+    't4g.2xlarge': 40
+}
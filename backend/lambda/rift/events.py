@@ -0,0 +1,136 @@
+import os
+import time
+import random
+import threading
+from typing import List, Dict, Any, Tuple
+
+# PutEvents accepts at most 10 entries and 256 KB in one call.
+PUT_EVENTS_ENTRIES_LIMIT = 10
+PUT_EVENTS_SIZE_LIMIT = 256 * 1024
+
+
+def put_events_with_retry(entries: List[Dict[str, Any]],
+                          event_bridge,
+                          max_attempts: int = 5,
+                          base_delay_seconds: float = 0.2) -> Tuple[int, List[Dict[str, Any]]]:
+    '''
+    Put at most 10 entries with one PutEvents call and redrive only the failed entries with exponential backoff and jitter.
+    Returns the number of published entries and the entries which still failed after the last attempt.
+    '''
+    published: int = 0
+    pending_entries: List[Dict[str, Any]] = entries
+    for attempt in range(1, max_attempts + 1):
+        failed_entries: List[Dict[str, Any]] = []
+        try:
+            response: Dict[str, Any] = event_bridge.put_events(
+                Entries=pending_entries)
+        except Exception as err:
+            print(err)
+            print(f'Failed to put {len(pending_entries)} events in attempt {attempt}.')
+            failed_entries = pending_entries
+        else:
+            for entry, result in zip(pending_entries, response['Entries']):
+                if 'ErrorCode' in result:
+                    print(f'Failed to put event: {result["ErrorCode"]} {result.get("ErrorMessage")}')
+                    failed_entries.append(entry)
+            published += len(pending_entries) - len(failed_entries)
+        if len(failed_entries) == 0 or attempt == max_attempts:
+            return published, failed_entries
+        pending_entries = failed_entries
+        time.sleep(random.uniform(0, base_delay_seconds * 2 ** attempt))
+    return published, pending_entries
+
+
+def put_events_in_batches(entries: List[Dict[str, Any]], event_bridge) -> List[int]:
+    '''
+    Put the events with the event publisher, so they are packed in as few PutEvents calls as the limits allow
+    and the failed entries are redriven. Returns the indexes of the entries which still failed.
+    '''
+    entry_ids: List[int] = [event_publisher.put(entry, event_bridge)
+                            for entry in entries]
+    failed_entry_ids: List[int] = event_publisher.flush()
+    return [index for index, entry_id in enumerate(entry_ids) if entry_id in failed_entry_ids]
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    '''Size of an entry as PutEvents counts it against the 256 KB of a call.'''
+    size: int = 14 if 'Time' in entry else 0
+    for name in ['Source', 'DetailType', 'Detail']:
+        size += len(entry.get(name, '').encode('utf-8'))
+    for resource in entry.get('Resources', []):
+        size += len(resource.encode('utf-8'))
+    return size
+
+
+class EventPublisher:
+    '''
+    Buffers the entries of the events a function puts and sends them with PutEvents when 10 entries or 256 KB
+    are buffered, or when it is flushed at the end of the invocation. The failed entries are redriven with backoff
+    and the ones which still fail are reported by their ids, so a caller knows which of its events were not put.
+    The counters of the invocation are taken to be emitted as metrics.
+    '''
+
+    def __init__(self, max_attempts: int, base_delay_seconds: float):
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.lock = threading.RLock()
+        self.event_bridge = None
+        self.buffer: List[Tuple[int, Dict[str, Any]]] = []
+        self.buffer_size: int = 0
+        self.next_entry_id: int = 0
+        self.failed_entry_ids: List[int] = []
+        self.counters: Dict[str, float] = {'published': 0,
+                                           'failed': 0,
+                                           'put-events-batches': 0,
+                                           'publish-milliseconds': 0.0}
+
+    def put(self, entry: Dict[str, Any], event_bridge) -> int:
+        '''Buffer the entry and returns its id.'''
+        size: int = entry_size(entry)
+        with self.lock:
+            self.event_bridge = event_bridge
+            if len(self.buffer) == PUT_EVENTS_ENTRIES_LIMIT or \
+                    (len(self.buffer) != 0 and self.buffer_size + size > PUT_EVENTS_SIZE_LIMIT):
+                self.send()
+            entry_id: int = self.next_entry_id
+            self.next_entry_id += 1
+            self.buffer.append((entry_id, entry))
+            self.buffer_size += size
+            return entry_id
+
+    def send(self):
+        entries_by_id: Dict[int, Dict[str, Any]] = dict(self.buffer)
+        self.buffer = []
+        self.buffer_size = 0
+        started_at: float = time.perf_counter()
+        published, failed_entries = put_events_with_retry(list(entries_by_id.values()),
+                                                          self.event_bridge,
+                                                          self.max_attempts,
+                                                          self.base_delay_seconds)
+        self.counters['publish-milliseconds'] += (time.perf_counter() - started_at) * 1000
+        self.counters['put-events-batches'] += 1
+        self.counters['published'] += published
+        self.counters['failed'] += len(failed_entries)
+        failed_entries_ids: List[int] = [id(entry) for entry in failed_entries]
+        self.failed_entry_ids.extend(entry_id for entry_id, entry in entries_by_id.items()
+                                     if id(entry) in failed_entries_ids)
+
+    def flush(self) -> List[int]:
+        '''Send the buffered entries. Returns the ids of the entries which failed since the last flush.'''
+        with self.lock:
+            if len(self.buffer) != 0:
+                self.send()
+            failed_entry_ids: List[int] = self.failed_entry_ids
+            self.failed_entry_ids = []
+            return failed_entry_ids
+
+    def take_counters(self) -> Dict[str, float]:
+        '''Returns the counters since they were last taken and resets them.'''
+        with self.lock:
+            counters: Dict[str, float] = self.counters
+            self.counters = {name: 0 for name in counters}
+            return counters
+
+
+event_publisher = EventPublisher(int(os.environ.get('PUT_EVENTS_MAX_ATTEMPTS', 5)),
+                                 float(os.environ.get('PUT_EVENTS_BASE_DELAY_SECONDS', 0.2)))
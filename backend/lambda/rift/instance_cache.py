@@ -0,0 +1,121 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+from collections import OrderedDict
+
+# EC2 accepts at most 200 values in a DescribeInstances filter.
+DESCRIBE_INSTANCES_FILTER_LIMIT = 200
+
+
+class InstanceMetadataCache:
+    '''
+    Cache of the DescribeInstances data of instances which lives across warm invocations of a function.
+    Entries expire after the TTL and the least recently used entry is evicted once the cache is full.
+    An entry described before the event which triggered the invocation is not served, as the instance may have
+    been resized or retagged since, e.g. stopped as an m5 and started again as a t3 within the TTL. So the entries
+    only serve the redeliveries and retries of an event, and the calls which do not give the time of an event.
+    Non burstable instances are not cached for longer: their type can only change while they are stopped, and
+    every pending event follows such a stop, so a longer entry would miss the resize to a burstable type.
+    '''
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.counters: Dict[str, int] = {'hits': 0,
+                                         'misses': 0,
+                                         'evictions': 0,
+                                         'invalidations': 0}
+
+    def get(self, instance_id: str, ec2_client, described_after: float = 0) -> Dict[str, Any]:
+        '''
+        Returns the cached description of the instance or None if the instance does not exist.
+        A description taken before described_after, the epoch time of the triggering event, is refreshed.
+        '''
+        return self.get_many([instance_id], ec2_client, {instance_id: described_after}).get(instance_id)
+
+    def get_many(self, instance_ids: List[str], ec2_client,
+                 described_after: Dict[str, float] = None) -> Dict[str, Dict[str, Any]]:
+        '''
+        Returns the description of the instances. The missing ones are described with one DescribeInstances call.
+        described_after gives the epoch time of the triggering event of each instance, as in get.
+        '''
+        described_after = described_after or {}
+        instances: Dict[str, Dict[str, Any]] = {}
+        missing_instance_ids: List[str] = []
+        for instance_id in instance_ids:
+            instance: Dict[str, Any] = self.lookup(instance_id, described_after.get(instance_id, 0))
+            if instance is None:
+                missing_instance_ids.append(instance_id)
+            else:
+                instances[instance_id] = instance
+        if len(missing_instance_ids) != 0:
+            described_instances: Dict[str, Dict[str, Any]] = describe_instances(
+                missing_instance_ids, ec2_client)
+            for instance_id, instance in described_instances.items():
+                self.put(instance)
+                instances[instance_id] = instance
+        return instances
+
+    def lookup(self, instance_id: str, described_after: float = 0) -> Dict[str, Any]:
+        entry = self.entries.get(instance_id)
+        if entry is None:
+            self.counters['misses'] += 1
+            return None
+        expires_at, described_at, instance = entry
+        if expires_at < time.monotonic():
+            del self.entries[instance_id]
+            self.counters['misses'] += 1
+            return None
+        if described_at < described_after:
+            self.invalidate(instance_id)
+            self.counters['misses'] += 1
+            return None
+        self.entries.move_to_end(instance_id)
+        self.counters['hits'] += 1
+        return instance
+
+    def put(self, instance: Dict[str, Any]):
+        instance_id: str = instance['InstanceId']
+        self.entries[instance_id] = (time.monotonic() + self.ttl_seconds, time.time(), instance)
+        self.entries.move_to_end(instance_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def invalidate(self, instance_id: str):
+        if self.entries.pop(instance_id, None) is not None:
+            self.counters['invalidations'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, size=len(self.entries))
+
+
+def describe_instances(instance_ids: List[str], ec2_client) -> Dict[str, Dict[str, Any]]:
+    '''
+    Resolve the instances with one DescribeInstances call per 200 instance ids.
+    The instance-id filter is used as the InstanceIds parameter fails the whole call if one instance does not exist any more.
+    Returns the instance description keyed by the instance id.
+    '''
+    instances: Dict[str, Dict[str, Any]] = {}
+    unique_instance_ids: List[str] = list(dict.fromkeys(instance_ids))
+    paginator = ec2_client.get_paginator('describe_instances')
+    for offset in range(0, len(unique_instance_ids), DESCRIBE_INSTANCES_FILTER_LIMIT):
+        for page in paginator.paginate(Filters=[{'Name': 'instance-id',
+                                                 'Values': unique_instance_ids[offset:offset + DESCRIBE_INSTANCES_FILTER_LIMIT]}]):
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    instances[instance['InstanceId']] = instance
+    return instances
+
+
+def event_timestamp(event: Dict[str, Any]) -> float:
+    '''The epoch time of an EventBridge event, or 0 when the event has no time.'''
+    if 'time' not in event:
+        return 0
+    return datetime.strptime(event['time'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc).timestamp()
+
+
+instance_cache = InstanceMetadataCache(float(os.environ.get('INSTANCE_CACHE_TTL_SECONDS', 300)),
+                                       int(os.environ.get('INSTANCE_CACHE_MAX_ENTRIES', 1024)))
@@ -0,0 +1,107 @@
+import os
+import json
+import threading
+from typing import List, Dict, Any
+
+# EC2 accepts at most 200 values in a DescribeImages filter.
+DESCRIBE_IMAGES_FILTER_LIMIT = 200
+
+
+def platform_of(platform_details: str) -> str:
+    '''The processes metric of the CloudWatch agent is named differently on Linux and Windows.'''
+    return 'Linux' if 'linux' in platform_details.lower() else 'Windows'
+
+
+class ImagePlatformCache:
+    '''
+    Platform of the AMIs, Linux or Windows, which lives across warm invocations of a function and is saved in /tmp
+    so a new execution environment on the same host starts with it. A fleet uses a handful of AMIs, so the cache
+    is not bounded. The PlatformDetails of the instance is used when DescribeInstances returns it and the
+    image is described only for the instances without it.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self.platforms: Dict[str, str] = None
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {'instance-platform-details': 0,
+                                         'hits': 0,
+                                         'misses': 0,
+                                         'described-images': 0}
+
+    def load(self):
+        self.platforms = {}
+        try:
+            with open(self.path) as file:
+                self.platforms = json.load(file)
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        try:
+            with open(self.path, 'w') as file:
+                json.dump(self.platforms, file)
+        except OSError as err:
+            print(f'Could not save the image platforms: {err}')
+
+    def instances_platforms(self, instances: List[Dict[str, Any]], ec2_client) -> Dict[str, str]:
+        '''
+        Returns the platform of each instance. The images of the instances without PlatformDetails which are
+        not cached are described in bulk.
+        '''
+        platforms: Dict[str, str] = {}
+        image_instances: List[Dict[str, Any]] = []
+        for instance in instances:
+            if 'PlatformDetails' in instance:
+                self.counters['instance-platform-details'] += 1
+                platforms[instance['InstanceId']] = platform_of(
+                    instance['PlatformDetails'])
+            elif 'ImageId' in instance:
+                image_instances.append(instance)
+        if len(image_instances) != 0:
+            images_platforms: Dict[str, str] = self.prefetch(
+                [instance['ImageId'] for instance in image_instances], ec2_client)
+            for instance in image_instances:
+                if instance['ImageId'] in images_platforms:
+                    platforms[instance['InstanceId']] = images_platforms[instance['ImageId']]
+        return platforms
+
+    def prefetch(self, image_ids: List[str], ec2_client) -> Dict[str, str]:
+        '''Describe the images which are not cached yet with one DescribeImages call. Returns the platforms of the images.'''
+        with self.lock:
+            if self.platforms is None:
+                self.load()
+            unique_image_ids: List[str] = list(dict.fromkeys(image_ids))
+            missing_image_ids: List[str] = [image_id for image_id in unique_image_ids
+                                            if image_id not in self.platforms]
+            self.counters['hits'] += len(unique_image_ids) - len(missing_image_ids)
+            self.counters['misses'] += len(missing_image_ids)
+            if len(missing_image_ids) != 0:
+                self.platforms.update(describe_images_platforms(
+                    missing_image_ids, ec2_client))
+                self.counters['described-images'] += len(missing_image_ids)
+                self.save()
+            return {image_id: self.platforms[image_id] for image_id in unique_image_ids
+                    if image_id in self.platforms}
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, size=len(self.platforms or {}))
+
+
+def describe_images_platforms(image_ids: List[str], ec2_client) -> Dict[str, str]:
+    '''
+    Describe the images with one DescribeImages call per 200 image ids.
+    The image-id filter is used as the ImageIds parameter fails the whole call if one image is deregistered.
+    '''
+    platforms: Dict[str, str] = {}
+    for offset in range(0, len(image_ids), DESCRIBE_IMAGES_FILTER_LIMIT):
+        response: Dict[str, Any] = ec2_client.describe_images(Filters=[{'Name': 'image-id',
+                                                                        'Values': image_ids[offset:offset + DESCRIBE_IMAGES_FILTER_LIMIT]}])
+        for image in response['Images']:
+            platforms[image['ImageId']] = platform_of(
+                image.get('PlatformDetails', image.get('Platform', 'Linux/UNIX')))
+    return platforms
+
+
+image_platform_cache = ImagePlatformCache(os.environ.get(
+    'IMAGE_PLATFORM_CACHE_PATH', '/tmp/rift-image-platforms.json'))
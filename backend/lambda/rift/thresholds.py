@@ -0,0 +1,51 @@
+import os
+from dataclasses import dataclass
+
+from .credits import instances_credit_table, baseline_cpu_utilization
+
+
+@dataclass
+class AlarmConfigurationParams:
+    threshold: str
+    period: str
+    datapoints: str
+    evaluation_periods: str
+
+
+def apply_compute_intensive_workloads_config(config: AlarmConfigurationParams, name: str) -> AlarmConfigurationParams:
+    '''Use the additional datapoints and evaluation periods if the application is compute intensive.'''
+    compute_intensive_workloads_regix_env: str = os.environ.get(
+        'COMPUTE_INTENSIVE_WORKLOADS_REGIX_LIST')
+    if not compute_intensive_workloads_regix_env or not name:
+        return config
+    for regix in compute_intensive_workloads_regix_env.split(','):
+        if regix in name:
+            print(f'regix={regix}')
+            print(f'name={name}')
+            config.datapoints = os.environ.get('ADDITIONAL_DATAPOINTS')
+            config.evaluation_periods = os.environ.get(
+                'ADDITIONAL_EVALUATION_PERIODS')
+    return config
+
+
+def cpu_credit_balance_threshold(instance_type: str, credits_used_per_vcpu_per_hour: float) -> float:
+    '''
+    The CPUCreditBalance threshold of a T3 or T4g instance, the credits its vCPUs use in an hour,
+    capped to 20% of the maximum credit balance when it would be above 80% of it.
+    The t2 instances use their launch credits instead.
+    1 CPU credit = 1 vCPU * 100% utilization * 1 minute.
+    '''
+    threshold: float = instances_credit_table[instance_type].vCPU_count * \
+        credits_used_per_vcpu_per_hour
+    _80_percent_of_max_credit: float = .8 * \
+        int(instances_credit_table[instance_type].max_cpu_credit)
+    _20_percent_of_max_credit: float = .2 * \
+        int(instances_credit_table[instance_type].max_cpu_credit)
+    if threshold > _80_percent_of_max_credit:
+        threshold = _20_percent_of_max_credit
+    return threshold
+
+
+def cpu_utilization_threshold(instance_type: str) -> float:
+    '''The CPUUtilization threshold is the baseline utilization per vCPU of the instance type.'''
+    return float(baseline_cpu_utilization[instance_type])
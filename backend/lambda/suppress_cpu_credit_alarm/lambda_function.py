@@ -1,19 +1,17 @@
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 from typing import Any, Dict
-from botocore import config
 from botocore.exceptions import ClientError
 import os
 import json
-from botocore.config import Config
-custom_boto3_config = Config(
-   retries = {
-      'max_attempts': 10,
-      'mode': 'standard'
-   }
-)
-ec2_resource = boto3.resource('ec2',config=custom_boto3_config)
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
 
+aws_services.record_imports(imports_started_at)
 
+
+@put_api_metrics_at_exit
+@report_cold_start
 def lambda_handler(event, context):
     '''This program tags an instance to suppress the notifications of alarms.'''
     aws_region: str = os.environ.get('AWS_REGION')
@@ -25,7 +23,7 @@ def lambda_handler(event, context):
         print(f'event is {event}')
         instance_id: str = event['instance-id']
         print(f'Suppress CPU credit balance alarm of {instance_id}')
-        instance = ec2_resource.Instance(instance_id)
+        instance = aws_services['ec2_resource'].Instance(instance_id)
         print(f'suppress_tag_name={suppress_tag_name}')
         instance.create_tags(
             Tags=[
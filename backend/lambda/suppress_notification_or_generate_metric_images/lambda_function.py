@@ -1,106 +1,288 @@
-import boto3
+import time
+imports_started_at: float = time.perf_counter()
 import os
 import json
 from botocore.exceptions import ClientError
-from typing import Dict, Any
+from typing import List, Dict, Any, Tuple
 from pprint import pprint
-from datetime import datetime
-from dateutil import tz
-from botocore.config import Config
-from util.presignedurl_util import generate_presigned_url
+from concurrent.futures import ThreadPoolExecutor
+from util.presignedurl_util import generate_presigned_urls, signing_credentials
 from util.create_metric_image_util import create_metric_images_urls
+from rift.instance_cache import instance_cache
+from rift.platforms import image_platform_cache
+from rift.events import put_events_in_batches
+from util.metric_image_cache_util import metric_image_cache
+from util.batch_util import batch_item_failures
+from util.digest_util import (AlarmNotification,
+                              is_queued_event,
+                              parse_alarm_notifications,
+                              digest_alarm_details,
+                              digest_subject,
+                              notification_cooldown)
+from util.events_util import publish_events_at_exit
+from util.client_registry_util import aws_services, report_cold_start
+from util.api_metrics_util import put_api_metrics_at_exit
+
+aws_services.record_imports(imports_started_at)
 
-custom_boto3_config = Config(
-   retries = {
-      'max_attempts': 10,
-      'mode': 'standard'
-   }
-)
-to_zone = tz.tzlocal()
-aws_services: Dict[str, Any] = {}
 aws_region: str = os.environ.get('AWS_REGION')
 process_metric_name: Dict[str, str] = {'Windows': 'procstat cpu_usage',
                                        'Linux': 'procstat_cpu_usage'}
-
-aws_services['ec2_resource'] = boto3.resource('ec2',config=custom_boto3_config)
-aws_services['sns_client'] = boto3.client('sns',config=custom_boto3_config)
-aws_services['eventbridge_client'] = boto3.client('events',config=custom_boto3_config)
-aws_services['ec2_client'] = boto3.client('ec2',config=custom_boto3_config)
-aws_services['secretsmanager_client'] = boto3.client('secretsmanager',config=custom_boto3_config)
-aws_services['cloudwatch_client'] = boto3.client('cloudwatch',config=custom_boto3_config)
-aws_services['s3_resource'] = boto3.resource('s3',config=custom_boto3_config)
-aws_services['cloudwatch_resource'] = boto3.resource('cloudwatch',config=custom_boto3_config)
+# Number of alarms of a digest, the earliest ones, which get metric images.
+digest_top_images: int = int(os.environ.get('DIGEST_TOP_IMAGES', 3))
+# Number of alarms of an invocation whose images are generated at the same time.
+image_workers: int = int(os.environ.get('IMAGE_WORKERS', 4))
 
 
+@put_api_metrics_at_exit
+@report_cold_start
+@publish_events_at_exit
 def lambda_handler(event, context):
     '''
     This lambda generates metric images of the alarm current state. It first checks if an instance is tagged to suppress cpu credit alarm.
     Event is not triggered if the instance is tagged as SuppressCpuCreditAlarm=True or SuppressCpuCreditAlarm=true.
+    All the alarm notifications of the invocation are processed, an event is put for each alarm which is not suppressed.
+    In the digest notification mode the alarms buffered in the queue during the batching window are sent as one digest per application.
     '''
-    response: Dict[str, Any] = {}
+    if is_queued_event(event):
+        return process_digest(event, context)
     try:
+        notifications: List[AlarmNotification] = parse_alarm_notifications(
+            event)
+        print(f'Triggered by {len(notifications)} alarm notifications.')
+        outcomes: List[Dict[str, str]] = process_notifications(
+            notifications, context)
+    except (Exception, ClientError) as err:
+        print(err)
+        print('Aborted! because of above error.')
+        return err
+    else:
+        print(f'Successfully executed.')
+        print(f'Instance cache: {instance_cache.stats()}')
+        pprint(outcomes)
+        return {'records': outcomes}
+
 
-        out_event: Dict[str, Any] = {}
-        message: str = event['Records'][0]['Sns']['Message']
-        # Need to do this as Sns Message is a str not Dict.
-        alarm_details: Dict[str:Any] = json.loads(message)
-        out_event['alarm-details'] = alarm_details
-        out_event['subject'] = event['Records'][0]['Sns']['Subject']
-        alarm_name: str = alarm_details['AlarmName']
+def process_notifications(notifications: List[AlarmNotification], context) -> List[Dict[str, str]]:
+    '''
+    Describe the instances of all the alarms with one call, generate the images of the alarms concurrently
+    and put the events of the alarms which are not suppressed in batches.
+    The event of an alarm is put even if its instance lookup or its images fail, so the notification is still sent.
+    Returns the outcome of each notification.
+    '''
+    instances: Dict[str, Dict[str, Any]] = {}
+    instances_lookup: str = 'described'
+    try:
+        instances = instance_cache.get_many(
+            [notification.alarm_details['AlarmName'][:19] for notification in notifications], aws_services['ec2_client'])
+    except (Exception, ClientError) as err:
+        print(err)
+        print('Failed to describe the instances of the alarms because of above error. The events are put without the application and the images.')
+        instances_lookup = 'failed'
+    outcomes: List[Dict[str, str]] = []
+    out_events: List[Dict[str, Any]] = []
+    # Outcomes of the notifications whose events are put, in the order of the events.
+    out_events_outcomes: List[Dict[str, str]] = []
+    for notification in notifications:
+        alarm_name: str = notification.alarm_details['AlarmName']
         instance_id: str = alarm_name[:19]
-        suppress_alarm: str = 'False'
-        app: str = ''
-        instance = aws_services['ec2_resource'].Instance(instance_id)
-        instance_type: str = instance.instance_type
-        out_event['instance-type'] = instance_type
-        image = instance.image
-        platform: str = 'Linux' if 'linux' in image.platform_details.lower() else 'Windows'
-        out_event['platform'] = platform
-        for tag in instance.tags:
-            if tag['Key'] == os.environ.get('SUPPRESS_TAG_NAME'):
-                suppress_alarm = tag['Value']
-            if tag['Key'] == 'Name':
-                app = tag['Value']
-        out_event['app'] = app
-        if suppress_alarm.lower() == 'true':
-            print(
-                f'Suppressed alarm {alarm_name} for instance {instance_id} of application {app}.')
+        outcome: Dict[str, str] = {'message-id': notification.message_id,
+                                   'alarm-name': alarm_name,
+                                   'instance-lookup': instances_lookup}
+        outcomes.append(outcome)
+        out_event: Dict[str, Any] = {'alarm-details': notification.alarm_details,
+                                     'subject': notification.subject,
+                                     'app': ''}
+        instance: Dict[str, Any] = instances.get(instance_id)
+        if instance is None:
+            print(f'Instance of alarm {alarm_name} is not found.')
+            if instances_lookup == 'described':
+                outcome['instance-lookup'] = 'not-found'
         else:
+            tags: Dict[str, str] = {tag['Key']: tag['Value']
+                                    for tag in instance.get('Tags', [])}
+            out_event['app'] = tags.get('Name', '')
+            if tags.get(os.environ.get('SUPPRESS_TAG_NAME'), 'False').lower() == 'true':
+                print(
+                    f'Suppressed alarm {alarm_name} for instance {instance_id} of application {out_event["app"]}.')
+                outcome['outcome'] = 'suppressed'
+                continue
             print(f'Do not suppress alarm {alarm_name}.')
-            metric_images_urls: Dict[str, str] = create_metric_images_urls(alarm_details, [
-                'CPUUtilization', 'CPUCreditBalance', process_metric_name[platform]], aws_services, instance_type)
-            print(f'Successfully generated the images.')
-            suppress_api_url: str = generate_presigned_url(
-                aws_services['secretsmanager_client'], instance_id)
+            out_event['instance-type'] = instance['InstanceType']
+        out_events.append(out_event)
+        out_events_outcomes.append(outcome)
+
+    platforms: Dict[str, str] = {}
+    try:
+        platforms = image_platform_cache.instances_platforms(
+            list(instances.values()), aws_services['ec2_client'])
+        print(f'Image platform cache: {image_platform_cache.stats()}')
+    except (Exception, ClientError) as err:
+        print(err)
+        print('Failed to get the platforms of the instances because of above error. The Linux processes metric is used.')
+    with ThreadPoolExecutor(max_workers=image_workers) as executor:
+        list(executor.map(lambda out_event: add_metric_images_urls(out_event, instances, platforms),
+                          out_events))
+    print(f'Metric image cache: {metric_image_cache.stats()}')
+    metric_image_cache.put_metrics(context.function_name)
+    try:
+        suppress_api_urls: Dict[str, str] = generate_presigned_urls(aws_services['secretsmanager_client'],
+                                                                    [out_event['alarm-details']['AlarmName'][:19]
+                                                                     for out_event in out_events])
+        print(f'Signing credentials: {signing_credentials.stats()}')
+        for out_event in out_events:
+            out_event['suppress-api-url'] = suppress_api_urls[out_event['alarm-details']['AlarmName'][:19]]
+    except (Exception, ClientError) as err:
+        print(err)
+        print('Failed to generate the suppress api urls because of above error.')
+
+    entries: List[Dict[str, Any]] = []
+    for out_event in out_events:
+        out_event['function-name'] = [context.function_name]
+        out_event['function-outcome'] = [os.environ.get('FN_OUTCOME')]
+        entries.append({
+            'Source': "lambda.amazonaws.com",
+            'DetailType': os.environ.get('NOTIFICATION_FROM_FN'),
+            'Detail': json.dumps(out_event),
+            'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
+        })
+    failed_entries: List[int] = put_events_in_batches(
+        entries, aws_services['eventbridge_client'])
+    for index, outcome in enumerate(out_events_outcomes):
+        outcome['outcome'] = 'failed-to-publish' if index in failed_entries else 'published'
+    return outcomes
 
-            print(f'Generated suppressed api url. \n {suppress_api_url}')
-            out_event['metric-images-urls'] = metric_images_urls
-            out_event['suppress-api-url'] = suppress_api_url
 
+def add_metric_images_urls(out_event: Dict[str, Any],
+                           instances: Dict[str, Dict[str, Any]],
+                           platforms: Dict[str, str]):
+    alarm_details: Dict[str, Any] = out_event['alarm-details']
+    instance: Dict[str, Any] = instances.get(alarm_details['AlarmName'][:19])
+    if instance is None:
+        return
+    try:
+        platform: str = platforms.get(instance['InstanceId'], 'Linux')
+        out_event['platform'] = platform
+        out_event['metric-images-urls'] = create_metric_images_urls(alarm_details, [
+            'CPUUtilization', 'CPUCreditBalance', process_metric_name[platform]], aws_services, instance['InstanceType'])
+        print(f'Successfully generated the images of alarm {alarm_details["AlarmName"]}.')
     except (Exception, ClientError) as err:
         print(err)
-        print('Aborted! because of above error.')
-        return err
-    else:
-        print(f'Successfully executed.')
-        return out_event
-    finally:
-        '''
-        The event trigger logic is put in finally block to ensure to trigger down stream functions even if the image generation fails.
-        Trigger event if the alarm is not suppressed. 
-        '''
-        response=None
-        if suppress_alarm.lower() != 'true':
-            out_event['function-name'] = [context.function_name]
-            out_event['function-outcome'] = [os.environ.get('FN_OUTCOME')]
-            complete_out_event: Dict[str, Any] = {
-                'Source': "lambda.amazonaws.com",
-                'DetailType': os.environ.get('NOTIFICATION_FROM_FN'),
-                'Detail': json.dumps(out_event),
-                'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
-            }
-            print(complete_out_event)
-            response = aws_services['eventbridge_client'].put_events(
-                Entries=[complete_out_event]
-            )
-        print(response)
+        print(f'Failed to generate the images of alarm {alarm_details["AlarmName"]} because of above error.')
+
+
+def add_digest_metric_images_urls(alarm: Dict[str, Any],
+                                  alarm_details: Dict[str, Any],
+                                  instance: Dict[str, Any],
+                                  platforms: Dict[str, str]):
+    try:
+        alarm['metric-images-urls'] = create_metric_images_urls(alarm_details, [
+            'CPUUtilization', 'CPUCreditBalance', process_metric_name[platforms.get(instance['InstanceId'], 'Linux')]],
+            aws_services, instance['InstanceType'])
+    except Exception as err:
+        print(err)
+        print(f'Failed to generate the images of alarm {alarm_details["AlarmName"]}.')
+
+
+def process_digest(event, context) -> Dict[str, Any]:
+    '''
+    Coalesce the alarm notifications buffered in the queue into one digest event per application.
+    Repeat notifications of an alarm in the cool-down and alarms of suppressed instances are dropped.
+    The cool-down of the alarms starts only once their digest is published.
+    The instances are described with one call and the metric images are generated concurrently, only for the earliest alarms of each digest.
+    An alarm whose instance is not found is kept in the digest without the instance type and the images.
+    Returns the messages of the digests which failed to publish, so only those are retried.
+    '''
+    notifications: List[AlarmNotification] = parse_alarm_notifications(event)
+    print(f'Triggered by {len(notifications)} alarm notifications.')
+    # The repeat notifications of an alarm in the same state within the batch are dropped as well.
+    due_notifications: Dict[Any, AlarmNotification] = {}
+    for notification in notifications:
+        key = (notification.alarm_details['AlarmName'], notification.alarm_details['NewStateValue'])
+        if key not in due_notifications and notification_cooldown.should_notify(*key):
+            due_notifications[key] = notification
+    notifications = list(due_notifications.values())
+    print(f'Notification cooldown: {notification_cooldown.stats()}')
+    instances: Dict[str, Dict[str, Any]] = instance_cache.get_many(
+        [notification.alarm_details['AlarmName'][:19] for notification in notifications], aws_services['ec2_client'])
+    digests: Dict[str, List[AlarmNotification]] = {}
+    for notification in notifications:
+        alarm_name: str = notification.alarm_details['AlarmName']
+        instance: Dict[str, Any] = instances.get(alarm_name[:19])
+        if instance is None:
+            print(f'Instance of alarm {alarm_name} is not found. It is sent without the images.')
+        tags: Dict[str, str] = {tag['Key']: tag['Value']
+                                for tag in (instance or {}).get('Tags', [])}
+        app: str = tags.get('Name', '')
+        if tags.get(os.environ.get('SUPPRESS_TAG_NAME'), 'False').lower() == 'true':
+            print(
+                f'Suppressed alarm {alarm_name} for instance {alarm_name[:19]} of application {app}.')
+            continue
+        digests.setdefault(app, []).append(notification)
+
+    platforms: Dict[str, str] = image_platform_cache.instances_platforms(
+        list(instances.values()), aws_services['ec2_client'])
+    suppress_api_urls: Dict[str, str] = generate_presigned_urls(aws_services['secretsmanager_client'],
+                                                                [notification.alarm_details['AlarmName'][:19]
+                                                                 for app_notifications in digests.values()
+                                                                 for notification in app_notifications])
+    print(f'Signing credentials: {signing_credentials.stats()}')
+    entries: List[Dict[str, Any]] = []
+    entries_notifications: List[List[AlarmNotification]] = []
+    digests_alarms: Dict[str, List[Dict[str, Any]]] = {}
+    # Alarms which get metric images, with the alarm details and the instance to render them.
+    imaged_alarms: List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]] = []
+    for app, app_notifications in digests.items():
+        app_notifications.sort(
+            key=lambda notification: notification.alarm_details['StateChangeTime'])
+        alarms: List[Dict[str, Any]] = []
+        app_imaged_alarms: List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]] = []
+        for notification in app_notifications:
+            instance_id: str = notification.alarm_details['AlarmName'][:19]
+            instance: Dict[str, Any] = instances.get(instance_id)
+            alarm: Dict[str, Any] = {'alarm-details': digest_alarm_details(notification.alarm_details),
+                                     'instance-id': instance_id,
+                                     'metric-images-urls': {}}
+            if instance_id in suppress_api_urls:
+                alarm['suppress-api-url'] = suppress_api_urls[instance_id]
+            if instance is not None:
+                alarm['instance-type'] = instance['InstanceType']
+                app_imaged_alarms.append((alarm, notification.alarm_details, instance))
+            alarms.append(alarm)
+        digests_alarms[app] = alarms
+        imaged_alarms.extend(app_imaged_alarms[:digest_top_images])
+    with ThreadPoolExecutor(max_workers=image_workers) as executor:
+        list(executor.map(lambda imaged_alarm: add_digest_metric_images_urls(*imaged_alarm, platforms),
+                          imaged_alarms))
+
+    for app, app_notifications in digests.items():
+        alarms: List[Dict[str, Any]] = digests_alarms[app]
+        out_event: Dict[str, Any] = {'digest': True,
+                                     'app': app,
+                                     'subject': digest_subject(app, len(alarms)),
+                                     'alarms': alarms,
+                                     'function-name': [context.function_name],
+                                     'function-outcome': [os.environ.get('FN_OUTCOME')]}
+        entries.append({
+            'Source': "lambda.amazonaws.com",
+            'DetailType': os.environ.get('NOTIFICATION_FROM_FN'),
+            'Detail': json.dumps(out_event),
+            'EventBusName': os.environ.get('DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME')
+        })
+        entries_notifications.append(app_notifications)
+        print(f'Digest of {len(alarms)} alarms for application {app}.')
+    print(f'Metric image cache: {metric_image_cache.stats()}')
+    metric_image_cache.put_metrics(context.function_name)
+
+    failed_message_ids: List[str] = []
+    failed_entries: List[int] = put_events_in_batches(
+        entries, aws_services['eventbridge_client'])
+    for index, app_notifications in enumerate(entries_notifications):
+        for notification in app_notifications:
+            if index in failed_entries:
+                failed_message_ids.append(notification.message_id)
+            else:
+                notification_cooldown.record(notification.alarm_details['AlarmName'],
+                                             notification.alarm_details['NewStateValue'])
+    print(f'Published {len(entries) - len(failed_entries)} digests out of {len(entries)}.')
+    return batch_item_failures(failed_message_ids)
@@ -1,8 +1,6 @@
 #!/bin/bash +xe
 DEPLOYMENT_PATH="../../../../../deployment/terraform/services/"
-SERVICE="suppress-notifcation-or-generate-metric-images"
+SERVICE="suppress-notification-or-generate-metric-images"
 rm -rf $DEPLOYMENT_PATH/$SERVICE/src
 mkdir -p $DEPLOYMENT_PATH/$SERVICE/src
-mkdir -p $DEPLOYMENT_PATH/$SERVICE/src/util
-cp ../lambda_function.py $DEPLOYMENT_PATH/$SERVICE/src
-cp -rp ../../util/ $DEPLOYMENT_PATH/$SERVICE/src/util
\ No newline at end of file
+cp ../lambda_function.py $DEPLOYMENT_PATH/$SERVICE/src
\ No newline at end of file
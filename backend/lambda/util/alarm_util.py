@@ -0,0 +1,247 @@
+from typing import List, Dict, Any
+
+from rift.credits import launch_credits
+from rift.thresholds import (AlarmConfigurationParams,
+                             apply_compute_intensive_workloads_config,
+                             cpu_credit_balance_threshold,
+                             cpu_utilization_threshold)
+
+alarm_tags: List[Dict[str, str]] = [
+    {
+        'Key': 'App',
+        'Value': 'AutomatedAndDynamicAlarmForCPUCredits'
+    },
+]
+
+
+def cpu_credit_alarm_name(instance_id: str, instance_type: str) -> str:
+    return f'{instance_id}-{instance_type}-CPUCreditBalance-Less-Than-Threshold'
+
+
+def cpu_utilization_alarm_name(instance_id: str, instance_type: str) -> str:
+    return f'{instance_id}-{instance_type}-CPUUtilization-More-Than-Baseline-Percentage'
+
+
+def composite_alarm_name(instance_id: str, instance_type: str) -> str:
+    return f'{instance_id}-{instance_type}-Composite-Alarm-CPUCreditBalance-And-CPUUtilization-Thresholds-Breached'
+
+
+def get_name_tag(tags: List[Dict[str, str]]) -> str:
+    '''Returns the value of the Name tag or an empty string if the instance does not have one.'''
+    for tag in tags or []:
+        if tag['Key'] == 'Name':
+            return tag['Value']
+    return ''
+
+
+def build_cpu_credit_balance_alarm(alarm_name: str,
+                                   instance_id: str,
+                                   instance_type: str,
+                                   credits_used_per_vcpu_per_hour: float,
+                                   period: int,
+                                   datapoints: int,
+                                   evaluation_periods: int,
+                                   instance_class: str) -> Dict[str, Any]:
+    '''
+    This function builds the PutMetricAlarm request of a CPUCreditBalance alarm.
+    The threshold for t2 class is the given launch credit.
+    1 CPU credit = 1 vCPU * 100% utilization * 1 minute.
+    '''
+    desc: str = ''
+    threshold: float = 0.0
+    if instance_class != 't2':
+        threshold = cpu_credit_balance_threshold(
+            instance_type, credits_used_per_vcpu_per_hour)
+        desc = 'Raise alarm when CPUCreditBalance drops below {}'.format(
+            threshold)
+    else:
+        # Use launch credit as threshold
+        threshold = credits_used_per_vcpu_per_hour
+        desc = 'Raise alarm when CPUCreditBalance drops below launch credit: {}'.format(
+            threshold)
+
+    return {
+        'AlarmName': alarm_name,
+        'AlarmDescription': desc,
+        'ActionsEnabled': True,
+        'MetricName': 'CPUCreditBalance',
+        'Namespace': 'AWS/EC2',
+        'Dimensions': [
+            {
+                'Name': 'InstanceId',
+                'Value': instance_id
+            }
+        ],
+        'Statistic': 'Maximum',
+        'Period': period,
+        'Threshold': threshold,
+        'ComparisonOperator': 'LessThanOrEqualToThreshold',
+        'EvaluationPeriods': evaluation_periods,
+        'DatapointsToAlarm': datapoints,
+        'Tags': alarm_tags
+    }
+
+
+def build_cpu_utilization_alarm(alarm_name: str,
+                                instance_id: str,
+                                instance_type: str,
+                                threshold: float,
+                                period: int,
+                                datapoints: int,
+                                evaluation_periods: int) -> Dict[str, Any]:
+    '''This function builds the PutMetricAlarm request of a CPUUtilization alarm.'''
+    desc: str = 'Raise alarm when CPUUtilization is above baseline utlization of instance type {}: {}'.format(
+        instance_type, threshold)
+
+    return {
+        'AlarmName': alarm_name,
+        'AlarmDescription': desc,
+        'ActionsEnabled': True,
+        'MetricName': 'CPUUtilization',
+        'Namespace': 'AWS/EC2',
+        'Dimensions': [
+            {
+                'Name': 'InstanceId',
+                'Value': instance_id
+            }
+        ],
+        'Statistic': 'Maximum',
+        'Period': period,
+        'Threshold': threshold,
+        'ComparisonOperator': 'GreaterThanOrEqualToThreshold',
+        'EvaluationPeriods': evaluation_periods,
+        'DatapointsToAlarm': datapoints,
+        'Tags': alarm_tags
+    }
+
+
+def build_composite_alarm(instance_id: str,
+                          instance_type: str,
+                          cpu_credit_alarm_name: str,
+                          cpu_utilization_alarm_name: str,
+                          action: List[str]) -> Dict[str, Any]:
+    '''This function builds the PutCompositeAlarm request of the composite alarm of an instance.'''
+    return {
+        'ActionsEnabled': True,
+        'AlarmActions': action,
+        'AlarmDescription': f'Composite alarm for {cpu_credit_alarm_name} and {cpu_utilization_alarm_name}',
+        'AlarmName': composite_alarm_name(instance_id, instance_type),
+        'AlarmRule': f'ALARM({cpu_credit_alarm_name}) AND ALARM({cpu_utilization_alarm_name})',
+        'Tags': alarm_tags
+    }
+
+
+def build_instance_alarms(instance_id: str,
+                          instance_type: str,
+                          name: str,
+                          config: AlarmConfigurationParams,
+                          action: List[str]) -> List[Dict[str, Any]]:
+    '''
+    This function builds the cpu credit, cpu utilization and composite alarm requests of an instance,
+    with the same threshold logic as the create alarm functions.
+    The composite alarm is the last one as it refers to the other two.
+    '''
+    # Work on a copy as the config may be shared by more than one instance.
+    config = apply_compute_intensive_workloads_config(AlarmConfigurationParams(config.threshold,
+                                                                               config.period,
+                                                                               config.datapoints,
+                                                                               config.evaluation_periods), name)
+    instance_class: str = instance_type[:2]
+    credit_alarm_name: str = cpu_credit_alarm_name(instance_id, instance_type)
+    utilization_alarm_name: str = cpu_utilization_alarm_name(
+        instance_id, instance_type)
+    credits_threshold: float = launch_credits[instance_type] if instance_class == 't2' else float(
+        config.threshold)
+    return [build_cpu_credit_balance_alarm(credit_alarm_name,
+                                           instance_id,
+                                           instance_type,
+                                           credits_threshold,
+                                           int(config.period),
+                                           int(config.datapoints),
+                                           int(config.evaluation_periods),
+                                           instance_class),
+            build_cpu_utilization_alarm(utilization_alarm_name,
+                                        instance_id,
+                                        instance_type,
+                                        cpu_utilization_threshold(instance_type),
+                                        int(config.period),
+                                        int(config.datapoints),
+                                        int(config.evaluation_periods)),
+            build_composite_alarm(instance_id,
+                                  instance_type,
+                                  credit_alarm_name,
+                                  utilization_alarm_name,
+                                  action)]
+
+
+def put_metric_alarm(alarm: Dict[str, Any], cloudwatch_client) -> Dict[str, Any]:
+    '''
+    This function creates or updates a metric alarm.
+    If the alarm does not exist a new alarm is created or else existing alarm is updated.
+    '''
+    api_response: Dict[str, Any] = None
+    try:
+        api_response = cloudwatch_client.put_metric_alarm(**alarm)
+        print(f'Response:{api_response}')
+    except Exception as err:
+        print(err)
+        print(f'Failed {alarm["AlarmName"]} because of above error')
+    else:
+        if api_response['ResponseMetadata']['HTTPStatusCode'] == 200:
+            print(f'Successfully created/updated alarm {alarm["AlarmName"]}')
+    return api_response
+
+
+def put_cpu_credit_balance_alarm_for_below_th(alarm_name: str,
+                                              instance_id: str,
+                                              instance_type: str,
+                                              credits_used_per_vcpu_per_hour: float,
+                                              period: int,
+                                              datapoints: int,
+                                              evaluation_periods: int,
+                                              instance_class: str,
+                                              cloudwatch_client) -> Dict[str, Any]:
+    '''This function creates or updates a CPUCreditBalance alarm.'''
+    return put_metric_alarm(build_cpu_credit_balance_alarm(alarm_name,
+                                                           instance_id,
+                                                           instance_type,
+                                                           credits_used_per_vcpu_per_hour,
+                                                           period,
+                                                           datapoints,
+                                                           evaluation_periods,
+                                                           instance_class), cloudwatch_client)
+
+
+def put_cpu_utilization_alarm_for_below_th(alarm_name: str,
+                                           instance_id: str,
+                                           instance_type: str,
+                                           threshold: float,
+                                           period: int,
+                                           datapoints: int,
+                                           evaluation_periods: int,
+                                           cloudwatch_client) -> Dict[str, Any]:
+    '''This function creates or updates a CPUUtilization alarm.'''
+    return put_metric_alarm(build_cpu_utilization_alarm(alarm_name,
+                                                        instance_id,
+                                                        instance_type,
+                                                        threshold,
+                                                        period,
+                                                        datapoints,
+                                                        evaluation_periods), cloudwatch_client)
+
+
+def put_composite_alarm(instance_id: str,
+                        instance_type: str,
+                        cpu_credit_alarm_name: str,
+                        cpu_utilization_alarm_name: str,
+                        action: List[str],
+                        cloudwatch_client) -> Dict[str, Any]:
+    '''This function creates or updates the composite alarm of an instance.'''
+    alarm: Dict[str, Any] = build_composite_alarm(instance_id,
+                                                  instance_type,
+                                                  cpu_credit_alarm_name,
+                                                  cpu_utilization_alarm_name,
+                                                  action)
+    alarm_created_response = cloudwatch_client.put_composite_alarm(**alarm)
+    print(f'{alarm_created_response}')
+    return alarm_created_response
@@ -0,0 +1,124 @@
+import time
+import threading
+from typing import List, Dict, Any, Callable
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from botocore.exceptions import ClientError, BotoCoreError
+
+THROTTLING_ERROR_CODES: List[str] = ['Throttling', 'ThrottlingException', 'RequestLimitExceeded']
+
+
+class RateLimiter:
+    '''Spaces the calls of all the worker threads so no more than the given number start in a second.'''
+
+    def __init__(self, calls_per_second: float):
+        self.interval = 1.0 / calls_per_second
+        self.next_call_at: float = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now: float = time.monotonic()
+            call_at: float = max(now, self.next_call_at)
+            self.next_call_at = call_at + self.interval
+        if call_at > now:
+            time.sleep(call_at - now)
+
+
+class AlarmWriter:
+    '''
+    Writes alarms with PutMetricAlarm and PutCompositeAlarm from a bounded pool of threads.
+    The alarms of an instance are written in order by one thread, so a composite alarm is written
+    after the metric alarms it refers to. The calls are rate limited to the CloudWatch TPS of the account.
+    Progress, throughput and throttles are printed while the alarms are written.
+    An alarm which fails, with an API error or a connection error, is counted as failed with its name
+    and the run goes on, so it always finishes with a summary.
+    '''
+
+    def __init__(self, cloudwatch_client, max_workers: int, calls_per_second: float, progress_interval_seconds: float = 10):
+        self.cloudwatch_client = cloudwatch_client
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(calls_per_second)
+        self.progress_interval_seconds = progress_interval_seconds
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {'instances': 0,
+                                         'written': 0,
+                                         'failed': 0,
+                                         'throttled': 0,
+                                         'skipped': 0}
+        self.failed_alarms: List[str] = []
+
+    def write_alarm(self, alarm: Dict[str, Any]) -> bool:
+        self.rate_limiter.acquire()
+        try:
+            if 'AlarmRule' in alarm:
+                response = self.cloudwatch_client.put_composite_alarm(**alarm)
+            else:
+                response = self.cloudwatch_client.put_metric_alarm(**alarm)
+        except (ClientError, BotoCoreError) as err:
+            print(err)
+            print(f'Failed {alarm["AlarmName"]} because of above error')
+            with self.lock:
+                if isinstance(err, ClientError) and err.response['Error']['Code'] in THROTTLING_ERROR_CODES:
+                    self.counters['throttled'] += 1
+            return False
+        # The retries of the botocore standard mode are mostly throttles.
+        retries: int = response['ResponseMetadata'].get('RetryAttempts', 0)
+        if retries != 0:
+            with self.lock:
+                self.counters['throttled'] += retries
+        return True
+
+    def write_instance_alarms(self, alarms: List[Dict[str, Any]]):
+        written: int = 0
+        for index, alarm in enumerate(alarms):
+            if not self.write_alarm(alarm):
+                # Do not write the composite alarm of a failed metric alarm.
+                failed: int = len(alarms) - index
+                break
+            written += 1
+        else:
+            failed = 0
+        with self.lock:
+            self.counters['instances'] += 1
+            self.counters['written'] += written
+            self.counters['failed'] += failed
+            self.failed_alarms.extend(alarm['AlarmName'] for alarm in alarms[written:])
+
+    def write(self, instances_alarms, time_left_in_seconds: Callable[[], float] = None) -> Dict[str, Any]:
+        '''
+        Write the alarms of each instance, an iterable of lists of alarm requests.
+        No new instance is started once time_left_in_seconds drops below a minute, so the function
+        can report what was skipped instead of timing out. Returns the counters, the throughput and the names of the failed alarms.
+        '''
+        started_at: float = time.monotonic()
+        progress_printed_at: float = started_at
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for alarms in instances_alarms:
+                if time_left_in_seconds is not None and time_left_in_seconds() < 60:
+                    with self.lock:
+                        self.counters['skipped'] += len(alarms)
+                    continue
+                if len(in_flight) >= self.max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                in_flight.add(executor.submit(self.write_instance_alarms, alarms))
+                if time.monotonic() - progress_printed_at >= self.progress_interval_seconds:
+                    progress_printed_at = time.monotonic()
+                    print(f'Progress: {self.stats(started_at)}')
+            for future in wait(in_flight).done:
+                future.result()
+        summary: Dict[str, Any] = self.stats(started_at)
+        summary['failed-alarms'] = list(self.failed_alarms)
+        print(f'Completed: {summary}')
+        return summary
+
+    def stats(self, started_at: float) -> Dict[str, Any]:
+        with self.lock:
+            summary: Dict[str, Any] = dict(self.counters)
+        elapsed_seconds: float = time.monotonic() - started_at
+        summary['elapsed-seconds'] = round(elapsed_seconds, 1)
+        summary['alarms-per-second'] = round(
+            summary['written'] / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0
+        return summary
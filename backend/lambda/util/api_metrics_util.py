@@ -0,0 +1,169 @@
+import os
+import time
+import threading
+from functools import wraps, partial
+from urllib.parse import urlencode
+from typing import List, Dict, Any
+
+from .metrics_util import put_emf_metrics
+
+# Error codes with which the AWS APIs throttle a call, as the botocore standard retry mode classifies them.
+THROTTLING_ERROR_CODES: List[str] = ['Throttling',
+                                     'ThrottlingException',
+                                     'ThrottledException',
+                                     'RequestThrottledException',
+                                     'TooManyRequestsException',
+                                     'ProvisionedThroughputExceededException',
+                                     'TransactionInProgressException',
+                                     'RequestLimitExceeded',
+                                     'BandwidthLimitExceeded',
+                                     'LimitExceededException',
+                                     'RequestThrottled',
+                                     'SlowDown',
+                                     'PriorRequestNotComplete',
+                                     'EC2ThrottledException']
+# An embedded metric format record holds at most 100 values of a metric.
+EMF_VALUES_LIMIT = 100
+# Key of the call in the request context botocore passes to the event hooks.
+CONTEXT_KEY = 'rift-api-call'
+
+
+def payload_size(body) -> int:
+    '''Size in bytes of the body of a request, the query protocols still hold it as a dict at this point.'''
+    if body is None:
+        return 0
+    if isinstance(body, dict):
+        return len(urlencode(body, doseq=True))
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return 0
+
+
+class ApiCallRecorder:
+    '''
+    Records the AWS API calls of the clients of the registry with botocore event hooks: the latency of each call,
+    retries included, the retry attempts, the throttling error codes of the attempts, the errors and the size of
+    the request payload, per operation. The records are emitted in the embedded metric format once per invocation,
+    tagged with the function name and the deployment ID, and cleared. It is opt-in as it adds a few metric lines
+    per operation to every invocation.
+    '''
+
+    def __init__(self, enabled: bool, deployment_id: str):
+        self.enabled = enabled
+        self.deployment_id = deployment_id
+        self.lock = threading.Lock()
+        self.operations: Dict[str, Dict[str, Any]] = {}
+
+    def instrument(self, service):
+        '''Register the hooks on a client, or on the client of a resource. Nothing is registered when disabled.'''
+        if not self.enabled:
+            return
+        client = getattr(service.meta, 'client', service)
+        service_name: str = client.meta.service_model.service_name
+        client.meta.events.register('before-call', partial(self.before_call, service_name))
+        client.meta.events.register('response-received', self.response_received)
+        client.meta.events.register('after-call', self.after_call)
+        client.meta.events.register('after-call-error', self.after_call_error)
+
+    def before_call(self, service_name: str, model, params: Dict[str, Any], context: Dict[str, Any], **kwargs):
+        context[CONTEXT_KEY] = {'operation': f'{service_name}.{model.name}',
+                                'started-at': time.perf_counter(),
+                                'attempts': 0,
+                                'throttle-codes': [],
+                                'request-bytes': payload_size(params.get('body'))}
+
+    def response_received(self, parsed_response: Dict[str, Any], context: Dict[str, Any], **kwargs):
+        '''Called after each attempt of the call.'''
+        call: Dict[str, Any] = context.get(CONTEXT_KEY)
+        if call is None:
+            return
+        call['attempts'] += 1
+        error_code: str = (parsed_response or {}).get('Error', {}).get('Code')
+        if error_code in THROTTLING_ERROR_CODES:
+            call['throttle-codes'].append(error_code)
+
+    def after_call(self, http_response, parsed: Dict[str, Any], context: Dict[str, Any], **kwargs):
+        call: Dict[str, Any] = context.get(CONTEXT_KEY)
+        if call is not None:
+            # Older botocore versions do not emit response-received, the response still has the retries.
+            retries: int = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            call['attempts'] = max(call['attempts'], retries + 1)
+        self.record(context, http_response.status_code >= 300)
+
+    def after_call_error(self, context: Dict[str, Any], **kwargs):
+        self.record(context, True)
+
+    def record(self, context: Dict[str, Any], failed: bool):
+        call: Dict[str, Any] = context.pop(CONTEXT_KEY, None)
+        if call is None:
+            return
+        milliseconds: float = (time.perf_counter() - call['started-at']) * 1000
+        with self.lock:
+            operation: Dict[str, Any] = self.operations.setdefault(call['operation'], {'calls': 0,
+                                                                                     'retries': 0,
+                                                                                     'throttles': 0,
+                                                                                     'errors': 0,
+                                                                                     'request-bytes': 0,
+                                                                                     'throttle-codes': {},
+                                                                                     'milliseconds': []})
+            operation['calls'] += 1
+            operation['retries'] += max(0, call['attempts'] - 1)
+            operation['throttles'] += len(call['throttle-codes'])
+            operation['errors'] += 1 if failed else 0
+            operation['request-bytes'] += call['request-bytes']
+            for code in call['throttle-codes']:
+                operation['throttle-codes'][code] = operation['throttle-codes'].get(code, 0) + 1
+            operation['milliseconds'].append(round(milliseconds, 1))
+
+    def take_operations(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            operations, self.operations = self.operations, {}
+        return operations
+
+    def put_metrics(self, function_name: str):
+        '''Print the calls of the invocation per operation and emit them as metrics.'''
+        operations: Dict[str, Dict[str, Any]] = self.take_operations()
+        if len(operations) == 0:
+            return
+        summary: Dict[str, Dict[str, Any]] = {name: {key: value for key, value in operation.items() if key != 'milliseconds'}
+                                              for name, operation in operations.items()}
+        print(f'API calls: {summary}')
+        for name, operation in operations.items():
+            dimensions: Dict[str, str] = {'FunctionName': function_name,
+                                          'DeploymentId': self.deployment_id,
+                                          'Operation': name}
+            put_emf_metrics({'ApiCalls': operation['calls'],
+                             'ApiRetries': operation['retries'],
+                             'ApiThrottles': operation['throttles'],
+                             'ApiErrors': operation['errors']},
+                            dimensions)
+            put_emf_metrics({'ApiRequestBytes': operation['request-bytes']},
+                            dimensions,
+                            unit='Bytes')
+            for offset in range(0, len(operation['milliseconds']), EMF_VALUES_LIMIT):
+                put_emf_metrics({'ApiLatencyMilliseconds': operation['milliseconds'][offset:offset + EMF_VALUES_LIMIT]},
+                                dimensions,
+                                unit='Milliseconds')
+
+
+api_call_recorder = ApiCallRecorder(os.environ.get('API_METRICS', 'false').lower() == 'true',
+                                    os.environ.get('DEPLOYMENT_ID', 'unknown'))
+
+
+def put_api_metrics_at_exit(handler):
+    '''
+    Decorate a lambda handler to emit the API call metrics of each invocation when it returns.
+    The handler is returned as is when the API metrics are not enabled.
+    '''
+    if not api_call_recorder.enabled:
+        return handler
+
+    @wraps(handler)
+    def wrapper(event, context):
+        try:
+            return handler(event, context)
+        finally:
+            api_call_recorder.put_metrics(getattr(context, 'function_name', 'unknown'))
+    return wrapper
@@ -0,0 +1,41 @@
+import json
+from typing import List, Dict, Any
+from collections import namedtuple
+from rift.instance_cache import event_timestamp
+
+StateChangeRecord = namedtuple(
+    'StateChangeRecord', ['message_id', 'instance_id', 'state', 'time'])
+
+
+def is_batch_event(event: Dict[str, Any]) -> bool:
+    '''The function is invoked with a batch of SQS records in the batched intake mode.'''
+    return 'Records' in event
+
+
+def parse_state_change_records(event: Dict[str, Any]) -> List[StateChangeRecord]:
+    '''
+    Get the instance id, state and time of the EC2 Instance State-change Notification events buffered in the queue.
+    The body of each SQS record is the event put by the EventBridge rule.
+    '''
+    state_change_records: List[StateChangeRecord] = []
+    for record in event['Records']:
+        body: Dict[str, Any] = json.loads(record['body'])
+        state_change_records.append(StateChangeRecord(record['messageId'],
+                                                      body['detail']['instance-id'],
+                                                      body['detail']['state'],
+                                                      event_timestamp(body)))
+    return state_change_records
+
+
+def chunks(items: List[Any], size: int):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def batch_item_failures(message_ids: List[str]) -> Dict[str, Any]:
+    '''
+    Build the partial batch response so only the failed messages are retried by the SQS event source mapping.
+    The event source mapping needs ReportBatchItemFailures in its function response types.
+    '''
+    return {'batchItemFailures': [{'itemIdentifier': message_id}
+                                  for message_id in dict.fromkeys(message_ids)]}
@@ -0,0 +1,109 @@
+import time
+import threading
+import boto3
+from functools import wraps
+from typing import Dict, Any
+from botocore.config import Config
+
+from .metrics_util import put_emf_metrics
+from .api_metrics_util import api_call_recorder
+
+custom_boto3_config = Config(
+    retries={
+        'max_attempts': 10,
+        'mode': 'standard'
+    }
+)
+
+# Keys of the registry whose service name is not the boto3 one.
+SERVICE_ALIASES: Dict[str, str] = {'eventbridge': 'events',
+                                   'cw_events': 'events'}
+
+
+class ClientRegistry:
+    '''
+    Creates the boto3 clients and resources on first use from one session and the shared config,
+    so a cold start only pays for the clients its invocation needs. The keys are the ones of the
+    aws_services dicts of the functions, '<service>_client' or '<service>_resource'.
+    The API calls of the clients are recorded when the API metrics are enabled.
+    The time spent importing the function and creating each client is recorded for the cold start report.
+    '''
+
+    def __init__(self, config: Config = custom_boto3_config):
+        self.config = config
+        self.session = None
+        self.services: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+        self.reported = False
+
+    def __getitem__(self, key: str):
+        service = self.services.get(key)
+        if service is None:
+            # The clients are shared by the worker threads of the functions.
+            with self.lock:
+                service = self.services.get(key)
+                if service is None:
+                    service = self.create(key)
+                    self.services[key] = service
+        return service
+
+    def __setitem__(self, key: str, service):
+        '''Put a client which is already created, e.g. a fake one in tests.'''
+        self.services[key] = service
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.services
+
+    def create(self, key: str):
+        service_name, _, kind = key.rpartition('_')
+        if kind not in ['client', 'resource'] or service_name == '':
+            raise KeyError(key)
+        if self.session is None:
+            started_at: float = time.perf_counter()
+            self.session = boto3.session.Session()
+            self.timings['session'] = time.perf_counter() - started_at
+        started_at = time.perf_counter()
+        factory = self.session.client if kind == 'client' else self.session.resource
+        service = factory(SERVICE_ALIASES.get(service_name, service_name),
+                          config=self.config)
+        api_call_recorder.instrument(service)
+        self.timings[key] = time.perf_counter() - started_at
+        return service
+
+    def record_imports(self, started_at: float):
+        '''Record the time since the function started importing its modules.'''
+        self.timings['imports'] = time.perf_counter() - started_at
+
+    def report(self, function_name: str):
+        '''Print the init time breakdown in milliseconds and emit it as metrics once per execution environment.'''
+        self.reported = True
+        breakdown: Dict[str, float] = {name: round(seconds * 1000, 1)
+                                       for name, seconds in self.timings.items()}
+        print(f'Cold start breakdown in ms: {breakdown}')
+        clients_init: float = sum(milliseconds for name, milliseconds in breakdown.items()
+                                  if name not in ['imports', 'first-invocation'])
+        put_emf_metrics({'ImportMilliseconds': breakdown.get('imports', 0.0),
+                         'ClientsInitMilliseconds': round(clients_init, 1),
+                         'FirstInvocationMilliseconds': breakdown.get('first-invocation', 0.0)},
+                        {'FunctionName': function_name},
+                        unit='Milliseconds')
+
+
+aws_services = ClientRegistry()
+
+
+def report_cold_start(handler):
+    '''Decorate a lambda handler to report the cold start breakdown after its first invocation.'''
+    @wraps(handler)
+    def wrapper(event, context):
+        if aws_services.reported:
+            return handler(event, context)
+        started_at: float = time.perf_counter()
+        try:
+            return handler(event, context)
+        finally:
+            # The first invocation includes the clients created on first use.
+            aws_services.timings['first-invocation'] = time.perf_counter() - started_at
+            aws_services.report(getattr(context, 'function_name', 'unknown'))
+    return wrapper
@@ -4,19 +4,26 @@ from botocore.exceptions import ClientError
 from typing import Dict, Any, List
 from pprint import pprint
 from datetime import datetime, timedelta
-import uuid
+import time
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from .create_processes_metric_image_util import generate_processes_metrics_image
+from .metric_image_cache_util import metric_image_cache, upload_image_to_s3
 
 AlarmStateChangeData = namedtuple('AlarmStateChangeData', [
                                   'period', 'queryDate', 'recentDatapoints', 'startDate', 'statistic', 'threshold', 'version','evaluatedDatapoints'])
 
 INSTANCE_ID = slice(0, 19)
+# Time given to each image to be rendered and uploaded. A slower image is dropped from the notification.
+METRIC_IMAGE_DEADLINE_SECONDS = float(
+    os.environ.get('METRIC_IMAGE_DEADLINE_SECONDS', 8))
 
 def create_metric_images_urls(alarm_details, metric_names, aws_services, instance_type):
     '''
     This function generates metric images.
+    The images are rendered and uploaded concurrently. An image which fails or is not ready by the deadline
+    is left out, so the notification is not held back by one slow image.
     '''
     metric_images_urls: Dict[str, str] = {}
     try:
@@ -25,14 +32,30 @@ def create_metric_images_urls(alarm_details, metric_names, aws_services, instanc
 
         metric_alarms_new_state_details: Dict[str, Any] = get_alarms_new_state_data(
             alarm_details, aws_services)
+        # Do not use the executor as a context manager, it would wait for the images which missed the deadline.
+        executor = ThreadPoolExecutor(max_workers=len(metric_names))
+        futures: Dict[str, Any] = {}
         for name in metric_names:
-            image_url = generate_processes_metrics_image(instance_type, instance_id, name, metric_alarms_new_state_details['CPUUtilization'], aws_services) \
-                if 'procstat' in name else generate_metric_image(instance_id, name, metric_alarms_new_state_details[name], aws_services)
-
+            futures[name] = executor.submit(generate_processes_metrics_image, instance_type, instance_id, name, metric_alarms_new_state_details['CPUUtilization'], aws_services) \
+                if 'procstat' in name else executor.submit(generate_metric_image, instance_id, name, metric_alarms_new_state_details[name], aws_services)
+        executor.shutdown(wait=False)
+
+        deadline: float = time.monotonic() + METRIC_IMAGE_DEADLINE_SECONDS
+        for name, future in futures.items():
+            try:
+                image_url = future.result(
+                    timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                print(f'Dropped {name} metric image of instance {instance_id} as it was not ready in {METRIC_IMAGE_DEADLINE_SECONDS} seconds.')
+                continue
+            except Exception as err:
+                print(err)
+                print(f'Dropped {name} metric image of instance {instance_id} because of above error.')
+                continue
             print(f'{name} metric image url of instance {instance_id}.')
             print(f'{image_url}')
             if image_url is not None:
-                metric_images_urls[name] = image_url 
+                metric_images_urls[name] = image_url
 
     except (Exception, ClientError) as err:
         print(err)
@@ -44,48 +67,91 @@ def create_metric_images_urls(alarm_details, metric_names, aws_services, instanc
 
 
 def get_alarms_new_state_data(alarm_details: Dict[str, Any], aws_services: Dict[str, Any]) -> Dict[str, Any]:
-    print('Get alarms history.')
-    cloudwatch_resource = aws_services['cloudwatch_resource']
+    '''
+    Get the reason and data of the ALARM state of the child alarms which triggered the composite alarm.
+    The states of all the children are fetched with one DescribeAlarms call and cached by the alarm name
+    and the time of the state update. The history is read only for a child whose state moved on since it triggered the composite alarm.
+    '''
+    print('Get alarms state.')
+    cloudwatch_client = aws_services['cloudwatch_client']
     child_alarms_details: List[Dict[str, Any]
                                ] = alarm_details['TriggeringChildren']
-    alarm_names: List[str] = []
-    today = datetime.utcnow()
-    year, month, day = today.year, today.month, today.day
+    triggered_at: Dict[str, datetime] = {}
     alarms_new_state: Dict[str, Any] = {}
     try:
         for alarm in child_alarms_details:
             _, _, _, _, _, _, alarm_name = alarm['Arn'].split(':')
-            alarm_names.append(alarm_name)
+            triggered_at[alarm_name] = parse_alarm_timestamp(
+                alarm.get('State', {}).get('Timestamp') or alarm_details['StateChangeTime'])
+        alarm_names: List[str] = list(triggered_at)
         print(alarm_names)
-        for alarm_name in alarm_names:
-            alarm = cloudwatch_resource.Alarm(alarm_name)
-            history: Dict[str, Any] = alarm.describe_history(AlarmTypes=[
-                'MetricAlarm',
-            ],
-                HistoryItemType='StateUpdate',
-                #StartDate=datetime(year, month, day),
-                #EndDate=datetime.utcnow(),
-                MaxRecords=1,#Get the record of transition from OK to ALARM.
-                ScanBy='TimestampDescending')
-
-            for item in history['AlarmHistoryItems']:
-                print(item['AlarmName'])
-                history_data: Dict[str, Any] = json.loads(item['HistoryData'])
-                print(history_data)
-                new_state_data: Dict[str, Any] = history_data['newState'][
-                    'stateReasonData'] if history_data['newState']['stateValue'] == 'ALARM' else None
-                if new_state_data is not None:
-                    alarms_new_state['CPUUtilization' if 'CPUUtilization' in alarm_name else 'CPUCreditBalance'] = {'stateReason': history_data['newState']['stateReason'],
-                                                                                                                    'stateReasonData': AlarmStateChangeData(**new_state_data)}
+        response: Dict[str, Any] = cloudwatch_client.describe_alarms(
+            AlarmNames=alarm_names,
+            AlarmTypes=['MetricAlarm'])
+        for alarm in response['MetricAlarms']:
+            alarm_name: str = alarm['AlarmName']
+            new_state: Dict[str, Any] = None
+            if alarm['StateValue'] == 'ALARM' and alarm['StateUpdatedTimestamp'] <= triggered_at[alarm_name]:
+                new_state = get_cached_alarm_state(alarm)
+            else:
+                print(f'State of {alarm_name} moved on to {alarm["StateValue"]}, read it from the history.')
+                new_state = get_alarm_state_from_history(
+                    alarm_name, triggered_at[alarm_name], cloudwatch_client)
+            if new_state is not None:
+                alarms_new_state['CPUUtilization' if 'CPUUtilization' in alarm_name else 'CPUCreditBalance'] = new_state
 
     except Exception as err:
         print(err)
         print(
-            f'Failed to retrieve new state data of {alarm_names} from  history.')
+            f'Failed to retrieve new state data of {list(triggered_at)}.')
     pprint(alarms_new_state)
     return alarms_new_state
 
 
+# States of the alarms keyed by the alarm name and the time of the state update. They are kept across warm invocations.
+ALARM_STATES_CACHE_MAX_ENTRIES = 1024
+alarm_states_cache: Dict[Any, Dict[str, Any]] = {}
+
+
+def get_cached_alarm_state(alarm: Dict[str, Any]) -> Dict[str, Any]:
+    key = (alarm['AlarmName'], alarm['StateUpdatedTimestamp'])
+    if key not in alarm_states_cache:
+        if len(alarm_states_cache) >= ALARM_STATES_CACHE_MAX_ENTRIES:
+            alarm_states_cache.clear()
+        alarm_states_cache[key] = {'stateReason': alarm['StateReason'],
+                                   'stateReasonData': alarm_state_change_data(json.loads(alarm['StateReasonData']))}
+    return alarm_states_cache[key]
+
+
+def get_alarm_state_from_history(alarm_name: str, triggered_at: datetime, cloudwatch_client) -> Dict[str, Any]:
+    '''Get the last transition to ALARM up to the time the alarm triggered the composite alarm.'''
+    history: Dict[str, Any] = cloudwatch_client.describe_alarm_history(AlarmName=alarm_name,
+                                                                      AlarmTypes=[
+                                                                          'MetricAlarm',
+                                                                      ],
+                                                                      HistoryItemType='StateUpdate',
+                                                                      EndDate=triggered_at +
+                                                                      timedelta(
+                                                                          seconds=1),
+                                                                      MaxRecords=10,
+                                                                      ScanBy='TimestampDescending')
+    for item in history['AlarmHistoryItems']:
+        history_data: Dict[str, Any] = json.loads(item['HistoryData'])
+        if history_data['newState']['stateValue'] == 'ALARM':
+            return {'stateReason': history_data['newState']['stateReason'],
+                    'stateReasonData': alarm_state_change_data(history_data['newState']['stateReasonData'])}
+    return None
+
+
+def alarm_state_change_data(state_reason_data: Dict[str, Any]) -> AlarmStateChangeData:
+    return AlarmStateChangeData(**{field: state_reason_data.get(field) for field in AlarmStateChangeData._fields})
+
+
+def parse_alarm_timestamp(timestamp: str) -> datetime:
+    '''The timestamps of the alarm notification look like 2021-09-06T05:25:41.493+0000.'''
+    return datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%f%z')
+
+
 def generate_metric_image(instance_id: str, metric_name: str, alarm_new_state: Dict[str, Any], aws_services: Dict[str, Any]) -> str:
     try:
         aws_region: str = os.environ.get('AWS_REGION')
@@ -145,31 +211,19 @@ def generate_metric_image(instance_id: str, metric_name: str, alarm_new_state: D
 
         }
         print(f'{metric_request}')
-        response = cloudwatch_client.get_metric_widget_image(
-            MetricWidget=json.dumps(metric_request)
-            # OutputFormat='string'
-        )
-        image_name: str = f'{uuid.uuid4().hex}.jpeg'
-        upload_image_to_s3(
-            image_name, response["MetricWidgetImage"], aws_services)
+        image_name: str = metric_image_cache.image_name(
+            metric_request, alarm_new_state['stateReasonData'].queryDate)
+        if metric_image_cache.exists(image_name, aws_services['s3_client']):
+            print(f'Reuse the cached image {image_name}.')
+        else:
+            response = cloudwatch_client.get_metric_widget_image(
+                MetricWidget=json.dumps(metric_request)
+                # OutputFormat='string'
+            )
+            if upload_image_to_s3(image_name, response["MetricWidgetImage"], aws_services):
+                metric_image_cache.add(image_name)
     except Exception as err:
         print(err)
         print('Failed because of above error.')
     else:
         return f'https://{s3_bucket}.s3-{aws_region}.amazonaws.com/{image_name}'
-
-
-def upload_image_to_s3(image_name: str, image: bytearray, aws_services: Dict[str, Any]):
-    try:
-
-        s3_resource = aws_services['s3_resource']
-        s3_bucket: str = os.environ.get('S3_BUCKET_TO_STORE_GENERATED_IMAGES')
-        bucket = s3_resource.Bucket(f'{s3_bucket}')
-        bucket.put_object(Key=image_name,
-                          ACL='public-read',
-                          Body=image,
-                          ContentType='image/jpeg'
-                          )
-    except Exception as err:
-        print(err)
-        print('Failed because of above error')
@@ -1,39 +1,39 @@
 import json
 import os
-import boto3
+import math
+import time
 from botocore.exceptions import ClientError
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from pprint import pprint
-from datetime import datetime
-import uuid
+from datetime import datetime, timezone
 
+from .metric_image_cache_util import metric_image_cache, upload_image_to_s3
 
-def get_metrics_metadata(instance_id: str, metric_name: str, instance_type: str, aws_services: Dict[str, Any]):
+# Number of processes in the image.
+PROCESSES_IMAGE_TOP_K = int(os.environ.get('PROCESSES_IMAGE_TOP_K', 10))
+# GetMetricData accepts at most 500 queries in one call.
+GET_METRIC_DATA_QUERIES_LIMIT = 500
+PROCESSES_METRICS_CACHE_TTL_SECONDS = float(
+    os.environ.get('PROCESSES_METRICS_CACHE_TTL_SECONDS', 900))
+PROCESSES_METRICS_CACHE_MAX_ENTRIES = 256
+# Metrics of the processes keyed by instance id, instance type and metric name.
+processes_metrics_cache: Dict[Tuple[str, str, str], Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def get_metrics_metadata(instance_id: str, metric_name: str, instance_type: str, aws_services: Dict[str, Any],
+                         start_time: datetime, end_time: datetime):
     '''
     This function generates metric images for cpu usage of processes.
+    Only the processes with the highest peak usage between the start and end time are in the image.
     '''
     try:
         cloudwatch_client = aws_services['cloudwatch_client']
-        response = cloudwatch_client.list_metrics(
-            Namespace='CWAgent',
-            MetricName=f'{metric_name}',
-            Dimensions=[
-                {
-                    'Name': 'InstanceId',
-                    'Value': f'{instance_id}'
-                },
-                {
-                    'Name': 'InstanceType',
-                    'Value': f'{instance_type}'
-                },
-                {
-                    'Name': 'exe',
-                    'Value': '.*'
-                }
-            ]
-        )
+        metrics: List[Dict[str, Any]] = list_processes_metrics(
+            instance_id, metric_name, instance_type, cloudwatch_client)
+        metrics = top_processes_metrics(
+            metrics, start_time, end_time, cloudwatch_client)
         metrics_metadata: List[List[Any]] = []
-        for metric_info in response['Metrics']:
+        for metric_info in metrics:
             metric_dimension: List[str] = [
                 metric_info['Namespace'], metric_info['MetricName']]
             for dimension in metric_info['Dimensions']:
@@ -53,16 +53,87 @@ def get_metrics_metadata(instance_id: str, metric_name: str, instance_type: str,
         return metrics_metadata
 
 
+def list_processes_metrics(instance_id: str, metric_name: str, instance_type: str, cloudwatch_client) -> List[Dict[str, Any]]:
+    '''
+    List the metrics of all the processes of the instance. All the pages are followed.
+    The list is cached per instance across warm invocations as the processes of an instance rarely change between alarms.
+    '''
+    key: Tuple[str, str, str] = (instance_id, instance_type, metric_name)
+    cached_metrics = processes_metrics_cache.get(key)
+    if cached_metrics is not None and cached_metrics[0] > time.monotonic():
+        return cached_metrics[1]
+    metrics: List[Dict[str, Any]] = []
+    paginator = cloudwatch_client.get_paginator('list_metrics')
+    for page in paginator.paginate(Namespace='CWAgent',
+                                   MetricName=f'{metric_name}',
+                                   Dimensions=[
+                                       {
+                                           'Name': 'InstanceId',
+                                           'Value': f'{instance_id}'
+                                       },
+                                       {
+                                           'Name': 'InstanceType',
+                                           'Value': f'{instance_type}'
+                                       },
+                                       {
+                                           # Any process.
+                                           'Name': 'exe'
+                                       }
+                                   ]):
+        metrics.extend(page['Metrics'])
+    if len(processes_metrics_cache) >= PROCESSES_METRICS_CACHE_MAX_ENTRIES:
+        processes_metrics_cache.clear()
+    processes_metrics_cache[key] = (
+        time.monotonic() + PROCESSES_METRICS_CACHE_TTL_SECONDS, metrics)
+    return metrics
+
+
+def top_processes_metrics(metrics: List[Dict[str, Any]], start_time: datetime, end_time: datetime, cloudwatch_client) -> List[Dict[str, Any]]:
+    '''
+    Pick the metrics of the processes with the highest peak usage between the start and end time.
+    The peaks are read with GetMetricData, up to 500 metrics per call, with one period covering the whole time.
+    '''
+    if len(metrics) <= PROCESSES_IMAGE_TOP_K:
+        return metrics
+    period: int = max(60, math.ceil(
+        (end_time - start_time).total_seconds() / 60) * 60)
+    peaks: Dict[int, float] = {}
+    paginator = cloudwatch_client.get_paginator('get_metric_data')
+    for offset in range(0, len(metrics), GET_METRIC_DATA_QUERIES_LIMIT):
+        metric_data_queries: List[Dict[str, Any]] = [{'Id': f'm{offset + index}',
+                                                      'MetricStat': {'Metric': metric,
+                                                                     'Period': period,
+                                                                     'Stat': 'Maximum'},
+                                                      'ReturnData': True}
+                                                     for index, metric in enumerate(metrics[offset:offset + GET_METRIC_DATA_QUERIES_LIMIT])]
+        for page in paginator.paginate(MetricDataQueries=metric_data_queries,
+                                       StartTime=start_time,
+                                       EndTime=end_time):
+            for result in page['MetricDataResults']:
+                index: int = int(result['Id'][1:])
+                peaks[index] = max([peaks.get(index, 0.0)] + result['Values'])
+    top_indexes: List[int] = sorted(range(len(metrics)),
+                                    key=lambda index: peaks.get(index, 0.0),
+                                    reverse=True)[:PROCESSES_IMAGE_TOP_K]
+    print(f'Top {PROCESSES_IMAGE_TOP_K} of {len(metrics)} processes.')
+    return [metrics[index] for index in top_indexes]
+
+
 def generate_processes_metrics_image(instance_type: str, instance_id: str, metric_name: str, alarm_new_state: Dict[str, Any], aws_services: Dict[str, Any]) -> str:
 
     try:
 
         aws_region: str = os.environ.get('AWS_REGION', 'ap-southeast-2')
         cloudwatch_client = aws_services['cloudwatch_client']
-        s3_bucket: str = os.environ.get('CLOUDWATCH_METRIC_IMAGES_S3_BUCKET')
+        s3_bucket: str = os.environ.get('S3_BUCKET_TO_STORE_GENERATED_IMAGES')
+        # Rank the processes by their usage in the time the alarm evaluated.
+        start_time: datetime = datetime.strptime('{}'.format(alarm_new_state['stateReasonData'].startDate),
+                                                 "%Y-%m-%dT%H:%M:%S.%f+0000").replace(tzinfo=timezone.utc)
+        end_time: datetime = datetime.strptime('{}'.format(alarm_new_state['stateReasonData'].queryDate),
+                                               "%Y-%m-%dT%H:%M:%S.%f+0000").replace(tzinfo=timezone.utc)
         metrics_metadata: List[List[Any]] = []
         metrics_metadata = get_metrics_metadata(
-            instance_id, metric_name, instance_type, aws_services)
+            instance_id, metric_name, instance_type, aws_services, start_time, end_time)
         if metrics_metadata is None or metrics_metadata == []:
             return None
         horizontal_annotation: List[Dict[str:Any]] = []
@@ -104,32 +175,18 @@ def generate_processes_metrics_image(instance_type: str, instance_id: str, metri
         }
 
         print(f'{metric_request}')
-        response = cloudwatch_client.get_metric_widget_image(
-            MetricWidget=json.dumps(metric_request)
-        )
-        image_name: str = f'{uuid.uuid4().hex}.jpeg'
-        upload_image_to_s3(
-            image_name, response["MetricWidgetImage"], aws_services)
+        image_name: str = metric_image_cache.image_name(
+            metric_request, alarm_new_state['stateReasonData'].queryDate)
+        if metric_image_cache.exists(image_name, aws_services['s3_client']):
+            print(f'Reuse the cached image {image_name}.')
+        else:
+            response = cloudwatch_client.get_metric_widget_image(
+                MetricWidget=json.dumps(metric_request)
+            )
+            if upload_image_to_s3(image_name, response["MetricWidgetImage"], aws_services):
+                metric_image_cache.add(image_name)
     except Exception as err:
         print(err)
         print('Failed because of above error.')
     else:
         return f'https://{s3_bucket}.s3-{aws_region}.amazonaws.com/{image_name}'
-
-
-def upload_image_to_s3(image_name: str, image: bytearray, aws_services: Dict[str, Any]):
-    try:
-
-        s3_resource = aws_services['s3_resource']
-        s3_bucket: str = os.environ.get('CLOUDWATCH_METRIC_IMAGES_S3_BUCKET')
-        bucket = s3_resource.Bucket(f'{s3_bucket}')
-        bucket.put_object(Key=image_name,
-                          ACL='public-read',
-                          Body=image,
-                          ContentType='image/jpeg'
-                          )
-    except Exception as err:
-        print(err)
-        print('Failed because of above error')
-
-
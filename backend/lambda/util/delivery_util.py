@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import random
+import urllib3
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+from .metrics_util import put_emf_metrics
+
+# Status codes after which the post is retried, the others fail at once.
+RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+class DeliveryError(Exception):
+    pass
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    '''The Retry-After header is either a number of seconds or an HTTP date.'''
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class WebhookDelivery:
+    '''
+    Posts JSON payloads to webhooks over a pool of HTTPS connections which is kept across warm invocations,
+    so a notification does not pay for a new TLS handshake. Throttled and failed posts are retried with
+    jittered exponential backoff, waiting at least the Retry-After of the response, as long as the deadline allows.
+    '''
+
+    def __init__(self, max_attempts: int, base_delay_seconds: float, max_delay_seconds: float, timeout_seconds: float):
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.pool = urllib3.PoolManager(num_pools=4,
+                                        maxsize=4,
+                                        retries=False,
+                                        timeout=urllib3.Timeout(connect=timeout_seconds,
+                                                                read=timeout_seconds))
+        self.counters: Dict[str, int] = {'posted': 0, 'retried': 0, 'failed': 0}
+
+    def post(self, url: str, payload: Dict[str, Any], deadline_seconds: float) -> int:
+        '''Post the payload and return the status code. Raises DeliveryError once the attempts or the deadline are exhausted.'''
+        deadline: float = time.monotonic() + deadline_seconds
+        body: bytes = json.dumps(payload).encode('utf-8')
+        for attempt in range(self.max_attempts):
+            try:
+                response = self.pool.request('POST', url, body=body,
+                                             headers={'Content-Type': 'application/json'})
+                status: int = response.status
+                retry_after: Optional[float] = retry_after_seconds(
+                    response.headers.get('Retry-After'))
+            except urllib3.exceptions.HTTPError as err:
+                print(f'Failed to post to the webhook: {err}')
+                status, retry_after = 0, None
+            if 200 <= status < 300:
+                self.counters['posted'] += 1
+                return status
+            if status != 0 and status not in RETRYABLE_STATUS_CODES:
+                break
+            delay: float = random.uniform(0, min(self.max_delay_seconds,
+                                                 self.base_delay_seconds * 2 ** attempt))
+            if retry_after is not None:
+                delay += retry_after
+            if attempt == self.max_attempts - 1 or time.monotonic() + delay > deadline:
+                break
+            print(f'Webhook returned {status}, retry in {delay:.2f} seconds.')
+            self.counters['retried'] += 1
+            time.sleep(delay)
+        self.counters['failed'] += 1
+        raise DeliveryError(f'Webhook post failed with status {status}.')
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
+
+
+def deliver(channels: Dict[str, Callable[[], Any]], function_name: str) -> Dict[str, Dict[str, Any]]:
+    '''
+    Send to all the channels concurrently. Each channel is a function which sends the notification.
+    Returns the outcome and latency of each channel, which are also emitted as metrics per channel.
+    '''
+    def timed(send: Callable[[], Any]) -> Dict[str, Any]:
+        started_at: float = time.perf_counter()
+        outcome: Dict[str, Any] = {'delivered': True}
+        try:
+            outcome['response'] = send()
+        except Exception as err:
+            print(err)
+            outcome = {'delivered': False, 'error': str(err)}
+        outcome['milliseconds'] = round(
+            (time.perf_counter() - started_at) * 1000, 1)
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=len(channels)) as executor:
+        futures = {channel: executor.submit(timed, send)
+                   for channel, send in channels.items()}
+    outcomes: Dict[str, Dict[str, Any]] = {
+        channel: future.result() for channel, future in futures.items()}
+    for channel, outcome in outcomes.items():
+        put_emf_metrics({'DeliveryMilliseconds': outcome['milliseconds']},
+                        {'FunctionName': function_name, 'Channel': channel},
+                        unit='Milliseconds')
+        put_emf_metrics({'DeliveryFailures': 0 if outcome['delivered'] else 1},
+                        {'FunctionName': function_name, 'Channel': channel})
+    return outcomes
+
+
+webhook_delivery = WebhookDelivery(int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', 5)),
+                                   float(os.environ.get('WEBHOOK_BASE_DELAY_SECONDS', 0.5)),
+                                   float(os.environ.get('WEBHOOK_MAX_DELAY_SECONDS', 8)),
+                                   float(os.environ.get('WEBHOOK_TIMEOUT_SECONDS', 5)))
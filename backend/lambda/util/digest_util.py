@@ -0,0 +1,91 @@
+import os
+import json
+import time
+from typing import List, Dict, Any
+from collections import namedtuple, OrderedDict
+
+AlarmNotification = namedtuple(
+    'AlarmNotification', ['message_id', 'alarm_details', 'subject'])
+
+# Fields of the alarm details kept in a digest, so a digest of many alarms stays within the 256 KB of an event.
+DIGEST_ALARM_DETAILS_FIELDS: List[str] = ['AlarmName',
+                                          'NewStateValue',
+                                          'StateChangeTime',
+                                          'AWSAccountId']
+# SNS accepts subjects of at most 100 characters.
+SUBJECT_LIMIT = 100
+
+
+def is_queued_event(event: Dict[str, Any]) -> bool:
+    '''The function is invoked with a batch of SQS records in the digest notification mode.'''
+    records: List[Dict[str, Any]] = event.get('Records', [])
+    return len(records) != 0 and records[0].get('eventSource') == 'aws:sqs'
+
+
+def parse_alarm_notifications(event: Dict[str, Any]) -> List[AlarmNotification]:
+    '''
+    Get the alarm state changes of all the records, SNS notifications of the composite alarms or SQS records
+    buffered in the queue. The body of each SQS record is the SNS notification and its message is the state change.
+    '''
+    notifications: List[AlarmNotification] = []
+    for record in event['Records']:
+        if 'Sns' in record:
+            notifications.append(AlarmNotification(record['Sns']['MessageId'],
+                                                   json.loads(record['Sns']['Message']),
+                                                   record['Sns'].get('Subject', '')))
+            continue
+        body: Dict[str, Any] = json.loads(record['body'])
+        notifications.append(AlarmNotification(record['messageId'],
+                                               json.loads(body['Message']),
+                                               body.get('Subject', '')))
+    return notifications
+
+
+def digest_alarm_details(alarm_details: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: alarm_details.get(name) for name in DIGEST_ALARM_DETAILS_FIELDS}
+
+
+def digest_subject(app: str, alarms_count: int) -> str:
+    subject: str = f'riFT: {alarms_count} CPU credit alarms of application {app}' if alarms_count > 1 else \
+        f'riFT: CPU credit alarm of application {app}'
+    return subject[:SUBJECT_LIMIT]
+
+
+class NotificationCooldown:
+    '''
+    Alarms notified recently, kept across warm invocations.
+    A repeat notification of an alarm in the same state within cooldown_seconds is dropped,
+    so a flapping alarm is notified once per cool-down. The oldest entry is evicted once the cache is full.
+    An alarm is recorded only once its notification is published, so a batch which fails and is redelivered
+    is not dropped by the cool-down.
+    '''
+
+    def __init__(self, cooldown_seconds: float, max_entries: int):
+        self.cooldown_seconds = cooldown_seconds
+        self.max_entries = max_entries
+        self.notified_at: OrderedDict = OrderedDict()
+        self.counters: Dict[str, int] = {'notified': 0, 'suppressed': 0}
+
+    def should_notify(self, alarm_name: str, state: str) -> bool:
+        '''False if the alarm was notified in the same state within the cool-down.'''
+        notified_at: float = self.notified_at.get((alarm_name, state))
+        if notified_at is not None and time.monotonic() - notified_at < self.cooldown_seconds:
+            self.counters['suppressed'] += 1
+            return False
+        return True
+
+    def record(self, alarm_name: str, state: str):
+        '''Start the cool-down of an alarm whose notification is published.'''
+        key = (alarm_name, state)
+        self.notified_at[key] = time.monotonic()
+        self.notified_at.move_to_end(key)
+        while len(self.notified_at) > self.max_entries:
+            self.notified_at.popitem(last=False)
+        self.counters['notified'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, size=len(self.notified_at))
+
+
+notification_cooldown = NotificationCooldown(float(os.environ.get('NOTIFICATION_COOLDOWN_SECONDS', 900)),
+                                             int(os.environ.get('NOTIFICATION_COOLDOWN_MAX_ENTRIES', 4096)))
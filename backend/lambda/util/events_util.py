@@ -0,0 +1,43 @@
+from functools import wraps
+from typing import List, Dict
+
+from rift.events import event_publisher
+from .metrics_util import put_emf_metrics
+
+
+class EventsNotPublished(Exception):
+    pass
+
+
+def publish_events_at_exit(handler):
+    '''
+    Decorate a lambda handler to flush the events it put with the event publisher when it returns and
+    emit the publish metrics of the invocation. The invocation fails if events which the handler did not flush
+    itself still failed after the redrives, so the asynchronous invocation is retried instead of the event being lost.
+    '''
+    @wraps(handler)
+    def wrapper(event, context):
+        try:
+            response = handler(event, context)
+        finally:
+            failed_entry_ids: List[int] = event_publisher.flush()
+            put_publish_metrics(getattr(context, 'function_name', 'unknown'))
+        if len(failed_entry_ids) != 0:
+            raise EventsNotPublished(
+                f'{len(failed_entry_ids)} events failed to publish.')
+        return response
+    return wrapper
+
+
+def put_publish_metrics(function_name: str):
+    counters: Dict[str, float] = event_publisher.take_counters()
+    if counters['put-events-batches'] == 0:
+        return
+    print(f'Event publisher: {counters}')
+    put_emf_metrics({'PublishedEvents': counters['published'],
+                     'FailedEvents': counters['failed'],
+                     'PutEventsBatches': counters['put-events-batches']},
+                    {'FunctionName': function_name})
+    put_emf_metrics({'PublishMilliseconds': round(counters['publish-milliseconds'], 1)},
+                    {'FunctionName': function_name},
+                    unit='Milliseconds')
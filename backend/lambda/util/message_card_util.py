@@ -0,0 +1,126 @@
+from typing import Dict, Any, List, Tuple
+import pymsteams
+
+from .notification_util import (aws_region,
+                                color_codes,
+                                metric_titles,
+                                console_alarm_url)
+
+
+def build_message_card(webhook_url: str, detail: Dict[str, Any]):
+    '''
+    The MS teams card of an alarm, or the digest card of the alarms of an application.
+    The images, the instance type and the suppress api url may be missing, when an image misses its deadline or
+    the instance could not be described, so the card has a section only for the images which are present.
+    '''
+    if detail.get('digest'):
+        return build_digest_card(webhook_url, detail)
+    alarm_details: Dict[str:Any] = detail['alarm-details']
+    alarm_name: str = alarm_details['AlarmName']
+    instance_id: str = alarm_name[:19]
+    metric_images_urls: Dict[str, str] = detail.get('metric-images-urls', {})
+    suppress_api_url: str = detail.get('suppress-api-url')
+
+    message_title: str = f'CPU credits and utilization thresholds have breached for instance {instance_id} of application {detail["app"]}. \n\n'
+
+    ms_teams_message_card = pymsteams.connectorcard(webhook_url)
+
+    ms_teams_message_card.summary(message_title)
+    ms_teams_message_card.addSection(build_message_card_section(
+        message_title,
+        detail['app'],
+        detail.get('instance-type', 'unknown'),
+        alarm_details))
+    for metric_name, image_url in ordered_metric_images_urls(metric_images_urls):
+        ms_teams_message_card.addSection(
+            build_message_card_image_section(metric_titles.get(metric_name, metric_name), image_url))
+
+    if suppress_api_url is not None:
+        myTeamsPotentialAction1 = pymsteams.potentialaction(
+            _name="Suppress Notifications")
+        myTeamsPotentialAction1.addOpenURI('Suppress Notifications', [
+            {'os': 'default', 'uri': suppress_api_url}])
+        ms_teams_message_card.addPotentialAction(myTeamsPotentialAction1)
+
+    myTeamsPotentialAction2 = pymsteams.potentialaction(
+        _name="Check the alarm")
+    myTeamsPotentialAction2.addOpenURI(
+        'Check the alarm', [{'os': 'default', 'uri': console_alarm_url(alarm_name)}])
+    ms_teams_message_card.addPotentialAction(myTeamsPotentialAction2)
+
+    ms_teams_message_card.color(
+        color_codes[alarm_details['NewStateValue']])
+    return ms_teams_message_card
+
+
+def build_digest_card(webhook_url: str, detail: Dict[str, Any]):
+    '''One card for all the alarms of an application, with the images of the alarms which have them.'''
+    message_title: str = f'CPU credits and utilization thresholds have breached for {len(detail["alarms"])} instances of application {detail["app"]}. \n\n'
+    ms_teams_message_card = pymsteams.connectorcard(webhook_url)
+    ms_teams_message_card.summary(message_title)
+    ms_teams_message_card.title(detail['subject'])
+    ms_teams_message_card.text(message_title)
+    for alarm in detail['alarms']:
+        alarm_details: Dict[str, Any] = alarm['alarm-details']
+        message_section = build_message_card_section(
+            f'Instance {alarm["instance-id"]}',
+            detail['app'],
+            alarm.get('instance-type', 'unknown'),
+            alarm_details)
+        message_section.addFact('State Change', alarm_details['NewStateValue'])
+        message_section.addFact('Timestamp', alarm_details['StateChangeTime'])
+        # A section has a single link button, so the links are in its text.
+        links: List[str] = [f'[Check the alarm]({console_alarm_url(alarm_details["AlarmName"])})']
+        if alarm.get('suppress-api-url') is not None:
+            links.insert(0, f'[Suppress Notifications]({alarm["suppress-api-url"]})')
+        message_section.text(' | '.join(links))
+        ms_teams_message_card.addSection(message_section)
+        for metric_name, image_url in ordered_metric_images_urls(alarm.get('metric-images-urls', {})):
+            ms_teams_message_card.addSection(build_message_card_image_section(
+                f'{metric_titles.get(metric_name, metric_name)} of {alarm["instance-id"]}', image_url))
+    alarm_states: List[str] = [alarm['alarm-details']['NewStateValue']
+                               for alarm in detail['alarms']]
+    ms_teams_message_card.color(
+        color_codes['ALARM' if 'ALARM' in alarm_states else 'OK'])
+    return ms_teams_message_card
+
+
+def ordered_metric_images_urls(metric_images_urls: Dict[str, str]) -> List[Tuple[str, str]]:
+    '''The images which are present, credit balance, utilization and processes first.'''
+    return sorted(metric_images_urls.items(),
+                  key=lambda item: list(metric_titles).index(item[0]) if item[0] in metric_titles else len(metric_titles))
+
+
+def build_message_card_section(title: str, name: str, ec2_type: str, alarm_details: Dict[str, Any]):
+
+    try:
+        message_section = pymsteams.cardsection()
+        message_section.activityTitle('{}'.format(title))
+        message_section.addFact(f'Alarm Name', alarm_details['AlarmName'])
+
+        message_section.addFact('Instance Type', ec2_type)
+
+        message_section.addFact(
+            f'AWS AccountId', alarm_details['AWSAccountId'])
+        message_section.addFact(f'AWS Region', aws_region)
+
+    except Exception as err:
+        print(err)
+        raise err
+    else:
+        return message_section
+
+
+def build_message_card_image_section(metric_name: str, image_url: str):
+
+    try:
+        message_section = pymsteams.cardsection()
+        message_section.activityTitle('{}'.format(metric_name))
+        message_section.addImage(image_url, ititle=metric_name)
+        message_section.linkButton(f'View Graph', image_url)
+
+    except Exception as err:
+        print(err)
+        raise err
+    else:
+        return message_section
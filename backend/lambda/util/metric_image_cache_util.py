@@ -0,0 +1,104 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, Any
+from datetime import datetime, timezone
+
+from .metrics_util import put_emf_metrics
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f+0000'
+
+
+class MetricImageCache:
+    '''
+    Content addressed cache of the metric images stored in the S3 bucket.
+    The image name is a hash of the widget request, normalized to the metrics, the size, the threshold and
+    the time window of the alarm, quantized to window_seconds. A composite alarm which flaps within the window
+    reuses the image already in the bucket, if it is not older than max_age_seconds, instead of rendering and uploading it again.
+    '''
+
+    def __init__(self, window_seconds: float, max_age_seconds: float):
+        self.window_seconds = window_seconds
+        self.max_age_seconds = max_age_seconds
+        self.uploaded_at: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {'hits': 0, 'misses': 0}
+
+    def image_name(self, metric_request: Dict[str, Any], query_date: str) -> str:
+        query_time: float = datetime.strptime(query_date, DATE_FORMAT).replace(
+            tzinfo=timezone.utc).timestamp()
+        normalized_request: Dict[str, Any] = {
+            'metrics': metric_request['metrics'],
+            'height': metric_request['height'],
+            'width': metric_request['width'],
+            'start': metric_request['start'],
+            'end': metric_request['end'],
+            # The first horizontal annotation is the threshold, the others are the datapoints which change on every flap.
+            'threshold': metric_request['annotations']['horizontal'][0]['value'],
+            'window': int(query_time // self.window_seconds)
+        }
+        digest: str = hashlib.sha256(json.dumps(
+            normalized_request, sort_keys=True).encode('utf-8')).hexdigest()
+        return f'{digest}.jpeg'
+
+    def exists(self, image_name: str, s3_client) -> bool:
+        '''Returns True if a fresh image is in the bucket. The upload time is remembered across warm invocations.'''
+        now: float = datetime.now(timezone.utc).timestamp()
+        with self.lock:
+            uploaded_at: float = self.uploaded_at.get(image_name)
+        if uploaded_at is None:
+            try:
+                response: Dict[str, Any] = s3_client.head_object(
+                    Bucket=os.environ.get('S3_BUCKET_TO_STORE_GENERATED_IMAGES'),
+                    Key=image_name)
+                uploaded_at = response['LastModified'].timestamp()
+            except Exception:
+                uploaded_at = None
+        hit: bool = uploaded_at is not None and now - uploaded_at <= self.max_age_seconds
+        with self.lock:
+            self.counters['hits' if hit else 'misses'] += 1
+            if hit:
+                self.uploaded_at[image_name] = uploaded_at
+        return hit
+
+    def add(self, image_name: str):
+        with self.lock:
+            self.uploaded_at[image_name] = datetime.now(
+                timezone.utc).timestamp()
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters)
+
+    def put_metrics(self, function_name: str):
+        '''Emit the hits and misses of the invocation and reset the counters.'''
+        with self.lock:
+            counters: Dict[str, int] = dict(self.counters)
+            self.counters = {'hits': 0, 'misses': 0}
+        put_emf_metrics({'MetricImageCacheHits': counters['hits'],
+                         'MetricImageCacheMisses': counters['misses']},
+                        {'FunctionName': function_name})
+
+
+def upload_image_to_s3(image_name: str, image: bytearray, aws_services: Dict[str, Any]):
+    '''The images are uploaded from more than one thread, so the thread safe S3 client is used and not the resource.'''
+    try:
+        s3_client = aws_services['s3_client']
+        s3_bucket: str = os.environ.get('S3_BUCKET_TO_STORE_GENERATED_IMAGES')
+        s3_client.put_object(Bucket=f'{s3_bucket}',
+                             Key=image_name,
+                             ACL='public-read',
+                             Body=image,
+                             ContentType='image/jpeg'
+                             )
+    except Exception as err:
+        print(err)
+        print('Failed because of above error')
+        return False
+    else:
+        return True
+
+
+metric_image_cache = MetricImageCache(float(os.environ.get('METRIC_IMAGE_CACHE_WINDOW_SECONDS', 300)),
+                                      float(os.environ.get('METRIC_IMAGE_CACHE_MAX_AGE_SECONDS', 900)))
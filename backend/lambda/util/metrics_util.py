@@ -0,0 +1,27 @@
+import os
+import json
+import time
+from typing import Dict, Any
+
+# Namespace of the metrics the functions emit in the CloudWatch embedded metric format.
+METRICS_NAMESPACE: str = os.environ.get('METRICS_NAMESPACE', 'riFT')
+
+
+def put_emf_metrics(metrics: Dict[str, Any], dimensions: Dict[str, str], unit: str = 'Count'):
+    '''
+    Print the metrics in the CloudWatch embedded metric format. CloudWatch Logs extracts them
+    from the log of the function, so no PutMetricData call or permission is needed.
+    The value of a metric is a number or a list of at most 100 numbers.
+    '''
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [list(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': unit} for name in metrics]
+            }]
+        },
+        **dimensions,
+        **metrics
+    }))
@@ -0,0 +1,86 @@
+import os
+from typing import Dict, Any
+
+aws_region: str = os.environ.get('AWS_REGION')
+
+color_codes: Dict[str, str] = {'ALARM': '#fc2003',
+                               'OK': '#fcad03'}
+
+process_metric_name: Dict[str, str] = {'Windows': 'procstat cpu_usage',
+                                       'Linux': 'procstat_cpu_usage'}
+
+metric_titles: Dict[str, str] = {'CPUCreditBalance': 'CPU Credit Balance',
+                                 'CPUUtilization': 'CPU Utilization',
+                                 'procstat cpu_usage': 'Processes CPU Usage',
+                                 'procstat_cpu_usage': 'Processes CPU Usage'}
+
+
+def console_alarm_url(alarm_name: str) -> str:
+    return f'https://{aws_region}.console.aws.amazon.com/cloudwatch/home?region={aws_region}#alarmsV2:alarm/{alarm_name}'
+
+
+def publish_email(detail: Dict[str, Any], sns_client, sns_topic: str) -> Dict[str, Any]:
+    '''Send the notification of an alarm, or the digest of the alarms of an application, to the SNS topic of the subscribers.'''
+    response: Dict[str, Any] = sns_client.publish(
+        TopicArn=sns_topic,
+        Message=write_digest_message(detail) if detail.get(
+            'digest') else write_alarm_message(detail),
+        Subject=detail['subject'],
+        MessageStructure='String'
+    )
+    print(f'Notification sent to SNS topic {sns_topic}.')
+    return response
+
+
+def write_alarm_message(detail: Dict[str, Any]) -> str:
+    alarm_details: Dict[str:Any] = detail['alarm-details']
+    alarm_name: str = alarm_details['AlarmName']
+    instance_id: str = alarm_name[:19]
+    instance_and_alarm_info: str = f'CPU credits and utilization thresholds have breached for instance {instance_id} of application {detail["app"]}. \n\n'
+
+    detail1: str = '''Details:\n Alarm: {0} \n Description: {1} \n State Change: {2} \n Alarm Rule: {3} \n Timestamp: {4} \n AWS Account: {5} \n Alarm Arn: {6}
+                            '''.format(alarm_details['AlarmName'],
+                                       alarm_details['AlarmDescription'],
+                                       alarm_details['NewStateValue'],
+                                       alarm_details['AlarmRule'],
+                                       alarm_details['StateChangeTime'],
+                                       alarm_details['AWSAccountId'],
+                                       alarm_details['AlarmArn'])
+    return instance_and_alarm_info + detail1 + write_metric_image_urls_to_message(detail, alarm_name, detail.get('platform', 'Linux'))
+
+
+def write_metric_image_urls_to_message(detail: Dict[str, Any], alarm_name: str, platform: str) -> str:
+    '''
+    The links of the alarm. The suppress api url and the images are written only when present, as they are missing
+    when the instance could not be described, the url could not be signed or an image missed its deadline.
+    '''
+    metric_images_urls: Dict[str, str] = detail.get('metric-images-urls', {})
+    message: str = f'Console: {console_alarm_url(alarm_name)} \n'
+    if detail.get('suppress-api-url') is not None:
+        message += f' Suppress alarm: {detail["suppress-api-url"]} \n'
+    for metric_name, label in [('CPUCreditBalance', 'CpuCreditBalance'),
+                               ('CPUUtilization', 'CpuUtilization'),
+                               (process_metric_name[platform], 'ProcessesMetric')]:
+        if metric_name in metric_images_urls:
+            message += f' {label}: {metric_images_urls[metric_name]} \n'
+    return message
+
+
+def write_digest_message(detail: Dict[str, Any]) -> str:
+    message: str = f'CPU credits and utilization thresholds have breached for {len(detail["alarms"])} instances of application {detail["app"]}. \n\n'
+    for alarm in detail['alarms']:
+        alarm_details: Dict[str, Any] = alarm['alarm-details']
+        message += '''Instance: {0} ({1}) \n Alarm: {2} \n State Change: {3} \n Timestamp: {4} \n AWS Account: {5} \n Console: {6} \n'''.format(
+            alarm['instance-id'],
+            alarm.get('instance-type', 'unknown'),
+            alarm_details['AlarmName'],
+            alarm_details['NewStateValue'],
+            alarm_details['StateChangeTime'],
+            alarm_details['AWSAccountId'],
+            console_alarm_url(alarm_details['AlarmName']))
+        if alarm.get('suppress-api-url') is not None:
+            message += f' Suppress alarm: {alarm["suppress-api-url"]} \n'
+        for metric_name, image_url in alarm.get('metric-images-urls', {}).items():
+            message += f' {metric_name}: {image_url} \n'
+        message += '\n'
+    return message
@@ -0,0 +1,67 @@
+import os
+from typing import List, Dict, Any
+
+from rift.thresholds import AlarmConfigurationParams
+from rift.config import get_configuration_data
+from .alarm_util import (composite_alarm_name,
+                         get_name_tag,
+                         build_instance_alarms,
+                         put_metric_alarm)
+
+
+def composite_alarm_exists(alarm_name: str, cloudwatch_client) -> bool:
+    existing_alarms = cloudwatch_client.describe_alarms(
+        AlarmNames=[alarm_name],
+        AlarmTypes=['CompositeAlarm']
+    )
+    return len(existing_alarms['CompositeAlarms']) != 0
+
+
+def onboard_instance(instance_id: str,
+                     instance_type: str,
+                     tags: List[Dict[str, str]],
+                     aws_services: Dict[str, Any],
+                     config: AlarmConfigurationParams = None) -> Dict[str, Any]:
+    '''
+    This function creates the cpu credit, cpu utilization and composite alarms of an instance in one pass.
+    It replaces the check-composite-alarm -> create-cpu-credit-alarm -> create-cpu-utilization-alarm -> create-composite-alarm hops
+    and uses the same threshold logic as the functions of those hops.
+    The instance data is passed in so the caller describes the instance only once.
+    Returns the detail of the completion event, the same fields the create-cpu-utilization-alarm function publishes.
+    '''
+    cloudwatch_client = aws_services['cloudwatch_client']
+    out_event: Dict[str, Any] = {'instance-id': instance_id,
+                                 'instance-type': instance_type}
+    name: str = get_name_tag(tags)
+    out_event['app'] = name
+
+    alarm_name: str = composite_alarm_name(instance_id, instance_type)
+    if composite_alarm_exists(alarm_name, cloudwatch_client):
+        print(f'Alarm {alarm_name} already exists. Do not create new.')
+        out_event['composite-alarm-name'] = alarm_name
+        out_event['created'] = False
+        return out_event
+
+    if config is None:
+        config = get_configuration_data(aws_services['ssm_client'])
+    print(f'Onboard instance {instance_id} of type {instance_type} and app {name}.')
+    credit_alarm, utilization_alarm, composite_alarm = build_instance_alarms(instance_id,
+                                                                             instance_type,
+                                                                             name,
+                                                                             config,
+                                                                             [os.environ.get('ACTION')])
+    print(f'threshold={credit_alarm["Threshold"]} period={credit_alarm["Period"]} datapoints={credit_alarm["DatapointsToAlarm"]} evaluation_periods={credit_alarm["EvaluationPeriods"]}')
+    credit_alarm_name: str = credit_alarm['AlarmName']
+    utilization_alarm_name: str = utilization_alarm['AlarmName']
+    put_metric_alarm(credit_alarm, cloudwatch_client)
+    put_metric_alarm(utilization_alarm, cloudwatch_client)
+    alarm_created_response = cloudwatch_client.put_composite_alarm(
+        **composite_alarm)
+    print(f'{alarm_created_response}')
+    print(f'Created composite alarm {alarm_name} for instance {instance_id} of application {name}')
+
+    out_event['cpu-credit-alarm-name'] = credit_alarm_name
+    out_event['cpu-utilization-alarm-name'] = utilization_alarm_name
+    out_event['composite-alarm-name'] = alarm_name
+    out_event['created'] = True
+    return out_event
@@ -1,12 +1,14 @@
 # See: http://docs.aws.amazon.com/general/latest/gr/sigv4_signing.html
 import os
+import time
 import base64
 import datetime
 import hashlib
 import hmac
-import urllib
-import boto3
+import urllib.parse
 import json
+import threading
+from typing import List, Dict, Tuple
 from botocore.exceptions import ClientError
 
 
@@ -15,8 +17,16 @@ def generate_presigned_url(secretsmanager_client: None, instance_id: str,):
     This program creates a presigned url of the Api Gateway endpoint. 
     The logic follows standard example provided by AWS to sign a request.
     '''
+    return generate_presigned_urls(secretsmanager_client, [instance_id])[instance_id]
+
+
+def generate_presigned_urls(secretsmanager_client, instance_ids: List[str]) -> Dict[str, str]:
+    '''
+    Creates the presigned urls of the Api Gateway endpoint for many instances in one call, e.g. for a digest notification.
+    The credentials, the date and the signing key are shared by all the urls. Returns the urls keyed by the instance id.
+    '''
     try:
-        presigned_url: str = ''
+        presigned_urls: Dict[str, str] = {}
         # ************* REQUEST VALUES *************
         method = 'GET'
         service = 'execute-api'
@@ -24,7 +34,7 @@ def generate_presigned_url(secretsmanager_client: None, instance_id: str,):
         region = os.environ.get('AWS_REGION')
         endpoint = os.environ.get('API_ENDPOINT')
 
-        access_key, secret_key = get_secrets(secretsmanager_client)
+        access_key, secret_key = signing_credentials.get(secretsmanager_client)
 
         if access_key is None or secret_key is None:
             print('No access key is available.')
@@ -70,52 +80,50 @@ def generate_presigned_url(secretsmanager_client: None, instance_id: str,):
         # be URL-encoded (space=%20). The parameters must be sorted by name.
         # use urllib.parse.quote_plus() if using Python 3
 
-        canonical_querystring = 'X-Amz-Algorithm=AWS4-HMAC-SHA256'
-        canonical_querystring += '&X-Amz-Credential=' + \
+        common_querystring = 'X-Amz-Algorithm=AWS4-HMAC-SHA256'
+        common_querystring += '&X-Amz-Credential=' + \
             urllib.parse.quote_plus(access_key + '/' + credential_scope)
-        canonical_querystring += '&X-Amz-Date=' + amz_date
-        canonical_querystring += '&X-Amz-Expires=30'
-        canonical_querystring += '&X-Amz-SignedHeaders=' + signed_headers
-        canonical_querystring += '&instance-id='+instance_id
-        #canonical_querystring += '&instance-id=i-011067b7cdab6fcb3'
+        common_querystring += '&X-Amz-Date=' + amz_date
+        common_querystring += '&X-Amz-Expires=30'
+        common_querystring += '&X-Amz-SignedHeaders=' + signed_headers
 
         # Step 5: Create payload hash. For GET requests, the payload is an
         # empty string ("").
         payload_hash = hashlib.sha256(('').encode('utf-8')).hexdigest()
 
-        # Step 6: Combine elements to create canonical request
-        canonical_request = method + '\n' + canonical_uri + '\n' + canonical_querystring + \
-            '\n' + canonical_headers + '\n' + signed_headers + '\n' + payload_hash
-        print(f'canonical_request={canonical_request}')
+        # ************* TASK 3: CALCULATE THE SIGNATURE *************
+        # Create the signing key. It only changes with the date, so it is derived once a day.
+        signing_key = signing_credentials.signing_key(datestamp, region, service)
 
-        # ************* TASK 2: CREATE THE STRING TO SIGN*************
-        string_to_sign = algorithm + '\n' + amz_date + '\n' + credential_scope + \
-            '\n' + \
-            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+        for instance_id in instance_ids:
+            canonical_querystring = common_querystring + '&instance-id=' + instance_id
 
-        print(f'string_to_sign={string_to_sign}')
-        # ************* TASK 3: CALCULATE THE SIGNATURE *************
-        # Create the signing key
-        signing_key = getSignatureKey(secret_key, datestamp, region, service)
+            # Step 6: Combine elements to create canonical request
+            canonical_request = method + '\n' + canonical_uri + '\n' + canonical_querystring + \
+                '\n' + canonical_headers + '\n' + signed_headers + '\n' + payload_hash
 
-        # Sign the string_to_sign using the signing_key
-        signature = hmac.new(signing_key, (string_to_sign).encode(
-            "utf-8"), hashlib.sha256).hexdigest()
+            # ************* TASK 2: CREATE THE STRING TO SIGN*************
+            string_to_sign = algorithm + '\n' + amz_date + '\n' + credential_scope + \
+                '\n' + \
+                hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
 
-        # ************* TASK 4: ADD SIGNING INFORMATION TO THE REQUEST *************
-        # The auth information can be either in a query string
-        # value or in a header named Authorization. This code shows how to put
-        # everything into a query string.
-        canonical_querystring += '&X-Amz-Signature=' + signature
+            # Sign the string_to_sign using the signing_key
+            signature = hmac.new(signing_key, (string_to_sign).encode(
+                "utf-8"), hashlib.sha256).hexdigest()
 
-        presigned_url = endpoint + "?" + canonical_querystring
+            # ************* TASK 4: ADD SIGNING INFORMATION TO THE REQUEST *************
+            # The auth information can be either in a query string
+            # value or in a header named Authorization. This code shows how to put
+            # everything into a query string.
+            canonical_querystring += '&X-Amz-Signature=' + signature
 
-        print('Request URL = ' + presigned_url)
+            presigned_urls[instance_id] = endpoint + "?" + canonical_querystring
+            print('Request URL = ' + presigned_urls[instance_id])
     except (ClientError, Exception) as err:
         print('Failed to generaet presigned url.')
         raise err
     else:
-        return presigned_url
+        return presigned_urls
 
 
 def sign(key, msg):
@@ -130,16 +138,69 @@ def getSignatureKey(key, dateStamp, regionName, serviceName):
     return kSigning
 
 
-def get_secrets(secretsmanager_client):
-    '''Get access key and secret access key from the Secrets Manager to sign the API URL.'''
+class SigningCredentials:
+    '''
+    Cache of the access key and secret key which sign the API urls, kept across warm invocations.
+    The secret is read again from the Secrets Manager after the TTL. When its version changed, because the
+    secret was rotated, the signing keys derived from the old secret key are dropped.
+    The signing keys are memoized per date, region and service as they only change daily.
+    '''
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.access_key: str = None
+        self.secret_key: str = None
+        self.version_id: str = None
+        self.loaded_at: float = 0.0
+        self.signing_keys: Dict[Tuple[str, str, str], bytes] = {}
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {'hits': 0, 'refreshes': 0, 'rotations': 0}
+
+    def get(self, secretsmanager_client) -> Tuple[str, str]:
+        with self.lock:
+            if self.secret_key is None or time.monotonic() - self.loaded_at > self.ttl_seconds:
+                self.refresh(secretsmanager_client)
+            else:
+                self.counters['hits'] += 1
+            return self.access_key, self.secret_key
+
+    def refresh(self, secretsmanager_client):
+        access_key, secret_key, version_id = get_secrets(secretsmanager_client)
+        if self.version_id is not None and version_id != self.version_id:
+            print(f'The credentials to sign the API url are rotated to version {version_id}.')
+            self.counters['rotations'] += 1
+        if version_id != self.version_id:
+            self.signing_keys = {}
+        self.access_key, self.secret_key, self.version_id = access_key, secret_key, version_id
+        self.loaded_at = time.monotonic()
+        self.counters['refreshes'] += 1
+
+    def signing_key(self, datestamp: str, region: str, service: str) -> bytes:
+        key: Tuple[str, str, str] = (datestamp, region, service)
+        with self.lock:
+            if key not in self.signing_keys:
+                # Only the key of the current day is needed.
+                self.signing_keys = {key: getSignatureKey(
+                    self.secret_key, datestamp, region, service)}
+            return self.signing_keys[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters)
+
+
+def get_secrets(secretsmanager_client) -> Tuple[str, str, str]:
+    '''Get access key, secret access key and the version of the secret from the Secrets Manager to sign the API URL.'''
     access_key = None
     secret_key = None
+    version_id = None
     try:
         secrets_name: str = os.environ.get('CREDENTIAL_TO_SIGN_API_URL')
 
         get_secerts_response = secretsmanager_client.get_secret_value(
             SecretId=secrets_name
         )
+        version_id = get_secerts_response.get('VersionId')
 
         if 'SecretString' in get_secerts_response:
             secrets_json = json.loads(
@@ -151,4 +212,8 @@ def get_secrets(secretsmanager_client):
         print(f'Failed to get access key and secret key to sign the API url.')
         raise err
     else:
-        return access_key, secret_key
+        return access_key, secret_key, version_id
+
+
+signing_credentials = SigningCredentials(
+    float(os.environ.get('SIGNING_CREDENTIALS_TTL_SECONDS', 300)))
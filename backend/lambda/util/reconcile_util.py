@@ -0,0 +1,185 @@
+from typing import List, Dict, Any, Tuple, Set
+from dataclasses import dataclass, field
+
+from rift.thresholds import AlarmConfigurationParams
+from .alarm_util import (cpu_credit_alarm_name,
+                         cpu_utilization_alarm_name,
+                         composite_alarm_name,
+                         get_name_tag,
+                         build_instance_alarms)
+from .alarm_writer_util import AlarmWriter
+from .batch_util import chunks
+
+# DeleteAlarms accepts at most 100 alarm names in one call.
+DELETE_ALARMS_LIMIT = 100
+# States of the instances whose alarms are kept.
+EXISTING_INSTANCE_STATES: List[str] = ['pending', 'running', 'stopping', 'stopped']
+
+# Fields of the PutMetricAlarm and PutCompositeAlarm requests which are compared with the existing alarms.
+METRIC_ALARM_FIELDS: List[str] = ['MetricName',
+                                  'Namespace',
+                                  'Statistic',
+                                  'Dimensions',
+                                  'Period',
+                                  'Threshold',
+                                  'ComparisonOperator',
+                                  'EvaluationPeriods',
+                                  'DatapointsToAlarm',
+                                  'ActionsEnabled']
+COMPOSITE_ALARM_FIELDS: List[str] = ['AlarmRule',
+                                     'AlarmActions',
+                                     'ActionsEnabled']
+
+
+@dataclass
+class ReconcilePlan:
+    create: List[Dict[str, Any]] = field(default_factory=list)
+    update: List[Dict[str, Any]] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def counts(self) -> Dict[str, int]:
+        return {'create': len(self.create),
+                'update': len(self.update),
+                'delete': len(self.delete),
+                'unchanged': self.unchanged}
+
+
+def is_rift_alarm_name(alarm_name: str) -> bool:
+    '''DescribeAlarms does not return tags, so the riFT alarms are recognised by the suffix of their names.'''
+    parts: List[str] = alarm_name.split('-', 3)
+    if len(parts) != 4:
+        return False
+    instance_id, instance_type = f'{parts[0]}-{parts[1]}', parts[2]
+    return alarm_name in [cpu_credit_alarm_name(instance_id, instance_type),
+                          cpu_utilization_alarm_name(instance_id, instance_type),
+                          composite_alarm_name(instance_id, instance_type)]
+
+
+def alarm_instance(alarm_name: str) -> Tuple[str, str]:
+    '''Returns the instance id and instance type a riFT alarm belongs to.'''
+    parts: List[str] = alarm_name.split('-', 3)
+    return f'{parts[0]}-{parts[1]}', parts[2]
+
+
+def describe_rift_alarms(cloudwatch_client) -> Dict[str, Dict[str, Any]]:
+    '''Page through the metric and composite alarms once. Returns the riFT alarms keyed by their names.'''
+    alarms: Dict[str, Dict[str, Any]] = {}
+    paginator = cloudwatch_client.get_paginator('describe_alarms')
+    for page in paginator.paginate(AlarmNamePrefix='i-',
+                                   AlarmTypes=['CompositeAlarm', 'MetricAlarm']):
+        for alarm in page.get('MetricAlarms', []) + page.get('CompositeAlarms', []):
+            if is_rift_alarm_name(alarm['AlarmName']):
+                alarms[alarm['AlarmName']] = alarm
+    return alarms
+
+
+def describe_burstable_instances(ec2_client) -> List[Dict[str, Any]]:
+    '''Page through the T class instances which are not terminated.'''
+    instances: List[Dict[str, Any]] = []
+    paginator = ec2_client.get_paginator('describe_instances')
+    for page in paginator.paginate(Filters=[{
+            'Name': 'instance-type',
+            'Values': ['t2.*', 't3.*', 't3a.*', 't4g.*']
+        },
+        {
+            'Name': 'instance-state-name',
+            'Values': EXISTING_INSTANCE_STATES
+    }]):
+        for reservation in page['Reservations']:
+            instances.extend(reservation['Instances'])
+    return instances
+
+
+def alarm_differs(desired_alarm: Dict[str, Any], existing_alarm: Dict[str, Any]) -> bool:
+    fields: List[str] = COMPOSITE_ALARM_FIELDS if 'AlarmRule' in desired_alarm else METRIC_ALARM_FIELDS
+    for name in fields:
+        desired_value = desired_alarm.get(name)
+        existing_value = existing_alarm.get(name)
+        if name == 'Threshold':
+            if existing_value is None or float(desired_value) != float(existing_value):
+                return True
+        elif desired_value != existing_value:
+            return True
+    return False
+
+
+def plan_reconcile(instances: List[Dict[str, Any]],
+                   existing_alarms: Dict[str, Dict[str, Any]],
+                   config: AlarmConfigurationParams,
+                   action: List[str]) -> ReconcilePlan:
+    '''
+    Compare the desired alarms of the running instances with the existing riFT alarms.
+    Only the alarms which are missing or whose spec differs are written. The alarms of
+    stopped instances are kept as they are and the alarms of instances which are terminated
+    or changed their type are deleted.
+    '''
+    plan = ReconcilePlan()
+    existing_instances: Set[Tuple[str, str]] = set()
+    for instance in instances:
+        instance_id: str = instance['InstanceId']
+        instance_type: str = instance['InstanceType']
+        existing_instances.add((instance_id, instance_type))
+        if instance['State']['Name'] != 'running':
+            continue
+        for desired_alarm in build_instance_alarms(instance_id,
+                                                   instance_type,
+                                                   get_name_tag(instance.get('Tags')),
+                                                   config,
+                                                   action):
+            existing_alarm: Dict[str, Any] = existing_alarms.get(
+                desired_alarm['AlarmName'])
+            if existing_alarm is None:
+                plan.create.append(desired_alarm)
+            elif alarm_differs(desired_alarm, existing_alarm):
+                plan.update.append(desired_alarm)
+            else:
+                plan.unchanged += 1
+
+    for alarm_name in existing_alarms:
+        if alarm_instance(alarm_name) not in existing_instances:
+            plan.delete.append(alarm_name)
+    return plan
+
+
+def delete_alarms(alarms_names: List[str], cloudwatch_client) -> int:
+    '''Delete the alarms with one DeleteAlarms call per 100 alarms. Returns the number of alarms which failed to delete.'''
+    failed: int = 0
+    for alarms_names_chunk in chunks(alarms_names, DELETE_ALARMS_LIMIT):
+        try:
+            cloudwatch_client.delete_alarms(AlarmNames=alarms_names_chunk)
+            print(f'Successfully deleted these alarms {alarms_names_chunk}')
+        except Exception as err:
+            print(err)
+            print(f'Failed to delete {alarms_names_chunk} because of above error.')
+            failed += len(alarms_names_chunk)
+    return failed
+
+
+def apply_plan(plan: ReconcilePlan,
+               existing_alarms: Dict[str, Dict[str, Any]],
+               cloudwatch_client,
+               alarm_writer: AlarmWriter,
+               time_left_in_seconds=None) -> Dict[str, Any]:
+    '''
+    Write the planned alarms with the alarm writer, metric alarms of an instance before its composite alarm,
+    and delete composite alarms before metric alarms. Returns the summary of the writer with the number of deleted alarms.
+    '''
+    instances_alarms: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for alarm in plan.create + plan.update:
+        instances_alarms.setdefault(
+            alarm_instance(alarm['AlarmName']), []).append(alarm)
+    summary: Dict[str, Any] = alarm_writer.write([sorted(alarms, key=lambda alarm: 'AlarmRule' in alarm)
+                                                  for alarms in instances_alarms.values()],
+                                                 time_left_in_seconds)
+
+    composite_alarms: List[str] = [name for name in plan.delete
+                                   if 'AlarmRule' in existing_alarms[name]]
+    metric_alarms: List[str] = [name for name in plan.delete
+                                if 'AlarmRule' not in existing_alarms[name]]
+    summary['deleted'] = 0
+    for alarms_names in [composite_alarms, metric_alarms]:
+        failed: int = delete_alarms(alarms_names, cloudwatch_client)
+        summary['deleted'] += len(alarms_names) - failed
+        summary['failed'] += failed
+    return summary
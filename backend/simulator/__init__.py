@@ -0,0 +1,10 @@
+'''
+Local simulator of riFT. It runs the lambda functions end to end against in memory fakes of the AWS services,
+with configurable latency, throttles and failures of each API, so the throughput and the API calls of the
+onboarding and notification flows can be measured without an AWS account. It is not packaged with the functions.
+
+fakes       fakes of EC2, CloudWatch, EventBridge, SNS, SSM, Secrets Manager, S3 and the webhook, and the fault injector.
+pipeline    execution environments of the functions, the rules and subscriptions of the deployment and the synthetic fleet.
+arguments   command line options of the fault injector.
+benchmark   replay of bursts of state change notifications, the time until the instances are alarmed and the API calls.
+'''
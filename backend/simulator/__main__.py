@@ -0,0 +1,52 @@
+import sys
+import json
+import time
+import argparse
+from typing import List, Dict, Any
+
+from .fakes import FakeAws
+from .arguments import add_fault_arguments, fault_injector
+from .pipeline import Simulator
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='simulator',
+                                     description='Run the riFT functions end to end against in memory AWS services.')
+    parser.add_argument('--instances', type=int, default=100,
+                        help='Number of synthetic T class instances to launch.')
+    parser.add_argument('--breach', type=int, default=10,
+                        help='Number of the launched instances whose alarms go into ALARM.')
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='Concurrency limit of each function.')
+    parser.add_argument('--timeout', type=float, default=600,
+                        help='Seconds to wait for the functions to finish each phase.')
+    add_fault_arguments(parser)
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print the logs of the functions.')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    with Simulator(FakeAws(fault_injector(args)), concurrency=args.concurrency, verbose=args.verbose) as simulator:
+        started_at: float = time.monotonic()
+        instance_ids: List[str] = simulator.launch_instances(args.instances, seed=args.seed)
+        onboarded: bool = simulator.drain(args.timeout)
+        onboard_seconds: float = time.monotonic() - started_at
+        started_at = time.monotonic()
+        simulator.breach(instance_ids[:args.breach])
+        notified: bool = simulator.drain(args.timeout)
+        notify_seconds: float = time.monotonic() - started_at
+        report: Dict[str, Any] = simulator.report()
+        failed_logs: List[Dict[str, Any]] = [log for log in simulator.logs if log['error']]
+    report['phases'] = {'onboard': {'seconds': round(onboard_seconds, 2), 'completed': onboarded},
+                        'notify': {'seconds': round(notify_seconds, 2), 'completed': notified}}
+    print(json.dumps(report, indent=2, default=str))
+    for log in failed_logs[:3]:
+        print(f'{log["function"]} failed: {log["error"]}', file=sys.stderr)
+        print('\n'.join(log['log'][-20:]), file=sys.stderr)
+    return 0 if onboarded and notified and len(failed_logs) == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
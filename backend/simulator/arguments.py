@@ -0,0 +1,34 @@
+import argparse
+from typing import List, Dict
+
+from .fakes import FaultInjector
+
+
+def api_rates(values: List[str]) -> Dict[str, float]:
+    '''Parse the service[.operation]=rate arguments.'''
+    rates: Dict[str, float] = {}
+    for value in values:
+        key, _, rate = value.partition('=')
+        rates[key] = float(rate)
+    return rates
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Latency of every API call in seconds.')
+    parser.add_argument('--throttle', action='append', default=[], metavar='SERVICE[.OPERATION]=RATE',
+                        help='Share of the calls of an API which are throttled, e.g. cloudwatch.put_metric_alarm=0.1.')
+    parser.add_argument('--failure', action='append', default=[], metavar='SERVICE[.OPERATION]=RATE',
+                        help='Share of the calls of an API which fail with a transient error.')
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def fault_injector(args: argparse.Namespace) -> FaultInjector:
+    '''The fault injector configured from the arguments added by add_fault_arguments.'''
+    faults = FaultInjector(seed=args.seed)
+    faults.configure('*', latency_seconds=args.latency)
+    for key, rate in api_rates(args.throttle).items():
+        faults.configure(key, latency_seconds=args.latency, throttle_rate=rate)
+    for key, rate in api_rates(args.failure).items():
+        faults.configure(key, latency_seconds=args.latency, failure_rate=rate)
+    return faults
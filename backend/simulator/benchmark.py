@@ -0,0 +1,156 @@
+import sys
+import json
+import math
+import time
+import argparse
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+from .fakes import FakeAws
+from .arguments import add_fault_arguments, fault_injector
+from .pipeline import Simulator
+
+PERCENTILES: List[int] = [50, 95, 99]
+
+
+def percentile(values: List[float], rank: int) -> Optional[float]:
+    '''The nearest rank percentile of the values.'''
+    if len(values) == 0:
+        return None
+    ordered: List[float] = sorted(values)
+    return ordered[max(0, math.ceil(rank / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {f'p{rank}': percentile(latencies, rank) for rank in PERCENTILES}
+    summary['max'] = max(latencies) if len(latencies) != 0 else None
+    return {name: None if value is None else round(value, 3) for name, value in summary.items()}
+
+
+def replay_bursts(simulator: Simulator, burst_sizes: List[int], arrival_rate: float,
+                  burst_interval_seconds: float, seed: int = None) -> List[List[str]]:
+    '''
+    Emit the pending state change notifications of the bursts of instances. A burst starts burst_interval_seconds
+    after the previous one, or once the previous one has arrived, and its notifications arrive at arrival_rate
+    per second, or all at once if it is 0. Returns the instance ids of each burst.
+    '''
+    bursts: List[List[str]] = [simulator.add_instances(size, seed=None if seed is None else seed + index)
+                               for index, size in enumerate(burst_sizes)]
+    next_burst_at: float = time.monotonic()
+    for instance_ids in bursts:
+        delay: float = next_burst_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        started_at: float = time.monotonic()
+        for index, instance_id in enumerate(instance_ids):
+            if arrival_rate > 0:
+                delay = started_at + index / arrival_rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            simulator.aws.set_instance_state(instance_id, 'pending')
+        next_burst_at = started_at + burst_interval_seconds
+    return bursts
+
+
+def time_to_composite_alarm(aws: FakeAws, instance_ids: List[str]) -> List[float]:
+    '''Seconds from the pending state change of each instance to the creation of its composite alarm.'''
+    with aws.lock:
+        timelines: List[Dict[str, float]] = [aws.timeline.get(instance_id, {}) for instance_id in instance_ids]
+    return [timeline['composite-alarm'] - timeline['pending'] for timeline in timelines
+            if 'pending' in timeline and 'composite-alarm' in timeline]
+
+
+def calls_per_instance(calls: Dict[str, int], instances: int) -> Dict[str, float]:
+    '''API calls per instance by service, from the calls keyed by '<service>.<operation>'.'''
+    services: Counter = Counter()
+    for key, count in calls.items():
+        services[key.split('.')[0]] += count
+    return {service: round(count / instances, 3) for service, count in sorted(services.items())}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with Simulator(FakeAws(fault_injector(args)), concurrency=args.concurrency, verbose=args.verbose) as simulator:
+        started_at: float = time.monotonic()
+        bursts: List[List[str]] = replay_bursts(simulator, args.bursts, args.arrival_rate,
+                                                args.burst_interval, args.seed)
+        completed: bool = simulator.drain(args.timeout)
+        wall_seconds: float = time.monotonic() - started_at
+        report: Dict[str, Any] = simulator.report()
+        latencies: List[List[float]] = [time_to_composite_alarm(simulator.aws, instance_ids) for instance_ids in bursts]
+    instances: int = sum(args.bursts)
+    api: Dict[str, Dict[str, int]] = report['api']
+    return {'config': {name: value for name, value in vars(args).items() if name not in ['output', 'baseline', 'verbose']},
+            'completed': completed,
+            'wall-seconds': round(wall_seconds, 3),
+            'instances': instances,
+            'alarmed-instances': sum(len(burst_latencies) for burst_latencies in latencies),
+            'time-to-composite-alarm-seconds': latency_summary([latency for burst_latencies in latencies
+                                                                for latency in burst_latencies]),
+            'bursts': [{'instances': len(instance_ids),
+                        'alarmed-instances': len(burst_latencies),
+                        'time-to-composite-alarm-seconds': latency_summary(burst_latencies)}
+                       for instance_ids, burst_latencies in zip(bursts, latencies)],
+            'calls-per-instance': calls_per_instance(api['calls'], instances),
+            'calls': api['calls'],
+            'throttles': api['throttles'],
+            'retries': api['retries'],
+            'failures': api['failures'],
+            'function-errors': sum(stats['errors'] for stats in report['functions'].values()),
+            'functions': report['functions']}
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    '''Change of the latency percentiles and of the calls per instance from a baseline result.'''
+    def delta(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+        return None if current is None or previous is None else round(current - previous, 3)
+
+    current_latency, baseline_latency = result['time-to-composite-alarm-seconds'], baseline['time-to-composite-alarm-seconds']
+    current_calls, baseline_calls = result['calls-per-instance'], baseline['calls-per-instance']
+    return {'time-to-composite-alarm-seconds': {name: delta(current_latency[name], baseline_latency.get(name))
+                                                for name in current_latency},
+            'calls-per-instance': {service: delta(current_calls.get(service, 0), baseline_calls.get(service, 0))
+                                   for service in sorted(set(current_calls) | set(baseline_calls))}}
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='simulator.benchmark',
+                                     description='Replay bursts of EC2 state change notifications through the riFT '
+                                                 'onboarding functions and measure the time until the instances are alarmed.')
+    parser.add_argument('--bursts', type=lambda value: [int(size) for size in value.split(',')], default=[500],
+                        help='Comma separated sizes of the bursts, e.g. 500,500.')
+    parser.add_argument('--arrival-rate', type=float, default=0.0,
+                        help='State change notifications per second within a burst, 0 to emit a burst at once.')
+    parser.add_argument('--burst-interval', type=float, default=0.0,
+                        help='Seconds between the starts of the bursts.')
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='Concurrency limit of each function.')
+    parser.add_argument('--timeout', type=float, default=600,
+                        help='Seconds to wait for the functions to finish.')
+    add_fault_arguments(parser)
+    parser.add_argument('--output', default=None,
+                        help='File to write the JSON result to instead of the standard output.')
+    parser.add_argument('--baseline', default=None,
+                        help='JSON result of an earlier run to compare with.')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print the logs of the functions.')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    result: Dict[str, Any] = run(args)
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            result['baseline-delta'] = compare(result, json.load(file))
+    if args.output is None:
+        print(json.dumps(result, indent=2))
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(result, file, indent=2)
+        print(f'p50/p95/p99 time to composite alarm: {result["time-to-composite-alarm-seconds"]}, '
+              f'calls per instance: {result["calls-per-instance"]}', file=sys.stderr)
+    return 0 if result['completed'] and result['function-errors'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,898 @@
+import re
+import json
+import time
+import uuid
+import random
+import fnmatch
+import hashlib
+import threading
+from functools import wraps
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from botocore.exceptions import ClientError
+
+ACCOUNT_ID = '123456789012'
+REGION = 'ap-southeast-2'
+REGION_NAME = 'Asia Pacific (Sydney)'
+
+# Error codes the services answer a throttled call with.
+THROTTLE_CODES: Dict[str, str] = {'ec2': 'RequestLimitExceeded',
+                                  'cloudwatch': 'Throttling',
+                                  'events': 'ThrottlingException',
+                                  'sns': 'Throttling',
+                                  'ssm': 'ThrottlingException',
+                                  'secretsmanager': 'ThrottlingException',
+                                  's3': 'SlowDown'}
+# Error codes the botocore standard retry mode retries, besides the throttles.
+TRANSIENT_CODES: List[str] = ['InternalFailure', 'InternalError', 'ServiceUnavailable']
+PUT_EVENTS_ENTRIES_LIMIT = 10
+PUT_EVENTS_SIZE_LIMIT = 256 * 1024
+SNS_MESSAGE_SIZE_LIMIT = 256 * 1024
+SNS_SUBJECT_LIMIT = 100
+INSTANCE_ID_PATTERN = re.compile(r'i-[0-9a-f]{17}')
+
+
+def client_error(code: str, message: str, operation: str, status: int = 400) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message},
+                        'ResponseMetadata': {'HTTPStatusCode': status}}, operation)
+
+
+def aws_timestamp(moment: datetime) -> str:
+    '''The timestamps of the alarm notifications look like 2021-09-06T05:25:41.493+0000.'''
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f'{moment.microsecond // 1000:03d}+0000'
+
+
+def now() -> datetime:
+    '''The time truncated to milliseconds like the timestamps of CloudWatch.'''
+    moment: datetime = datetime.now(timezone.utc)
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000)
+
+
+def response(**fields) -> Dict[str, Any]:
+    return dict(fields, ResponseMetadata={'RequestId': str(uuid.uuid4()), 'HTTPStatusCode': 200})
+
+
+def page(items: List[Any], next_token: Optional[str], page_size: int) -> Tuple[List[Any], Optional[str]]:
+    '''Slice a page of the items. The token is the offset of the next page.'''
+    start: int = int(next_token or 0)
+    end: int = start + page_size
+    return items[start:end], str(end) if end < len(items) else None
+
+
+@dataclass
+class ApiBehaviour:
+    '''
+    How an API answers. The latency is added to every attempt, the throttle and failure rates are the chance
+    an attempt is throttled or fails with an internal error, and the rate limit throttles the attempts above
+    that many per second. The entry failure rate is the chance each entry of a PutEvents call fails.
+    '''
+    latency_seconds: float = 0.0
+    jitter_seconds: float = 0.0
+    throttle_rate: float = 0.0
+    failure_rate: float = 0.0
+    rate_limit: Optional[float] = None
+    entry_failure_rate: float = 0.0
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            moment: float = time.monotonic()
+            self.tokens = min(self.rate, self.tokens +
+                              (moment - self.updated_at) * self.rate)
+            self.updated_at = moment
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FaultInjector:
+    '''
+    Applies the configured latency, throttles and failures to the calls of the fake clients and retries them
+    the way the botocore standard retry mode does, with the backoff scaled down by backoff_scale so a simulation
+    does not wait for real seconds. The behaviours are looked up by '<service>.<operation>', then '<service>',
+    then '*', e.g. 'cloudwatch.put_metric_alarm'. Every attempt is counted per scope, service and operation.
+    '''
+
+    def __init__(self, max_attempts: int = 10, backoff_scale: float = 0.01, seed: int = None):
+        self.max_attempts = max_attempts
+        self.backoff_scale = backoff_scale
+        self.behaviours: Dict[str, ApiBehaviour] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.throttles: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def configure(self, key: str, **behaviour):
+        '''Set the behaviour of an operation, a service or of all the APIs with '*'.'''
+        self.behaviours[key] = ApiBehaviour(**behaviour)
+        if self.behaviours[key].rate_limit is not None:
+            self.buckets[key] = TokenBucket(self.behaviours[key].rate_limit)
+        else:
+            self.buckets.pop(key, None)
+
+    def behaviour(self, service: str, operation: str) -> Tuple[str, ApiBehaviour]:
+        for key in [f'{service}.{operation}', service, '*']:
+            if key in self.behaviours:
+                return key, self.behaviours[key]
+        return '*', ApiBehaviour()
+
+    def chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+    def call(self, service: str, operation: str, scope: str, implementation: Callable[[], Any]):
+        key, behaviour = self.behaviour(service, operation)
+        counter_key: Tuple[str, str, str] = (scope, service, operation)
+        operation_name: str = ''.join(part.capitalize() for part in operation.split('_'))
+        for attempt in range(self.max_attempts):
+            with self.lock:
+                self.calls[counter_key] += 1
+            delay: float = behaviour.latency_seconds
+            if behaviour.jitter_seconds > 0:
+                with self.lock:
+                    delay += self.random.uniform(0, behaviour.jitter_seconds)
+            if delay > 0:
+                time.sleep(delay)
+            error: ClientError = None
+            bucket: TokenBucket = self.buckets.get(key)
+            if (bucket is not None and not bucket.take()) or self.chance(behaviour.throttle_rate):
+                with self.lock:
+                    self.throttles[counter_key] += 1
+                error = client_error(THROTTLE_CODES.get(service, 'Throttling'), 'Rate exceeded', operation_name)
+            elif self.chance(behaviour.failure_rate):
+                with self.lock:
+                    self.failures[counter_key] += 1
+                error = client_error('InternalFailure', 'Injected failure', operation_name, 500)
+            else:
+                try:
+                    return implementation()
+                except ClientError as err:
+                    if err.response['Error']['Code'] not in TRANSIENT_CODES:
+                        with self.lock:
+                            self.errors[counter_key] += 1
+                        raise
+                    error = err
+            if attempt == self.max_attempts - 1:
+                with self.lock:
+                    self.errors[counter_key] += 1
+                raise error
+            with self.lock:
+                self.retries[counter_key] += 1
+                backoff: float = self.random.random() * min(2 ** attempt, 20) * self.backoff_scale
+            time.sleep(backoff)
+
+    def stats(self, scope: str = None) -> Dict[str, Dict[str, int]]:
+        '''The counters keyed by '<service>.<operation>', of one scope or all of them.'''
+        with self.lock:
+            counters: Dict[str, Counter] = {'calls': self.calls,
+                                            'throttles': self.throttles,
+                                            'failures': self.failures,
+                                            'retries': self.retries,
+                                            'errors': self.errors}
+            totals: Dict[str, Dict[str, int]] = {}
+            for name, counter in counters.items():
+                totals[name] = Counter()
+                for (counter_scope, service, operation), count in counter.items():
+                    if scope is None or counter_scope == scope:
+                        totals[name][f'{service}.{operation}'] += count
+                totals[name] = dict(totals[name])
+            return totals
+
+
+def api(method):
+    '''A method of a fake client which goes through the fault injector as one API call.'''
+    @wraps(method)
+    def wrapper(self, **kwargs):
+        return self.aws.faults.call(self.service_name, method.__name__, self.scope,
+                                    lambda: method(self, **kwargs))
+    return wrapper
+
+
+class FakePaginator:
+    '''Follows the NextToken of the operation, each page is an API call.'''
+
+    def __init__(self, client, operation: str):
+        self.client = client
+        self.operation = operation
+
+    def paginate(self, **kwargs):
+        next_token: str = None
+        while True:
+            arguments: Dict[str, Any] = dict(kwargs)
+            if next_token is not None:
+                arguments['NextToken'] = next_token
+            result: Dict[str, Any] = getattr(self.client, self.operation)(**arguments)
+            yield result
+            next_token = result.get('NextToken')
+            if next_token is None:
+                return
+
+
+class FakeClient:
+    service_name = ''
+
+    def __init__(self, aws, scope: str):
+        self.aws = aws
+        self.scope = scope
+
+    def get_paginator(self, operation: str) -> FakePaginator:
+        return FakePaginator(self, operation)
+
+
+def matches_filter(instance: Dict[str, Any], name: str, values: List[str]) -> bool:
+    tags: Dict[str, str] = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+    if name == 'instance-id':
+        candidates = [instance['InstanceId']]
+    elif name == 'instance-type':
+        candidates = [instance['InstanceType']]
+    elif name == 'instance-state-name':
+        candidates = [instance['State']['Name']]
+    elif name == 'image-id':
+        candidates = [instance['ImageId']]
+    elif name == 'tag-key':
+        candidates = list(tags)
+    elif name.startswith('tag:'):
+        candidates = [tags[name[4:]]] if name[4:] in tags else []
+    else:
+        raise client_error('InvalidParameterValue', f'The filter {name} is invalid', 'DescribeInstances')
+    return any(fnmatch.fnmatchcase(candidate, value) for candidate in candidates for value in values)
+
+
+class FakeEC2(FakeClient):
+    service_name = 'ec2'
+
+    @api
+    def describe_instances(self, Filters: List[Dict[str, Any]] = None, InstanceIds: List[str] = None,
+                           MaxResults: int = 1000, NextToken: str = None) -> Dict[str, Any]:
+        with self.aws.lock:
+            if InstanceIds:
+                missing: List[str] = [instance_id for instance_id in InstanceIds
+                                       if instance_id not in self.aws.instances]
+                if len(missing) != 0:
+                    raise client_error('InvalidInstanceID.NotFound',
+                                       f'The instance IDs {missing} do not exist', 'DescribeInstances')
+                instances = [self.aws.instances[instance_id] for instance_id in InstanceIds]
+            else:
+                instances = list(self.aws.instances.values())
+            for instance_filter in Filters or []:
+                # Look the instances up by their ids instead of scanning the whole fleet.
+                if instance_filter['Name'] == 'instance-id' and not any('*' in value or '?' in value
+                                                                         for value in instance_filter['Values']):
+                    instances = [self.aws.instances[instance_id] for instance_id in dict.fromkeys(instance_filter['Values'])
+                                 if instance_id in self.aws.instances and
+                                 (not InstanceIds or instance_id in InstanceIds)]
+                    break
+            for instance_filter in Filters or []:
+                if len(instance_filter['Values']) > 200:
+                    raise client_error('InvalidParameterValue',
+                                       'A filter accepts at most 200 values', 'DescribeInstances')
+                instances = [instance for instance in instances
+                             if matches_filter(instance, instance_filter['Name'], instance_filter['Values'])]
+            instances, next_token = page(instances, NextToken, MaxResults)
+            reservations = [{'ReservationId': f'r-{instance["InstanceId"][2:]}',
+                             'OwnerId': ACCOUNT_ID,
+                             'Instances': [dict(instance, Tags=list(instance.get('Tags', [])))]}
+                            for instance in instances]
+        if next_token is None:
+            return response(Reservations=reservations)
+        return response(Reservations=reservations, NextToken=next_token)
+
+    @api
+    def describe_images(self, Filters: List[Dict[str, Any]] = None, ImageIds: List[str] = None) -> Dict[str, Any]:
+        image_ids: List[str] = list(ImageIds or [])
+        for image_filter in Filters or []:
+            if image_filter['Name'] == 'image-id':
+                image_ids.extend(image_filter['Values'])
+        with self.aws.lock:
+            images = [dict(self.aws.images[image_id]) for image_id in image_ids if image_id in self.aws.images]
+        return response(Images=images)
+
+    @api
+    def create_tags(self, Resources: List[str], Tags: List[Dict[str, str]]) -> Dict[str, Any]:
+        with self.aws.lock:
+            for instance_id in Resources:
+                instance: Dict[str, Any] = self.aws.instances[instance_id]
+                tags: Dict[str, str] = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                tags.update({tag['Key']: tag['Value'] for tag in Tags})
+                instance['Tags'] = [{'Key': key, 'Value': value} for key, value in tags.items()]
+        return response()
+
+
+class FakeCloudWatch(FakeClient):
+    service_name = 'cloudwatch'
+
+    @api
+    def put_metric_alarm(self, **alarm) -> Dict[str, Any]:
+        if alarm.get('DatapointsToAlarm', 1) > alarm['EvaluationPeriods']:
+            raise client_error('ValidationError',
+                               'DatapointsToAlarm must be at most EvaluationPeriods', 'PutMetricAlarm')
+        self.aws.put_alarm('MetricAlarm', alarm)
+        return response()
+
+    @api
+    def put_composite_alarm(self, **alarm) -> Dict[str, Any]:
+        self.aws.put_alarm('CompositeAlarm', alarm)
+        return response()
+
+    @api
+    def describe_alarms(self, AlarmNames: List[str] = None, AlarmNamePrefix: str = None,
+                        AlarmTypes: List[str] = None, StateValue: str = None,
+                        MaxRecords: int = 50, NextToken: str = None) -> Dict[str, Any]:
+        if AlarmNames is not None and len(AlarmNames) > 100:
+            raise client_error('ValidationError', 'At most 100 alarm names', 'DescribeAlarms')
+        if AlarmNames is not None and AlarmNamePrefix is not None:
+            raise client_error('ValidationError',
+                               'AlarmNames and AlarmNamePrefix are exclusive', 'DescribeAlarms')
+        alarm_types: List[str] = AlarmTypes or ['MetricAlarm']
+        with self.aws.lock:
+            alarms = [(alarm_type, alarm) for alarm_type in ['MetricAlarm', 'CompositeAlarm']
+                      if alarm_type in alarm_types
+                      for alarm in self.aws.alarms[alarm_type].values()
+                      if (AlarmNames is None or alarm['AlarmName'] in AlarmNames) and
+                      (AlarmNamePrefix is None or alarm['AlarmName'].startswith(AlarmNamePrefix)) and
+                      (StateValue is None or alarm['StateValue'] == StateValue)]
+            alarms.sort(key=lambda typed_alarm: typed_alarm[1]['AlarmName'])
+            alarms, next_token = page(alarms, NextToken, MaxRecords)
+            result: Dict[str, Any] = response(
+                MetricAlarms=[dict(alarm) for alarm_type, alarm in alarms if alarm_type == 'MetricAlarm'],
+                CompositeAlarms=[dict(alarm) for alarm_type, alarm in alarms if alarm_type == 'CompositeAlarm'])
+        if next_token is not None:
+            result['NextToken'] = next_token
+        return result
+
+    @api
+    def delete_alarms(self, AlarmNames: List[str]) -> Dict[str, Any]:
+        self.aws.delete_alarms(AlarmNames)
+        return response()
+
+    @api
+    def describe_alarm_history(self, AlarmName: str, HistoryItemType: str = None, AlarmTypes: List[str] = None,
+                               StartDate: datetime = None, EndDate: datetime = None, MaxRecords: int = 100,
+                               ScanBy: str = 'TimestampDescending', NextToken: str = None) -> Dict[str, Any]:
+        with self.aws.lock:
+            items = [dict(item) for item in self.aws.alarm_history.get(AlarmName, [])
+                     if (HistoryItemType is None or item['HistoryItemType'] == HistoryItemType) and
+                     (StartDate is None or item['Timestamp'] >= StartDate) and
+                     (EndDate is None or item['Timestamp'] <= EndDate)]
+        items.sort(key=lambda item: item['Timestamp'], reverse=ScanBy == 'TimestampDescending')
+        items, next_token = page(items, NextToken, MaxRecords)
+        if next_token is None:
+            return response(AlarmHistoryItems=items)
+        return response(AlarmHistoryItems=items, NextToken=next_token)
+
+    @api
+    def set_alarm_state(self, AlarmName: str, StateValue: str, StateReason: str,
+                        StateReasonData: str = None) -> Dict[str, Any]:
+        self.aws.set_alarm_state(AlarmName, StateValue, StateReason, StateReasonData)
+        return response()
+
+    @api
+    def get_metric_widget_image(self, MetricWidget: str, OutputFormat: str = 'png') -> Dict[str, Any]:
+        widget: Dict[str, Any] = json.loads(MetricWidget)
+        if len(widget.get('metrics', [])) == 0:
+            raise client_error('ValidationError', 'The widget has no metrics', 'GetMetricWidgetImage')
+        return response(MetricWidgetImage=self.aws.image_bytes)
+
+    @api
+    def list_metrics(self, Namespace: str = None, MetricName: str = None,
+                     Dimensions: List[Dict[str, str]] = None, NextToken: str = None) -> Dict[str, Any]:
+        metrics: List[Dict[str, Any]] = [metric for metric in self.aws.processes_metrics(Dimensions or [])
+                                         if (Namespace is None or metric['Namespace'] == Namespace) and
+                                         (MetricName is None or metric['MetricName'] == MetricName)]
+        metrics, next_token = page(metrics, NextToken, 500)
+        if next_token is None:
+            return response(Metrics=metrics)
+        return response(Metrics=metrics, NextToken=next_token)
+
+    @api
+    def get_metric_data(self, MetricDataQueries: List[Dict[str, Any]], StartTime: datetime, EndTime: datetime,
+                        NextToken: str = None, **kwargs) -> Dict[str, Any]:
+        if len(MetricDataQueries) > 500:
+            raise client_error('ValidationError', 'At most 500 queries', 'GetMetricData')
+        results: List[Dict[str, Any]] = []
+        for query in MetricDataQueries:
+            seed: str = json.dumps(query.get('MetricStat', {}), sort_keys=True, default=str)
+            value: float = int(hashlib.sha256(seed.encode('utf-8')).hexdigest()[:8], 16) % 10000 / 100
+            results.append({'Id': query['Id'],
+                            'Label': query['Id'],
+                            'Timestamps': [EndTime],
+                            'Values': [value],
+                            'StatusCode': 'Complete'})
+        return response(MetricDataResults=results, Messages=[])
+
+
+class FakeEventBridge(FakeClient):
+    service_name = 'events'
+
+    @api
+    def put_events(self, Entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(Entries) == 0 or len(Entries) > PUT_EVENTS_ENTRIES_LIMIT:
+            raise client_error('ValidationException',
+                               f'PutEvents accepts 1 to {PUT_EVENTS_ENTRIES_LIMIT} entries', 'PutEvents')
+        size: int = sum(len(json.dumps(entry, default=str).encode('utf-8')) for entry in Entries)
+        if size > PUT_EVENTS_SIZE_LIMIT:
+            raise client_error('ValidationException', f'The entries are {size} bytes', 'PutEvents')
+        _, behaviour = self.aws.faults.behaviour(self.service_name, 'put_events')
+        results: List[Dict[str, str]] = []
+        for entry in Entries:
+            if self.aws.faults.chance(behaviour.entry_failure_rate):
+                results.append({'ErrorCode': 'ThrottlingException', 'ErrorMessage': 'Rate exceeded'})
+                continue
+            try:
+                detail: Dict[str, Any] = json.loads(entry['Detail'])
+            except (KeyError, ValueError):
+                results.append({'ErrorCode': 'MalformedDetail', 'ErrorMessage': 'Detail is not valid JSON'})
+                continue
+            results.append({'EventId': self.aws.emit_event(entry.get('EventBusName') or 'default',
+                                                           entry['Source'],
+                                                           entry['DetailType'],
+                                                           detail,
+                                                           entry.get('Resources', []))})
+        return response(FailedEntryCount=len([result for result in results if 'ErrorCode' in result]),
+                        Entries=results)
+
+
+class FakeSNS(FakeClient):
+    service_name = 'sns'
+
+    @api
+    def publish(self, TopicArn: str, Message: str, Subject: str = None,
+                MessageStructure: str = None, **kwargs) -> Dict[str, Any]:
+        if Subject is not None and len(Subject) > SNS_SUBJECT_LIMIT:
+            raise client_error('InvalidParameter', 'Subject must be at most 100 characters', 'Publish')
+        if len(Message.encode('utf-8')) > SNS_MESSAGE_SIZE_LIMIT:
+            raise client_error('InvalidParameter', 'Message too long', 'Publish')
+        if TopicArn not in self.aws.topics:
+            raise client_error('NotFound', f'Topic {TopicArn} does not exist', 'Publish', 404)
+        return response(MessageId=self.aws.publish(TopicArn, Message, Subject))
+
+
+class FakeSSM(FakeClient):
+    service_name = 'ssm'
+
+    @api
+    def get_parameters(self, Names: List[str], WithDecryption: bool = False) -> Dict[str, Any]:
+        if len(Names) > 10:
+            raise client_error('ValidationException', 'At most 10 names', 'GetParameters')
+        with self.aws.lock:
+            parameters = [dict(self.aws.parameters[name]) for name in Names if name in self.aws.parameters]
+        return response(Parameters=parameters,
+                        InvalidParameters=[name for name in Names if name not in self.aws.parameters])
+
+    @api
+    def put_parameter(self, Name: str, Value: str, Overwrite: bool = False, **kwargs) -> Dict[str, Any]:
+        if Name in self.aws.parameters and not Overwrite:
+            raise client_error('ParameterAlreadyExists', f'{Name} exists', 'PutParameter')
+        return response(Version=self.aws.put_parameter(Name, Value), Tier='Standard')
+
+
+class FakeSecretsManager(FakeClient):
+    service_name = 'secretsmanager'
+
+    @api
+    def get_secret_value(self, SecretId: str, **kwargs) -> Dict[str, Any]:
+        with self.aws.lock:
+            secret: Dict[str, Any] = self.aws.secrets.get(SecretId)
+        if secret is None:
+            raise client_error('ResourceNotFoundException',
+                               f'Secrets Manager can not find {SecretId}', 'GetSecretValue')
+        return response(ARN=f'arn:aws:secretsmanager:{REGION}:{ACCOUNT_ID}:secret:{SecretId}',
+                        Name=SecretId, **secret)
+
+
+class FakeS3(FakeClient):
+    service_name = 's3'
+
+    @api
+    def put_object(self, Bucket: str, Key: str, Body: bytes = b'', **kwargs) -> Dict[str, Any]:
+        with self.aws.lock:
+            self.aws.objects[(Bucket, Key)] = {'ContentLength': len(Body),
+                                               'LastModified': now(),
+                                               'ContentType': kwargs.get('ContentType', 'binary/octet-stream')}
+        return response(ETag=f'"{hashlib.md5(Key.encode("utf-8")).hexdigest()}"')
+
+    @api
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        with self.aws.lock:
+            head: Dict[str, Any] = self.aws.objects.get((Bucket, Key))
+        if head is None:
+            raise client_error('404', 'Not Found', 'HeadObject', 404)
+        return response(**head)
+
+
+FAKE_CLIENTS: Dict[str, type] = {'ec2': FakeEC2,
+                                 'cloudwatch': FakeCloudWatch,
+                                 'events': FakeEventBridge,
+                                 'sns': FakeSNS,
+                                 'ssm': FakeSSM,
+                                 'secretsmanager': FakeSecretsManager,
+                                 's3': FakeS3}
+
+
+def alarm_rule_children(alarm_rule: str) -> List[Tuple[str, str]]:
+    '''The states and names of the alarms of a rule like ALARM(a) AND ALARM(b).'''
+    children: List[Tuple[str, str]] = []
+    for term in alarm_rule.replace(' OR ', ' AND ').split(' AND '):
+        state, _, name = term.strip().rstrip(')').partition('(')
+        children.append((state.strip(), name.strip().strip('"')))
+    return children
+
+
+def evaluate_alarm_rule(alarm_rule: str, states: Dict[str, str]) -> bool:
+    '''Evaluate a rule of ALARM(), OK() or INSUFFICIENT_DATA() terms all joined by AND or all joined by OR.'''
+    terms: List[bool] = [states.get(name) == state for state, name in alarm_rule_children(alarm_rule)]
+    return any(terms) if ' OR ' in alarm_rule else all(terms)
+
+
+class FakeAws:
+    '''
+    The state of an account in memory: instances and images, alarms and their history, event buses and rules,
+    SNS topics, SSM parameters, secrets and S3 objects. The fake clients of every scope share it.
+    Composite alarms are evaluated when a child changes state and publish to their actions on ALARM.
+    The EventBridge rules, the SNS subscriptions of lambda functions and the invocation of the functions
+    are set up by the simulator through the deliver callback.
+    '''
+
+    def __init__(self, faults: FaultInjector = None, processes_per_instance: int = 12, image_size: int = 2048):
+        self.faults = faults or FaultInjector()
+        self.lock = threading.RLock()
+        self.instances: Dict[str, Dict[str, Any]] = {}
+        self.images: Dict[str, Dict[str, Any]] = {}
+        self.alarms: Dict[str, Dict[str, Dict[str, Any]]] = {'MetricAlarm': {}, 'CompositeAlarm': {}}
+        self.alarm_history: Dict[str, List[Dict[str, Any]]] = {}
+        self.rules: List[Tuple[str, str, Dict[str, Any], str]] = []
+        self.topics: Dict[str, List[str]] = {}
+        self.deliveries: Dict[str, List[Dict[str, Any]]] = {}
+        self.parameters: Dict[str, Dict[str, Any]] = {}
+        self.secrets: Dict[str, Dict[str, Any]] = {}
+        self.objects: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.processes_per_instance = processes_per_instance
+        self.image_bytes: bytes = b'\x89PNG\r\n\x1a\n' + bytes(max(0, image_size - 8))
+        # Invokes a function asynchronously with an event, set by the simulator.
+        self.deliver: Callable[[str, Dict[str, Any]], None] = lambda function, event: None
+        # Milestones of the instances, e.g. when the composite alarm was created.
+        self.timeline: Dict[str, Dict[str, float]] = {}
+
+    def client(self, service: str, scope: str = 'default') -> FakeClient:
+        return FAKE_CLIENTS[service](self, scope)
+
+    def mark(self, instance_id: str, milestone: str):
+        with self.lock:
+            self.timeline.setdefault(instance_id, {}).setdefault(milestone, time.monotonic())
+
+    # EC2
+
+    def add_image(self, image_id: str, platform_details: str = 'Linux/UNIX'):
+        with self.lock:
+            self.images[image_id] = {'ImageId': image_id,
+                                     'PlatformDetails': platform_details,
+                                     'State': 'available'}
+
+    def add_instance(self, instance_id: str, instance_type: str, image_id: str,
+                     tags: Dict[str, str], platform_details: str = None, state: str = 'pending'):
+        instance: Dict[str, Any] = {'InstanceId': instance_id,
+                                    'InstanceType': instance_type,
+                                    'ImageId': image_id,
+                                    'LaunchTime': now(),
+                                    'State': {'Name': state},
+                                    'Tags': [{'Key': key, 'Value': value} for key, value in tags.items()]}
+        if platform_details is not None:
+            instance['PlatformDetails'] = platform_details
+        with self.lock:
+            self.instances[instance_id] = instance
+
+    def set_instance_state(self, instance_id: str, state: str):
+        '''Change the state of the instance and emit its state change notification to the default bus.'''
+        with self.lock:
+            self.instances[instance_id]['State'] = {'Name': state}
+        self.mark(instance_id, state)
+        self.emit_event('default', 'aws.ec2', 'EC2 Instance State-change Notification',
+                        {'instance-id': instance_id, 'state': state},
+                        [f'arn:aws:ec2:{REGION}:{ACCOUNT_ID}:instance/{instance_id}'])
+
+    # CloudWatch
+
+    def alarm_arn(self, alarm_name: str) -> str:
+        return f'arn:aws:cloudwatch:{REGION}:{ACCOUNT_ID}:alarm:{alarm_name}'
+
+    def put_alarm(self, alarm_type: str, alarm: Dict[str, Any]):
+        alarm_name: str = alarm['AlarmName']
+        moment: datetime = now()
+        with self.lock:
+            if alarm_type == 'CompositeAlarm':
+                for _, child_name in alarm_rule_children(alarm['AlarmRule']):
+                    if child_name not in self.alarms['MetricAlarm'] and child_name not in self.alarms['CompositeAlarm']:
+                        raise client_error('ValidationError',
+                                           f'Could not find alarm {child_name} of the rule', 'PutCompositeAlarm')
+            existing: Dict[str, Any] = self.alarms[alarm_type].get(alarm_name, {})
+            stored: Dict[str, Any] = {key: value for key, value in alarm.items() if key != 'Tags'}
+            stored.update({'AlarmArn': self.alarm_arn(alarm_name),
+                           'AlarmConfigurationUpdatedTimestamp': moment,
+                           'OKActions': alarm.get('OKActions', []),
+                           'AlarmActions': alarm.get('AlarmActions', []),
+                           'InsufficientDataActions': alarm.get('InsufficientDataActions', []),
+                           'StateValue': existing.get('StateValue', 'INSUFFICIENT_DATA'),
+                           'StateReason': existing.get('StateReason', 'Unchecked: Initial alarm creation'),
+                           'StateReasonData': existing.get('StateReasonData', '{}'),
+                           'StateUpdatedTimestamp': existing.get('StateUpdatedTimestamp', moment)})
+            self.alarms[alarm_type][alarm_name] = stored
+            if alarm_type == 'CompositeAlarm':
+                self.mark(alarm_name[:19], 'composite-alarm')
+                self.evaluate_composite_alarm(stored)
+
+    def delete_alarms(self, alarm_names: List[str]):
+        if len(alarm_names) > 100:
+            raise client_error('ValidationError', 'At most 100 alarm names', 'DeleteAlarms')
+        with self.lock:
+            missing: List[str] = [name for name in alarm_names
+                                  if name not in self.alarms['MetricAlarm'] and name not in self.alarms['CompositeAlarm']]
+            if len(missing) != 0:
+                raise client_error('ResourceNotFound', f'Alarms {missing} do not exist', 'DeleteAlarms', 404)
+            for composite_alarm in self.alarms['CompositeAlarm'].values():
+                if composite_alarm['AlarmName'] in alarm_names:
+                    continue
+                referred: List[str] = [name for _, name in alarm_rule_children(composite_alarm['AlarmRule'])
+                                       if name in alarm_names]
+                if len(referred) != 0:
+                    raise client_error('ValidationError',
+                                       f'Alarms {referred} are in the rule of {composite_alarm["AlarmName"]}',
+                                       'DeleteAlarms')
+            for name in alarm_names:
+                self.alarms['MetricAlarm'].pop(name, None)
+                self.alarms['CompositeAlarm'].pop(name, None)
+                self.alarm_history.pop(name, None)
+
+    def record_state_update(self, alarm_type: str, alarm: Dict[str, Any], old_state: Dict[str, Any]):
+        history_data: Dict[str, Any] = {'version': '1.0',
+                                        'oldState': old_state,
+                                        'newState': {'stateValue': alarm['StateValue'],
+                                                     'stateReason': alarm['StateReason'],
+                                                     'stateReasonData': json.loads(alarm['StateReasonData'] or '{}')}}
+        self.alarm_history.setdefault(alarm['AlarmName'], []).append({
+            'AlarmName': alarm['AlarmName'],
+            'AlarmType': alarm_type,
+            'Timestamp': alarm['StateUpdatedTimestamp'],
+            'HistoryItemType': 'StateUpdate',
+            'HistorySummary': f'Alarm updated from {old_state["stateValue"]} to {alarm["StateValue"]}',
+            'HistoryData': json.dumps(history_data)})
+
+    def set_alarm_state(self, alarm_name: str, state: str, reason: str, reason_data: str = None):
+        with self.lock:
+            alarm: Dict[str, Any] = self.alarms['MetricAlarm'].get(alarm_name)
+            if alarm is None:
+                raise client_error('ResourceNotFound', f'Alarm {alarm_name} does not exist', 'SetAlarmState', 404)
+            old_state: Dict[str, Any] = {'stateValue': alarm['StateValue'], 'stateReason': alarm['StateReason']}
+            alarm.update({'StateValue': state,
+                          'StateReason': reason,
+                          'StateReasonData': reason_data or '{}',
+                          'StateUpdatedTimestamp': now()})
+            self.record_state_update('MetricAlarm', alarm, old_state)
+            for composite_alarm in list(self.alarms['CompositeAlarm'].values()):
+                if alarm_name in [name for _, name in alarm_rule_children(composite_alarm['AlarmRule'])]:
+                    self.evaluate_composite_alarm(composite_alarm)
+
+    def evaluate_composite_alarm(self, alarm: Dict[str, Any]):
+        '''Update the state of the composite alarm from its children and publish to its actions when it goes to ALARM.'''
+        children: List[Dict[str, Any]] = [self.alarms['MetricAlarm'].get(name) or self.alarms['CompositeAlarm'].get(name)
+                                          for _, name in alarm_rule_children(alarm['AlarmRule'])]
+        states: Dict[str, str] = {child['AlarmName']: child['StateValue'] for child in children if child is not None}
+        state: str = 'ALARM' if evaluate_alarm_rule(alarm['AlarmRule'], states) else 'OK'
+        if state == alarm['StateValue']:
+            return
+        old_state: Dict[str, Any] = {'stateValue': alarm['StateValue'], 'stateReason': alarm['StateReason']}
+        triggering_children: List[Dict[str, Any]] = [
+            {'Arn': child['AlarmArn'],
+             'State': {'Value': child['StateValue'], 'Timestamp': aws_timestamp(child['StateUpdatedTimestamp'])}}
+            for child in children if child is not None and child['StateValue'] == 'ALARM']
+        alarm.update({'StateValue': state,
+                      'StateReason': f'{alarm["AlarmRule"]} evaluated to {state == "ALARM"}',
+                      'StateReasonData': json.dumps({'triggeringAlarms': [child['Arn'] for child in triggering_children]}),
+                      'StateUpdatedTimestamp': now()})
+        self.record_state_update('CompositeAlarm', alarm, old_state)
+        if state != 'ALARM' or not alarm.get('ActionsEnabled', True):
+            return
+        self.mark(alarm['AlarmName'][:19], 'alarm')
+        notification: Dict[str, Any] = {'AlarmName': alarm['AlarmName'],
+                                        'AlarmDescription': alarm.get('AlarmDescription', ''),
+                                        'AWSAccountId': ACCOUNT_ID,
+                                        'AlarmConfigurationUpdatedTimestamp': aws_timestamp(alarm['AlarmConfigurationUpdatedTimestamp']),
+                                        'NewStateValue': state,
+                                        'NewStateReason': alarm['StateReason'],
+                                        'StateChangeTime': aws_timestamp(alarm['StateUpdatedTimestamp']),
+                                        'Region': REGION_NAME,
+                                        'AlarmArn': alarm['AlarmArn'],
+                                        'OldStateValue': old_state['stateValue'],
+                                        'OKActions': alarm['OKActions'],
+                                        'AlarmActions': alarm['AlarmActions'],
+                                        'InsufficientDataActions': alarm['InsufficientDataActions'],
+                                        'AlarmRule': alarm['AlarmRule'],
+                                        'TriggeringChildren': triggering_children}
+        subject: str = f'ALARM: "{alarm["AlarmName"]}" in {REGION_NAME}'[:SNS_SUBJECT_LIMIT]
+        for topic_arn in alarm['AlarmActions']:
+            if topic_arn in self.topics:
+                self.publish(topic_arn, json.dumps(notification), subject)
+
+    def processes_metrics(self, dimensions: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        '''The procstat metrics of the CloudWatch agent of the instance the dimensions name.'''
+        wanted: Dict[str, Optional[str]] = {dimension['Name']: dimension.get('Value') for dimension in dimensions}
+        instance: Dict[str, Any] = self.instances.get(wanted.get('InstanceId'))
+        if instance is None:
+            return []
+        metrics: List[Dict[str, Any]] = []
+        for metric_name in ['procstat_cpu_usage', 'procstat cpu_usage']:
+            for index in range(self.processes_per_instance):
+                metric_dimensions: Dict[str, str] = {'InstanceId': instance['InstanceId'],
+                                                     'InstanceType': instance['InstanceType'],
+                                                     'exe': f'process-{index}'}
+                if all(name in metric_dimensions and (value is None or metric_dimensions[name] == value)
+                       for name, value in wanted.items()):
+                    metrics.append({'Namespace': 'CWAgent',
+                                    'MetricName': metric_name,
+                                    'Dimensions': [{'Name': name, 'Value': value}
+                                                   for name, value in metric_dimensions.items()]})
+        return metrics
+
+    # EventBridge
+
+    def put_rule(self, event_bus_name: str, rule_name: str, event_pattern: Dict[str, Any], function: str):
+        with self.lock:
+            self.rules.append((event_bus_name, rule_name, event_pattern, function))
+
+    def emit_event(self, event_bus_name: str, source: str, detail_type: str,
+                   detail: Dict[str, Any], resources: List[str]) -> str:
+        '''Deliver the event to the functions of the rules of the bus it matches. Returns the event id.'''
+        event: Dict[str, Any] = {'version': '0',
+                                 'id': str(uuid.uuid4()),
+                                 'detail-type': detail_type,
+                                 'source': source,
+                                 'account': ACCOUNT_ID,
+                                 'time': now().strftime('%Y-%m-%dT%H:%M:%SZ'),
+                                 'region': REGION,
+                                 'resources': resources,
+                                 'detail': detail}
+        with self.lock:
+            rules = list(self.rules)
+        for rule_event_bus_name, _, event_pattern, function in rules:
+            if rule_event_bus_name == event_bus_name and matches_pattern(event, event_pattern):
+                self.deliver(function, event)
+        return event['id']
+
+    # SNS
+
+    def create_topic(self, name: str) -> str:
+        topic_arn: str = f'arn:aws:sns:{REGION}:{ACCOUNT_ID}:{name}'
+        with self.lock:
+            self.topics.setdefault(topic_arn, [])
+            self.deliveries.setdefault(topic_arn, [])
+        return topic_arn
+
+    def subscribe(self, topic_arn: str, function: str):
+        with self.lock:
+            self.topics[topic_arn].append(function)
+
+    def publish(self, topic_arn: str, message: str, subject: str = None) -> str:
+        '''
+        Invoke the functions subscribed to the topic with the message.
+        The messages of a topic without functions, e.g. the email subscribers, are kept in the deliveries.
+        '''
+        message_id: str = str(uuid.uuid4())
+        with self.lock:
+            functions: List[str] = list(self.topics[topic_arn])
+            if len(functions) == 0:
+                self.deliveries[topic_arn].append({'MessageId': message_id,
+                                                   'Subject': subject,
+                                                   'Message': message})
+                for instance_id in set(INSTANCE_ID_PATTERN.findall(message)):
+                    self.mark(instance_id, 'email')
+        for function in functions:
+            self.deliver(function, {'Records': [{
+                'EventSource': 'aws:sns',
+                'EventVersion': '1.0',
+                'EventSubscriptionArn': f'{topic_arn}:{uuid.uuid4()}',
+                'Sns': {'Type': 'Notification',
+                        'MessageId': message_id,
+                        'TopicArn': topic_arn,
+                        'Subject': subject,
+                        'Message': message,
+                        'Timestamp': now().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                        'MessageAttributes': {}}}]})
+        return message_id
+
+    # SSM
+
+    def put_parameter(self, name: str, value: str) -> int:
+        with self.lock:
+            version: int = self.parameters.get(name, {}).get('Version', 0) + 1
+            self.parameters[name] = {'Name': name,
+                                     'Type': 'String',
+                                     'Value': value,
+                                     'Version': version,
+                                     'LastModifiedDate': now(),
+                                     'ARN': f'arn:aws:ssm:{REGION}:{ACCOUNT_ID}:parameter{name}'}
+        return version
+
+    # Secrets Manager
+
+    def put_secret(self, name: str, value: Dict[str, Any]):
+        with self.lock:
+            self.secrets[name] = {'SecretString': json.dumps(value),
+                                  'VersionId': str(uuid.uuid4())}
+
+
+def matches_pattern(event: Dict[str, Any], pattern: Dict[str, Any]) -> bool:
+    '''
+    Match an event with an EventBridge pattern of exact values. A field matches a list of values when its value,
+    or one of its values when it is a list, is in the list. The nested fields are matched recursively.
+    '''
+    for field, expected in pattern.items():
+        if field not in event:
+            return False
+        value = event[field]
+        if isinstance(expected, dict):
+            if not isinstance(value, dict) or not matches_pattern(value, expected):
+                return False
+            continue
+        values: List[Any] = value if isinstance(value, list) else [value]
+        if not any(candidate in expected for candidate in values):
+            return False
+    return True
+
+
+class FakeHttpResponse:
+
+    def __init__(self, status: int, headers: Dict[str, str] = None):
+        self.status = status
+        self.headers = headers or {}
+
+
+class FakeWebhookPool:
+    '''
+    Stands in for the urllib3 pool of the webhook delivery. The posts go through the fault injector as the
+    'webhook.post' API, a throttled post is answered with 429 and a failed one with 503. The payloads are kept.
+    '''
+
+    def __init__(self, aws: FakeAws, scope: str):
+        self.aws = aws
+        self.faults = aws.faults
+        self.scope = scope
+        self.payloads: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def request(self, method: str, url: str, body: bytes = None, headers: Dict[str, str] = None) -> FakeHttpResponse:
+        key, behaviour = self.faults.behaviour('webhook', 'post')
+        counter_key: Tuple[str, str, str] = (self.scope, 'webhook', 'post')
+        with self.faults.lock:
+            self.faults.calls[counter_key] += 1
+        if behaviour.latency_seconds > 0:
+            time.sleep(behaviour.latency_seconds)
+        bucket: TokenBucket = self.faults.buckets.get(key)
+        if (bucket is not None and not bucket.take()) or self.faults.chance(behaviour.throttle_rate):
+            with self.faults.lock:
+                self.faults.throttles[counter_key] += 1
+            return FakeHttpResponse(429, {'Retry-After': '0'})
+        if self.faults.chance(behaviour.failure_rate):
+            with self.faults.lock:
+                self.faults.failures[counter_key] += 1
+            return FakeHttpResponse(503)
+        with self.lock:
+            self.payloads.append(json.loads(body))
+        for instance_id in set(INSTANCE_ID_PATTERN.findall(body.decode('utf-8'))):
+            self.aws.mark(instance_id, 'ms-teams')
+        return FakeHttpResponse(200)
@@ -0,0 +1,584 @@
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import tempfile
+import importlib
+import importlib.util
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Callable, List, Dict, Any, Optional
+
+from .fakes import (FakeAws,
+                    FaultInjector,
+                    FakeWebhookPool,
+                    REGION,
+                    ACCOUNT_ID,
+                    aws_timestamp,
+                    now)
+
+LAMBDA_PATH: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambda')
+# Packages of the rift layer, loaded again for every execution environment.
+LAYER_PACKAGES: List[str] = ['rift', 'util']
+# Keys of the client registry whose service name is not the boto3 one.
+SERVICE_ALIASES: Dict[str, str] = {'eventbridge': 'events',
+                                   'cw_events': 'events'}
+# Instance types of the synthetic fleet.
+BURSTABLE_INSTANCE_TYPES: List[str] = ['t2.micro', 't2.small', 't2.medium', 't2.large',
+                                       't3.nano', 't3.micro', 't3.small', 't3.medium', 't3.large', 't3.xlarge',
+                                       't3a.micro', 't3a.small', 't3a.medium', 't3a.large',
+                                       't4g.micro', 't4g.small', 't4g.medium', 't4g.large']
+
+import_lock = threading.Lock()
+
+
+@dataclass
+class FunctionSpec:
+    '''A lambda function as Terraform deploys it, its source directory, name, environment and timeout.'''
+    directory: str
+    name: str
+    environment: Dict[str, str]
+    timeout_seconds: float
+    concurrency: int = None
+
+
+class FunctionOs:
+    '''
+    Stands in for the os module in the modules of one function, so each function reads its own environment
+    variables while the functions run side by side in the same process.
+    '''
+
+    def __init__(self, environ: Dict[str, str]):
+        self.environ = environ
+
+    def getenv(self, key: str, default: str = None) -> str:
+        return self.environ.get(key, default)
+
+    def __getattr__(self, name: str):
+        return getattr(os, name)
+
+
+def is_function_module(name: str) -> bool:
+    return name == 'lambda_function' or any(name == package or name.startswith(f'{package}.')
+                                            for package in LAYER_PACKAGES)
+
+
+def drop_function_modules():
+    for name in [name for name in sys.modules if is_function_module(name)]:
+        del sys.modules[name]
+
+
+def load_function(directory: str, environment: Dict[str, str]) -> Dict[str, Any]:
+    '''
+    Import the lambda_function module of the function and the rift and util modules it uses, as a new
+    execution environment does. The module level state, e.g. the caches and the client registry, is not shared
+    with the other environments. The environment variables are set while the modules are imported.
+    Returns the modules keyed by their names.
+    '''
+    with import_lock:
+        saved_path: List[str] = list(sys.path)
+        saved_environ: Dict[str, Optional[str]] = {key: os.environ.get(key) for key in environment}
+        sys.path[:0] = [os.path.join(LAMBDA_PATH, directory), LAMBDA_PATH]
+        os.environ.update(environment)
+        drop_function_modules()
+        try:
+            importlib.import_module('lambda_function')
+            modules: Dict[str, Any] = {name: module for name, module in sys.modules.items()
+                                       if is_function_module(name)}
+        finally:
+            drop_function_modules()
+            sys.path[:] = saved_path
+            for key, value in saved_environ.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    function_os = FunctionOs(dict(environment))
+    for module in modules.values():
+        if module.__dict__.get('os') is os:
+            module.os = function_os
+    return modules
+
+
+class FakeContext:
+
+    def __init__(self, spec: FunctionSpec):
+        self.function_name = spec.name
+        self.function_version = '$LATEST'
+        self.invoked_function_arn = f'arn:aws:lambda:{REGION}:{ACCOUNT_ID}:function:{spec.name}'
+        self.memory_limit_in_mb = 128
+        self.aws_request_id = str(uuid.uuid4())
+        self.log_group_name = f'/aws/lambda/{spec.name}'
+        self.deadline = time.monotonic() + spec.timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+class LogRouter(io.TextIOBase):
+    '''
+    Takes the place of sys.stdout during a simulation. The lines a function prints are kept in the log of its
+    invocation and the metrics in the embedded metric format are collected, as CloudWatch Logs would extract them.
+    The lines printed by other threads are dropped unless verbose.
+    '''
+
+    def __init__(self, stdout, verbose: bool):
+        self.stdout = stdout
+        self.verbose = verbose
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Dict[str, float]] = {}
+
+    def begin(self, log: List[str]):
+        self.local.log = log
+        self.local.partial = ''
+
+    def end(self):
+        self.local.log = None
+
+    def write(self, text: str) -> int:
+        log: List[str] = getattr(self.local, 'log', None)
+        if log is None:
+            if self.verbose:
+                self.stdout.write(text)
+            return len(text)
+        lines: List[str] = (self.local.partial + text).split('\n')
+        self.local.partial = lines.pop()
+        for line in lines:
+            log.append(line)
+            if line.startswith('{"_aws"'):
+                self.collect_metrics(json.loads(line))
+        return len(text)
+
+    def collect_metrics(self, record: Dict[str, Any]):
+        for directive in record['_aws']['CloudWatchMetrics']:
+            function_name: str = record.get('FunctionName', 'unknown')
+            with self.lock:
+                function_metrics: Dict[str, float] = self.metrics.setdefault(function_name, {})
+                for metric in directive['Metrics']:
+                    key: str = metric['Name'] if 'Channel' not in record else f'{metric["Name"]}.{record["Channel"]}'
+                    function_metrics[key] = function_metrics.get(key, 0) + record[metric['Name']]
+
+    def flush(self):
+        self.stdout.flush()
+
+
+@dataclass
+class Invocation:
+    event: Dict[str, Any]
+    attempt: int = 0
+    future: Future = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class ExecutionEnvironment:
+    '''One execution environment of a function, its own copy of the modules with the fake clients injected.'''
+
+    def __init__(self, spec: FunctionSpec, simulator):
+        self.directory = tempfile.mkdtemp(prefix=f'{spec.name}-')
+        environment: Dict[str, str] = dict(spec.environment,
+                                           IMAGE_PLATFORM_CACHE_PATH=os.path.join(self.directory, 'rift-image-platforms.json'))
+        self.modules: Dict[str, Any] = load_function(spec.directory, environment)
+        self.handler: Callable = self.modules['lambda_function'].lambda_handler
+        registry = self.modules['util.client_registry_util'].aws_services
+        registry.create = lambda key: simulator.aws_service(key, spec.name)
+        self.webhook_pool: FakeWebhookPool = None
+        if 'util.delivery_util' in self.modules:
+            self.webhook_pool = FakeWebhookPool(simulator.aws, spec.name)
+            self.modules['util.delivery_util'].webhook_delivery.pool = self.webhook_pool
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class FunctionRuntime:
+    '''
+    Runs the invocations of a function like Lambda does. Each worker thread is one execution environment,
+    created on the first invocation it takes, which is a cold start. A new environment is started while
+    all the others are busy, up to the concurrency. An asynchronous invocation which fails is retried twice.
+    '''
+
+    def __init__(self, spec: FunctionSpec, simulator, concurrency: int, async_retries: int):
+        self.spec = spec
+        self.simulator = simulator
+        self.concurrency = concurrency
+        self.async_retries = async_retries
+        self.queue: deque = deque()
+        self.condition = threading.Condition()
+        self.workers: List[threading.Thread] = []
+        self.idle_workers = 0
+        self.environments: List[ExecutionEnvironment] = []
+        self.closed = False
+        self.counters: Dict[str, int] = {'invocations': 0,
+                                         'errors': 0,
+                                         'retries': 0,
+                                         'dropped': 0,
+                                         'timeouts': 0,
+                                         'cold-starts': 0}
+        self.durations: List[float] = []
+
+    def enqueue(self, invocation: Invocation):
+        with self.condition:
+            self.queue.append(invocation)
+            if self.idle_workers == 0 and len(self.workers) < self.concurrency:
+                worker = threading.Thread(target=self.work, name=f'{self.spec.name}-{len(self.workers)}', daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            else:
+                self.condition.notify()
+
+    def work(self):
+        environment: ExecutionEnvironment = None
+        while True:
+            with self.condition:
+                self.idle_workers += 1
+                while len(self.queue) == 0 and not self.closed:
+                    self.condition.wait()
+                self.idle_workers -= 1
+                if self.closed:
+                    return
+                invocation: Invocation = self.queue.popleft()
+            if environment is None:
+                with self.condition:
+                    self.counters['cold-starts'] += 1
+                environment = ExecutionEnvironment(self.spec, self.simulator)
+                with self.condition:
+                    self.environments.append(environment)
+            self.run(environment, invocation)
+
+    def run(self, environment: ExecutionEnvironment, invocation: Invocation):
+        context = FakeContext(self.spec)
+        log: List[str] = []
+        self.simulator.log_router.begin(log)
+        started_at: float = time.perf_counter()
+        result: Any = None
+        error: Exception = None
+        try:
+            result = environment.handler(invocation.event, context)
+        except Exception as err:
+            error = err
+        finally:
+            self.simulator.log_router.end()
+        duration: float = time.perf_counter() - started_at
+        retry: bool = False
+        with self.condition:
+            self.counters['invocations'] += 1
+            self.durations.append(duration)
+            if duration > self.spec.timeout_seconds:
+                self.counters['timeouts'] += 1
+            if error is not None:
+                self.counters['errors'] += 1
+                if invocation.future is None:
+                    retry = invocation.attempt < self.async_retries
+                    self.counters['retries' if retry else 'dropped'] += 1
+        if self.simulator.keep_logs or error is not None:
+            self.simulator.logs.append({'function': self.spec.name,
+                                        'request-id': context.aws_request_id,
+                                        'error': None if error is None else repr(error),
+                                        'log': log})
+        if invocation.future is not None:
+            if error is None:
+                invocation.future.set_result(result)
+            else:
+                invocation.future.set_exception(error)
+        if retry:
+            self.simulator.submit(self.spec.directory, Invocation(invocation.event, invocation.attempt + 1))
+        self.simulator.complete()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for environment in self.environments:
+            environment.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.condition:
+            durations: List[float] = sorted(self.durations)
+        return dict(self.counters,
+                    environments=len(self.workers),
+                    **{'mean-milliseconds': round(sum(durations) / len(durations) * 1000, 1) if durations else 0.0,
+                       'max-milliseconds': round(durations[-1] * 1000, 1) if durations else 0.0})
+
+
+def function_specs(deployment_id: str, event_bus_name: str, composite_alarm_topic_arn: str,
+                   end_subscribers_topic_arn: str, bucket: str) -> Dict[str, FunctionSpec]:
+    '''The functions of the onboarding and notification flow with the environment and timeout Terraform gives them.'''
+    config_prefix: str = f'/rift/{deployment_id}/config'
+    alarm_config: Dict[str, str] = {'THRESHOLD': f'{config_prefix}/alarms/cpu/credit/threshold',
+                                    'PERIOD': f'{config_prefix}/alarms/period',
+                                    'DATAPOINTS': f'{config_prefix}/alarms/datapoints',
+                                    'EVALUATION_PERIODS': f'{config_prefix}/alarms/evaluation-periods',
+                                    'ADDITIONAL_DATAPOINTS': '6',
+                                    'ADDITIONAL_EVALUATION_PERIODS': '6',
+                                    'COMPUTE_INTENSIVE_WORKLOADS_REGIX_LIST': 'batch1,batch2'}
+
+    def spec(directory: str, name: str, timeout_seconds: float, environment: Dict[str, str]) -> FunctionSpec:
+        return FunctionSpec(directory, f'{name}-{deployment_id}', dict({'AWS_REGION': REGION,
+                                                                        'AWS_DEFAULT_REGION': REGION,
+                                                                        'AWS_LAMBDA_FUNCTION_NAME': f'{name}-{deployment_id}'},
+                                                                       **environment), timeout_seconds)
+
+    def chained(outcome: str, notification: str) -> Dict[str, str]:
+        return {'FN_OUTCOME': outcome,
+                'NOTIFICATION_FROM_FN': notification,
+                'DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME': event_bus_name}
+
+    return {
+        'check_for_instance_class': spec('check_for_instance_class', 'check-for-instance-class', 30, dict(
+            chained('Instance Is Of Burstable Class', 'Checked Instance Class Function Notification'),
+            ONBOARDING_MODE='chain',
+            ONBOARDED_FN_OUTCOME='Instance Is Onboarded. CPU-Credit, CPU-Utilization And Composite Alarms Exist.',
+            ACTION=composite_alarm_topic_arn,
+            **alarm_config)),
+        'check_for_composite_alarm': spec('check_for_composite_alarm', 'check-for-cpu-credit-composite-alarm', 5, chained(
+            'Create CPU-Credit Alarm As Composite Alarm Is Not Avialable', 'Checked Composite Alarm Function Notification')),
+        'create_cpu_credit_alarm': spec('create_cpu_credit_alarm', 'create-cpu-credit-balance-alarm', 5, dict(
+            chained('Created CPU-Credit-Balance Alarm', 'Create-CPU-Credit-Balance Alarm Function Notification'),
+            **alarm_config)),
+        'create_cpu_utilization_alarm': spec('create_cpu_utilization_alarm', 'create-cpu-baseline-utilization-alarm', 5, dict(
+            chained('Created CPU-Utilization Alarm. Both Child Alarms[CPU and Credit] Now Exists.',
+                    'Create-CPU-Utilization Alarm Function Notification'),
+            **{key: value for key, value in alarm_config.items() if key != 'THRESHOLD'})),
+        'create_composite_alarm': spec('create_composite_alarm', 'create-cpu-credit-balance-and-utlization-alarm', 5, {
+            'ACTION': composite_alarm_topic_arn}),
+        'remove_cpu_credit_alarm': spec('remove_cpu_credit_alarm', 'remove-cpu-credits-balance-alarm', 30, {}),
+        'suppress_notification_or_generate_metric_images': spec(
+            'suppress_notification_or_generate_metric_images', 'suppress-notification-or-generate-metric-images', 15, dict(
+                chained('Send Alarm Notification To Subscribers',
+                        'Suppress-Notification-Or-Generate-Metric-Images Function Notification'),
+                API_ENDPOINT=f'https://simulator.execute-api.{REGION}.amazonaws.com/v1/suppress-cpu-credit-alarm',
+                API_GATEWAY_HOST=f'simulator.execute-api.{REGION}.amazonaws.com',
+                SUPPRESS_NOTIFICATION_URI='/v1/suppress-cpu-credit-alarm',
+                CREDENTIAL_TO_SIGN_API_URL=f'/rift/{deployment_id}/user/credentials',
+                S3_BUCKET_TO_STORE_GENERATED_IMAGES=bucket,
+                INSTANCE_CACHE_TTL_SECONDS='60',
+                SUPPRESS_TAG_NAME='SuppressCpuCreditAlarm',
+                METRIC_IMAGE_DEADLINE_SECONDS='8')),
+        'post_alarm_state_to_email': spec('post_alarm_state_to_email', 'suppress-or-send-composite-alarm-to-email-group', 5, {
+            'END_SUBSCRIBERS_SNS_TOPIC': end_subscribers_topic_arn}),
+        'post_alarm_state_to_msteams': spec('post_alarm_state_to_msteams', 'suppress-or-send-composite-alarm-to-ms-teams', 30, {
+            'MS_TEAMS_WEB_HOOK_URL': f'{config_prefix}/subscribers/ms-teams/webhook/url',
+            'DELIVER_EMAIL': 'false',
+            'END_SUBSCRIBERS_SNS_TOPIC': end_subscribers_topic_arn,
+            'WEBHOOK_DEADLINE_SECONDS': '20'}),
+    }
+
+
+class Simulator:
+    '''
+    Runs the riFT functions end to end against the in memory fakes of the AWS services: an instance state change
+    goes through the chain of functions which creates the alarms, a breach of the alarms goes through the composite
+    alarm, the suppress function and the email and MS teams functions. The EventBridge rules and the SNS subscriptions
+    mirror the Terraform modules with their default variables. The MS teams function only runs if pymsteams is installed.
+    The environment overrides are merged into the environment of the functions, keyed by their directory.
+    '''
+
+    def __init__(self, aws: FakeAws = None, deployment_id: str = 'sim', concurrency: int = 10, async_retries: int = 2,
+                 environment_overrides: Dict[str, Dict[str, str]] = None, keep_logs: bool = False, verbose: bool = False):
+        self.aws = aws or FakeAws()
+        self.deployment_id = deployment_id
+        self.keep_logs = keep_logs
+        self.verbose = verbose
+        self.logs: List[Dict[str, Any]] = []
+        self.log_router = LogRouter(sys.stdout, verbose)
+        self.pending = 0
+        self.pending_condition = threading.Condition()
+        self.event_bus_name: str = f'ec2-event-bus-{deployment_id}'
+        self.composite_alarm_topic_arn: str = self.aws.create_topic(
+            f'receive-notification-from-cpu-credit-composite-alarm-{deployment_id}')
+        self.end_subscribers_topic_arn: str = self.aws.create_topic(f'receive-ec2-notifications-{deployment_id}')
+        self.bucket: str = f'rift-generated-metric-images-{deployment_id}'
+        self.specs: Dict[str, FunctionSpec] = function_specs(deployment_id,
+                                                             self.event_bus_name,
+                                                             self.composite_alarm_topic_arn,
+                                                             self.end_subscribers_topic_arn,
+                                                             self.bucket)
+        if importlib.util.find_spec('pymsteams') is None:
+            print('pymsteams is not installed, the MS teams function is not simulated.', file=sys.stderr)
+            del self.specs['post_alarm_state_to_msteams']
+        for directory, environment in (environment_overrides or {}).items():
+            self.specs[directory].environment.update(environment)
+        self.runtimes: Dict[str, FunctionRuntime] = {directory: FunctionRuntime(spec, self, spec.concurrency or concurrency, async_retries)
+                                                     for directory, spec in self.specs.items()}
+        self.aws.deliver = lambda function, event: self.submit(function, Invocation(event))
+        self.setup()
+        self.saved_stdout = sys.stdout
+        sys.stdout = self.log_router
+
+    def setup(self):
+        '''Create the parameters, the secret, the rules and the subscriptions the deployment creates.'''
+        config_prefix: str = f'/rift/{self.deployment_id}/config'
+        for name, value in [('alarms/cpu/credit/threshold', '60'),
+                            ('alarms/period', '300'),
+                            ('alarms/datapoints', '2'),
+                            ('alarms/evaluation-periods', '2'),
+                            ('subscribers/ms-teams/webhook/url', 'https://simulator.webhook.office.com/webhookb2/simulator')]:
+            self.aws.put_parameter(f'{config_prefix}/{name}', value)
+        self.aws.put_secret(f'/rift/{self.deployment_id}/user/credentials',
+                            {'access_key': 'AKIASIMULATOR', 'secret_key': 'simulator-secret-key'})
+        state_change: str = 'EC2 Instance State-change Notification'
+        self.aws.put_rule('default', 'check-for-instance-class', {'source': ['aws.ec2'],
+                                                                   'detail-type': [state_change],
+                                                                   'detail': {'state': ['pending']}}, 'check_for_instance_class')
+        self.aws.put_rule('default', 'remove-cpu-credits-balance-alarm', {'source': ['aws.ec2'],
+                                                                           'detail-type': [state_change],
+                                                                           'detail': {'state': ['terminated']}}, 'remove_cpu_credit_alarm')
+        for source, target in [('check_for_instance_class', 'check_for_composite_alarm'),
+                               ('check_for_composite_alarm', 'create_cpu_credit_alarm'),
+                               ('create_cpu_credit_alarm', 'create_cpu_utilization_alarm'),
+                               ('create_cpu_utilization_alarm', 'create_composite_alarm'),
+                               ('suppress_notification_or_generate_metric_images', 'post_alarm_state_to_email'),
+                               ('suppress_notification_or_generate_metric_images', 'post_alarm_state_to_msteams')]:
+            if target not in self.specs:
+                continue
+            source_spec: FunctionSpec = self.specs[source]
+            self.aws.put_rule(self.event_bus_name, self.specs[target].name, {
+                'source': ['lambda.amazonaws.com'],
+                'detail-type': [source_spec.environment['NOTIFICATION_FROM_FN']],
+                'detail': {'function-name': [source_spec.name],
+                           'function-outcome': [source_spec.environment['FN_OUTCOME']]}}, target)
+        self.aws.subscribe(self.composite_alarm_topic_arn, 'suppress_notification_or_generate_metric_images')
+
+    def aws_service(self, key: str, scope: str):
+        '''Create the fake client of a key of the client registry of a function.'''
+        service_name, _, kind = key.rpartition('_')
+        service_name = SERVICE_ALIASES.get(service_name, service_name)
+        if kind != 'client':
+            raise KeyError(f'{key} is not simulated.')
+        return self.aws.client(service_name, scope)
+
+    def submit(self, directory: str, invocation: Invocation):
+        with self.pending_condition:
+            self.pending += 1
+        self.runtimes[directory].enqueue(invocation)
+
+    def complete(self):
+        with self.pending_condition:
+            self.pending -= 1
+            self.pending_condition.notify_all()
+
+    def invoke(self, directory: str, event: Dict[str, Any]) -> Any:
+        '''Invoke a function synchronously and return its result. The events it puts flow on asynchronously.'''
+        invocation = Invocation(event, future=Future())
+        self.submit(directory, invocation)
+        return invocation.future.result()
+
+    def drain(self, timeout_seconds: float = None) -> bool:
+        '''Wait until every invocation, including the ones they trigger, has finished. Returns False on timeout.'''
+        deadline: float = None if timeout_seconds is None else time.monotonic() + timeout_seconds
+        with self.pending_condition:
+            while self.pending != 0:
+                remaining: float = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.pending_condition.wait(remaining)
+        return True
+
+    def launch_instances(self, count: int, instance_types: List[str] = None, apps: int = 100,
+                         windows_share: float = 0.1, suppressed_share: float = 0.05,
+                         platform_details_share: float = 0.5, seed: int = None) -> List[str]:
+        '''Add synthetic instances and emit their pending state change notifications. Returns the instance ids.'''
+        instance_ids: List[str] = self.add_instances(count, instance_types, apps, windows_share, suppressed_share,
+                                                     platform_details_share, seed)
+        for instance_id in instance_ids:
+            self.aws.set_instance_state(instance_id, 'pending')
+        return instance_ids
+
+    def add_instances(self, count: int, instance_types: List[str] = None, apps: int = 100,
+                      windows_share: float = 0.1, suppressed_share: float = 0.05,
+                      platform_details_share: float = 0.5, seed: int = None) -> List[str]:
+        '''
+        Add synthetic instances without emitting their state change notifications. The instances are spread over
+        the applications, every tenth of which is compute intensive. A share of them run Windows, are tagged to
+        suppress the notifications or lack PlatformDetails so their platform is read from the image.
+        Returns the instance ids.
+        '''
+        generator = random.Random(seed)
+        self.aws.add_image('ami-0linux00000000000', 'Linux/UNIX')
+        self.aws.add_image('ami-0windows000000000', 'Windows')
+        instance_ids: List[str] = []
+        for index in range(count):
+            instance_id: str = f'i-{generator.getrandbits(68):017x}'
+            app_index: int = index % apps
+            windows: bool = generator.random() < windows_share
+            tags: Dict[str, str] = {'Name': f'batch1-app-{app_index}' if app_index % 10 == 0 else f'app-{app_index}'}
+            if generator.random() < suppressed_share:
+                tags['SuppressCpuCreditAlarm'] = 'true'
+            self.aws.add_instance(instance_id,
+                                  generator.choice(instance_types or BURSTABLE_INSTANCE_TYPES),
+                                  'ami-0windows000000000' if windows else 'ami-0linux00000000000',
+                                  tags,
+                                  ('Windows' if windows else 'Linux/UNIX') if generator.random() < platform_details_share else None)
+            instance_ids.append(instance_id)
+        return instance_ids
+
+    def terminate_instances(self, instance_ids: List[str]):
+        for instance_id in instance_ids:
+            self.aws.set_instance_state(instance_id, 'terminated')
+
+    def breach(self, instance_ids: List[str]):
+        '''
+        Put the CPU credit balance and CPU utilization alarms of the instances in ALARM, as CloudWatch would when the
+        credits run low while the utilization is above the baseline, which sets off their composite alarms.
+        '''
+        for instance_id in instance_ids:
+            with self.aws.lock:
+                alarms: List[Dict[str, Any]] = sorted([alarm for name, alarm in self.aws.alarms['MetricAlarm'].items()
+                                                       if name.startswith(f'{instance_id}-')],
+                                                      key=lambda alarm: alarm['MetricName'])
+            for alarm in alarms:
+                query_date = now()
+                factor: float = 0.5 if alarm['MetricName'] == 'CPUCreditBalance' else 1.5
+                datapoints: List[float] = [round(alarm['Threshold'] * factor, 2)] * alarm['DatapointsToAlarm']
+                reason_data: Dict[str, Any] = {
+                    'version': '1.0',
+                    'queryDate': aws_timestamp(query_date),
+                    'startDate': aws_timestamp(query_date - timedelta(seconds=alarm['Period'] * alarm['EvaluationPeriods'])),
+                    'statistic': alarm['Statistic'],
+                    'period': alarm['Period'],
+                    'recentDatapoints': datapoints,
+                    'threshold': alarm['Threshold'],
+                    'evaluatedDatapoints': [{'timestamp': aws_timestamp(query_date - timedelta(seconds=alarm['Period'] * index)),
+                                             'sampleCount': 1.0,
+                                             'value': value} for index, value in enumerate(datapoints)]}
+                self.aws.set_alarm_state(alarm['AlarmName'],
+                                         'ALARM',
+                                         f'Threshold Crossed: {len(datapoints)} datapoints {datapoints} crossed the threshold ({alarm["Threshold"]}).',
+                                         json.dumps(reason_data))
+
+    def report(self) -> Dict[str, Any]:
+        '''The outcome of the simulation: the alarms, the notifications, the invocations and the API calls.'''
+        webhook_posts: int = sum(len(environment.webhook_pool.payloads)
+                                 for runtime in self.runtimes.values()
+                                 for environment in runtime.environments
+                                 if environment.webhook_pool is not None)
+        with self.aws.lock:
+            alarms: Dict[str, int] = {alarm_type: len(alarms) for alarm_type, alarms in self.aws.alarms.items()}
+            emails: int = len(self.aws.deliveries[self.end_subscribers_topic_arn])
+        return {'instances': len(self.aws.instances),
+                'alarms': alarms,
+                'notifications': {'email': emails,
+                                  'ms-teams': webhook_posts if 'post_alarm_state_to_msteams' in self.runtimes else None},
+                'functions': {runtime.spec.name: runtime.stats() for runtime in self.runtimes.values()},
+                'api': self.aws.faults.stats(),
+                'metrics': {function_name: {name: round(value, 3) for name, value in metrics.items()}
+                            for function_name, metrics in self.log_router.metrics.items()}}
+
+    def close(self):
+        sys.stdout = self.saved_stdout
+        for runtime in self.runtimes.values():
+            runtime.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,257 @@
+'''Canned events of the functions and canned responses of the AWS APIs they call.'''
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Tuple
+
+from stubbed_aws import REGION, StubbedError
+
+ACCOUNT_ID = '123456789012'
+DEPLOYMENT_ID = 'test'
+INSTANCE_ID = 'i-0a1b2c3d4e5f60718'
+INSTANCE_TYPE = 't3.micro'
+IMAGE_ID = 'ami-0123456789abcdef0'
+EVENT_BUS_NAME = f'ec2-event-bus-{DEPLOYMENT_ID}'
+COMPOSITE_ALARM_TOPIC_ARN = f'arn:aws:sns:{REGION}:{ACCOUNT_ID}:receive-notification-from-cpu-credit-composite-alarm-{DEPLOYMENT_ID}'
+END_SUBSCRIBERS_TOPIC_ARN = f'arn:aws:sns:{REGION}:{ACCOUNT_ID}:receive-ec2-notifications-{DEPLOYMENT_ID}'
+BUCKET = f'rift-generated-metric-images-{DEPLOYMENT_ID}'
+# Values of the /rift/<deployment-id>/config/... parameters.
+PARAMETERS: Dict[str, str] = {'alarms/cpu/credit/threshold': '60',
+                              'alarms/period': '300',
+                              'alarms/datapoints': '2',
+                              'alarms/evaluation-periods': '2',
+                              'subscribers/ms-teams/webhook/url': 'https://example.webhook.office.com/webhookb2/test'}
+
+STATE_CHANGED_AT = datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc)
+
+
+def instance_ids(count: int) -> List[str]:
+    return [f'i-{index:017x}' for index in range(1, count + 1)]
+
+
+def alarm_timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + '+0000'
+
+
+def credit_alarm_name(instance_id: str) -> str:
+    return f'{instance_id}-{INSTANCE_TYPE}-CPUCreditBalance-Less-Than-Threshold'
+
+
+def utilization_alarm_name(instance_id: str) -> str:
+    return f'{instance_id}-{INSTANCE_TYPE}-CPUUtilization-More-Than-Baseline-Percentage'
+
+
+def composite_alarm_name(instance_id: str) -> str:
+    return f'{instance_id}-{INSTANCE_TYPE}-Composite-Alarm-CPUCreditBalance-And-CPUUtilization-Thresholds-Breached'
+
+
+def alarm_arn(alarm_name: str) -> str:
+    return f'arn:aws:cloudwatch:{REGION}:{ACCOUNT_ID}:alarm:{alarm_name}'
+
+
+# Events
+
+
+def state_change_event(instance_id: str, state: str) -> Dict[str, Any]:
+    return {'version': '0',
+            'id': f'{instance_id}-{state}',
+            'detail-type': 'EC2 Instance State-change Notification',
+            'source': 'aws.ec2',
+            'account': ACCOUNT_ID,
+            'time': '2026-10-18T09:30:00Z',
+            'region': REGION,
+            'resources': [f'arn:aws:ec2:{REGION}:{ACCOUNT_ID}:instance/{instance_id}'],
+            'detail': {'instance-id': instance_id, 'state': state}}
+
+
+def queued_state_change_event(instance_ids: List[str], state: str) -> Dict[str, Any]:
+    '''A batch of state change notifications buffered in the queue of the batched intake mode.'''
+    return {'Records': [{'messageId': f'message-{index}',
+                         'eventSource': 'aws:sqs',
+                         'body': json.dumps(state_change_event(instance_id, state))}
+                        for index, instance_id in enumerate(instance_ids)]}
+
+
+def chained_event(detail: Dict[str, Any]) -> Dict[str, Any]:
+    '''An event a function puts for the next function of the onboarding chain.'''
+    return {'version': '0',
+            'id': 'chained',
+            'detail-type': 'Lambda Function Notification',
+            'source': 'lambda.amazonaws.com',
+            'account': ACCOUNT_ID,
+            'time': '2026-10-18T09:30:01Z',
+            'region': REGION,
+            'resources': [],
+            'detail': dict({'instance-id': INSTANCE_ID}, **detail)}
+
+
+def composite_alarm_notification(instance_id: str) -> Dict[str, Any]:
+    '''The message CloudWatch publishes to the topic of the composite alarm when it goes into ALARM.'''
+    alarm_name: str = composite_alarm_name(instance_id)
+    return {'AlarmName': alarm_name,
+            'AlarmDescription': f'CPU credit balance and CPU utilization thresholds of {instance_id} are breached.',
+            'AWSAccountId': ACCOUNT_ID,
+            'NewStateValue': 'ALARM',
+            'NewStateReason': 'Alarm rule evaluated to true.',
+            'StateChangeTime': alarm_timestamp(STATE_CHANGED_AT),
+            'Region': 'Asia Pacific (Sydney)',
+            'AlarmArn': alarm_arn(alarm_name),
+            'OldStateValue': 'OK',
+            'AlarmRule': f'ALARM("{credit_alarm_name(instance_id)}") AND ALARM("{utilization_alarm_name(instance_id)}")',
+            'TriggeringChildren': [{'Arn': alarm_arn(name),
+                                    'State': {'Value': 'ALARM',
+                                              'Timestamp': alarm_timestamp(STATE_CHANGED_AT - timedelta(minutes=1))}}
+                                   for name in [credit_alarm_name(instance_id), utilization_alarm_name(instance_id)]]}
+
+
+def composite_alarm_sns_event(instance_ids: List[str]) -> Dict[str, Any]:
+    return {'Records': [{'EventSource': 'aws:sns',
+                         'Sns': {'MessageId': f'message-{index}',
+                                 'TopicArn': COMPOSITE_ALARM_TOPIC_ARN,
+                                 'Subject': f'ALARM: "{composite_alarm_name(instance_id)}" in Asia Pacific (Sydney)',
+                                 'Message': json.dumps(composite_alarm_notification(instance_id))}}
+                        for index, instance_id in enumerate(instance_ids)]}
+
+
+def queued_composite_alarm_event(instance_ids: List[str]) -> Dict[str, Any]:
+    '''The composite alarm notifications buffered in the queue of the digest notification mode.'''
+    return {'Records': [{'messageId': record['Sns']['MessageId'],
+                         'eventSource': 'aws:sqs',
+                         'body': json.dumps(dict(record['Sns'], Type='Notification'))}
+                        for record in composite_alarm_sns_event(instance_ids)['Records']]}
+
+
+def notification_event(instance_id: str) -> Dict[str, Any]:
+    '''The event the suppress notification function puts for the email and MS teams functions.'''
+    bucket_url: str = f'https://{BUCKET}.s3-{REGION}.amazonaws.com'
+    return chained_event({'alarm-details': composite_alarm_notification(instance_id),
+                          'subject': f'ALARM: "{composite_alarm_name(instance_id)}" in Asia Pacific (Sydney)',
+                          'app': 'app-1',
+                          'instance-type': INSTANCE_TYPE,
+                          'platform': 'Linux',
+                          'metric-images-urls': {'CPUUtilization': f'{bucket_url}/cpu-utilization.jpeg',
+                                                 'CPUCreditBalance': f'{bucket_url}/cpu-credit-balance.jpeg'},
+                          'suppress-api-url': f'https://example.execute-api.{REGION}.amazonaws.com/v1/suppress-cpu-credit-alarm?instance-id={instance_id}'})
+
+
+def maintenance_event(operation_type: str) -> Dict[str, Any]:
+    return {'Records': [{'EventSource': 'aws:sns',
+                         'Sns': {'MessageId': 'message-0',
+                                 'Message': json.dumps({'OPERATION_TYPE': operation_type})}}]}
+
+
+# Responses
+
+
+def instance(instance_id: str, state: str = 'running') -> Dict[str, Any]:
+    return {'InstanceId': instance_id,
+            'InstanceType': INSTANCE_TYPE,
+            'ImageId': IMAGE_ID,
+            'PlatformDetails': 'Linux/UNIX',
+            'State': {'Code': 16, 'Name': state},
+            'Tags': [{'Key': 'Name', 'Value': 'app-1'}]}
+
+
+def describe_instances(fleet: List[str]):
+    '''Answer DescribeInstances with the requested instances, or with the fleet when no instance id is given.'''
+    def response(params: Dict[str, Any]) -> Dict[str, Any]:
+        requested_ids: List[str] = list(params.get('InstanceIds', []))
+        for instance_filter in params.get('Filters', []):
+            if instance_filter['Name'] == 'instance-id':
+                requested_ids.extend(instance_filter['Values'])
+        return {'Reservations': [{'ReservationId': 'r-0123456789abcdef0',
+                                  'Instances': [instance(instance_id) for instance_id in requested_ids or fleet]}]}
+    return response
+
+
+def get_parameters(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {'Parameters': [{'Name': name,
+                            'Type': 'String',
+                            'Value': PARAMETERS[name.split('/config/', 1)[1]],
+                            'Version': 1} for name in params['Names']],
+            'InvalidParameters': []}
+
+
+def put_events(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {'FailedEntryCount': 0,
+            'Entries': [{'EventId': f'event-{index}'} for index in range(len(params['Entries']))]}
+
+
+def instance_alarms(params: Dict[str, Any]) -> Dict[str, Any]:
+    '''Answer DescribeAlarms by prefix with the metric and composite alarms of the instance.'''
+    instance_id: str = params['AlarmNamePrefix'][:19]
+    return {'MetricAlarms': [{'AlarmName': credit_alarm_name(instance_id)},
+                             {'AlarmName': utilization_alarm_name(instance_id)}],
+            'CompositeAlarms': [{'AlarmName': composite_alarm_name(instance_id),
+                                 'AlarmRule': composite_alarm_notification(instance_id)['AlarmRule']}]}
+
+
+def fleet_alarms(fleet: List[str], page_size: int = None):
+    '''
+    Answer DescribeAlarms with the alarms of the instances of the fleet which match the prefix of the call,
+    page_size alarms per page like the MaxRecords of the API, or all of them in one page.
+    '''
+    def response(params: Dict[str, Any]) -> Dict[str, Any]:
+        matching_alarms: List[Tuple[str, Dict[str, Any]]] = []
+        for instance_id in fleet:
+            for alarm_type, instance_alarms_of_type in instance_alarms({'AlarmNamePrefix': instance_id}).items():
+                matching_alarms.extend((alarm_type, alarm) for alarm in instance_alarms_of_type
+                                       if alarm['AlarmName'].startswith(params.get('AlarmNamePrefix', '')))
+        start: int = int(params.get('NextToken', 0))
+        end: int = start + page_size if page_size is not None else len(matching_alarms)
+        page: Dict[str, Any] = {'MetricAlarms': [], 'CompositeAlarms': []}
+        for alarm_type, alarm in matching_alarms[start:end]:
+            page[alarm_type].append(alarm)
+        if end < len(matching_alarms):
+            page['NextToken'] = str(end)
+        return page
+    return response
+
+
+def child_alarms(params: Dict[str, Any]) -> Dict[str, Any]:
+    '''Answer DescribeAlarms of the child alarms of a composite alarm, still in ALARM.'''
+    state_reason_data: Dict[str, Any] = {'version': '1.0',
+                                         'queryDate': alarm_timestamp(STATE_CHANGED_AT),
+                                         'startDate': alarm_timestamp(STATE_CHANGED_AT - timedelta(minutes=10)),
+                                         'statistic': 'Average',
+                                         'period': 300,
+                                         'recentDatapoints': [12.5, 11.0],
+                                         'threshold': 20.0,
+                                         'evaluatedDatapoints': []}
+    return {'MetricAlarms': [{'AlarmName': alarm_name,
+                              'StateValue': 'ALARM',
+                              'StateReason': 'Threshold Crossed: 2 datapoints were less than the threshold (20.0).',
+                              'StateReasonData': json.dumps(state_reason_data),
+                              'StateUpdatedTimestamp': STATE_CHANGED_AT - timedelta(minutes=2)}
+                             for alarm_name in params['AlarmNames']],
+            'CompositeAlarms': []}
+
+
+def process_metrics(params: Dict[str, Any]) -> Dict[str, Any]:
+    instance_dimensions: List[Dict[str, str]] = [dimension for dimension in params['Dimensions'] if 'Value' in dimension]
+    return {'Metrics': [{'Namespace': 'CWAgent',
+                         'MetricName': params['MetricName'],
+                         'Dimensions': instance_dimensions + [{'Name': 'exe', 'Value': exe}]}
+                        for exe in ['java', 'python3']]}
+
+
+def responses(fleet: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    '''The canned responses of a healthy account, the instances exist and have no alarms yet.'''
+    return {'ec2': {'DescribeInstances': describe_instances(fleet or [INSTANCE_ID]),
+                    'DescribeImages': {'Images': [{'ImageId': IMAGE_ID, 'PlatformDetails': 'Linux/UNIX'}]},
+                    'CreateTags': {}},
+            'ssm': {'GetParameters': get_parameters},
+            'events': {'PutEvents': put_events},
+            'cloudwatch': {'DescribeAlarms': {'MetricAlarms': [], 'CompositeAlarms': []},
+                           'PutMetricAlarm': {},
+                           'PutCompositeAlarm': {},
+                           'DeleteAlarms': {},
+                           'ListMetrics': process_metrics,
+                           'GetMetricWidgetImage': {'MetricWidgetImage': b'\x89PNG'}},
+            's3': {'HeadObject': StubbedError('404', 404),
+                   'PutObject': {'ETag': '"0"'}},
+            'secretsmanager': {'GetSecretValue': {'ARN': f'arn:aws:secretsmanager:{REGION}:{ACCOUNT_ID}:secret:credentials',
+                                                  'Name': f'/rift/{DEPLOYMENT_ID}/user/credentials',
+                                                  'VersionId': 'version-1',
+                                                  'SecretString': json.dumps({'access_key': 'AKIAEXAMPLE',
+                                                                              'secret_key': 'example-secret-key'})}},
+            'sns': {'Publish': {'MessageId': 'message-0'}}}
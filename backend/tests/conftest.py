@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The functions are loaded with the simulator, each with its own copy of the rift and util modules.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+import threading
+from collections import Counter
+from functools import partial
+from typing import Callable, List, Dict, Any, Tuple, Union
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+from simulator.pipeline import load_function
+
+REGION = 'ap-southeast-2'
+
+
+class StubbedError:
+    '''A canned error response, which botocore raises as a ClientError.'''
+
+    def __init__(self, code: str, status_code: int = 400):
+        self.code = code
+        self.status_code = status_code
+
+
+# A canned response or a function of the parameters of the call returning it.
+CannedResponse = Union[Dict[str, Any], StubbedError, Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+
+class StubbedAws:
+    '''
+    Creates botocore clients which answer with canned responses instead of calling AWS and counts their calls
+    per service and operation. The parameters are still validated against the service models, so a call the
+    real API would reject fails. The responses are keyed by the service and the operation name, e.g.
+    {'ec2': {'DescribeInstances': ...}}. A call without a canned response is recorded as unanswered and fails.
+    '''
+
+    def __init__(self, responses: Dict[str, Dict[str, CannedResponse]]):
+        self.responses = responses
+        self.session = boto3.session.Session(aws_access_key_id='testing',
+                                             aws_secret_access_key='testing',
+                                             region_name=REGION)
+        self.calls: Counter = Counter()
+        self.unanswered: List[str] = []
+        self.lock = threading.Lock()
+
+    def create(self, service_name: str, kind: str, config):
+        factory = self.session.client if kind == 'client' else self.session.resource
+        service = factory(service_name, config=config)
+        client = service if kind == 'client' else service.meta.client
+        client.meta.events.register('before-parameter-build', self.keep_params)
+        client.meta.events.register('before-call', partial(self.respond, service_name))
+        return service
+
+    def keep_params(self, params: Dict[str, Any], context: Dict[str, Any], **kwargs):
+        context['stubbed-params'] = params
+
+    def respond(self, service_name: str, model, context: Dict[str, Any], **kwargs) -> Tuple[AWSResponse, Dict[str, Any]]:
+        with self.lock:
+            self.calls[(service_name, model.name)] += 1
+        response: CannedResponse = self.responses.get(service_name, {}).get(model.name)
+        if response is None:
+            with self.lock:
+                self.unanswered.append(f'{service_name}.{model.name}')
+            response = StubbedError('NoCannedResponse')
+        if callable(response):
+            response = response(context['stubbed-params'])
+        if isinstance(response, StubbedError):
+            return AWSResponse(None, response.status_code, {}, None), {
+                'Error': {'Code': response.code, 'Message': f'Canned {response.code} error.'},
+                'ResponseMetadata': {'HTTPStatusCode': response.status_code}}
+        return AWSResponse(None, 200, {}, None), dict(response, ResponseMetadata={'HTTPStatusCode': 200})
+
+    def calls_by_service(self) -> Dict[str, int]:
+        services: Counter = Counter()
+        for (service_name, _), count in self.calls.items():
+            services[service_name] += count
+        return dict(services)
+
+    def reset(self):
+        self.calls.clear()
+        self.unanswered.clear()
+
+
+def load_stubbed_function(directory: str, environment: Dict[str, str], stubbed_aws: StubbedAws) -> Dict[str, Any]:
+    '''Load the function in a new execution environment whose client registry creates stubbed clients.'''
+    modules: Dict[str, Any] = load_function(directory, environment)
+    registry_module = modules['util.client_registry_util']
+    registry = registry_module.aws_services
+
+    def create(key: str):
+        service_name, _, kind = key.rpartition('_')
+        return stubbed_aws.create(registry_module.SERVICE_ALIASES.get(service_name, service_name), kind, registry.config)
+
+    registry.create = create
+    return modules
+
+
+def budget_excess(calls: Counter, budget: Dict[str, Dict[str, int]]) -> List[str]:
+    '''
+    Compare the calls of an invocation with the budget of calls per service, given per operation.
+    Returns the lines of the per operation diff of the services over their budget.
+    '''
+    lines: List[str] = []
+    services: List[str] = sorted(set(service_name for service_name, _ in calls) | set(budget))
+    for service_name in services:
+        operations_budget: Dict[str, int] = budget.get(service_name, {})
+        operations_calls: Dict[str, int] = {operation: count for (call_service, operation), count in calls.items()
+                                            if call_service == service_name}
+        service_calls: int = sum(operations_calls.values())
+        service_budget: int = sum(operations_budget.values())
+        if service_calls <= service_budget:
+            continue
+        lines.append(f'{service_name}: {service_calls} calls, budget {service_budget}')
+        for operation in sorted(set(operations_calls) | set(operations_budget)):
+            made: int = operations_calls.get(operation, 0)
+            allowed: int = operations_budget.get(operation, 0)
+            marker: str = f'+{made - allowed}' if made > allowed else f'{made - allowed}' if made < allowed else '='
+            lines.append(f'  {service_name}.{operation}: {made} calls, budget {allowed} ({marker})')
+    return lines
@@ -0,0 +1,200 @@
+'''
+Budgets of the AWS API calls of each function per invocation. Each lambda_handler runs with a canned event against
+stubbed botocore clients, in a new execution environment, and the calls it makes per service must stay within the
+budget. The budgets are given per operation, so a failure shows which operations made more calls than planned.
+Lower a budget when a change saves calls, raise it only with a reason.
+'''
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable
+
+import pytest
+
+import canned
+from simulator.fakes import FakeAws, FakeWebhookPool
+from simulator.pipeline import FakeContext, FunctionSpec, function_specs
+from stubbed_aws import REGION, StubbedAws, load_stubbed_function, budget_excess
+
+FLEET: List[str] = canned.instance_ids(25)
+QUEUED_INSTANCES: List[str] = canned.instance_ids(10)
+LARGE_FLEET: List[str] = canned.instance_ids(500)
+# Instances spread over the large fleet, like the random IDs of a scale-in.
+TERMINATED_INSTANCES: List[str] = LARGE_FLEET[::50]
+
+
+def specs() -> Dict[str, FunctionSpec]:
+    '''The functions with the environment Terraform gives them, and the ones the simulator does not run.'''
+    function_specs_by_directory: Dict[str, FunctionSpec] = function_specs(canned.DEPLOYMENT_ID,
+                                                                          canned.EVENT_BUS_NAME,
+                                                                          canned.COMPOSITE_ALARM_TOPIC_ARN,
+                                                                          canned.END_SUBSCRIBERS_TOPIC_ARN,
+                                                                          canned.BUCKET)
+    region: Dict[str, str] = {'AWS_REGION': REGION, 'AWS_DEFAULT_REGION': REGION}
+    function_specs_by_directory['suppress_cpu_credit_alarm'] = FunctionSpec(
+        'suppress_cpu_credit_alarm', f'suppress-cpu-credit-alarm-{canned.DEPLOYMENT_ID}',
+        dict(region, SUPPRESS_TAG_NAME='SuppressCpuCreditAlarm', SUPPRESS_TAG_VALUE='true'), 5)
+    function_specs_by_directory['collect_orphaned_alarms'] = FunctionSpec(
+        'collect_orphaned_alarms', f'collect-orphaned-alarms-{canned.DEPLOYMENT_ID}', dict(region), 300)
+    function_specs_by_directory['create_or_update_alarms_for_existing_instance'] = FunctionSpec(
+        'create_or_update_alarms_for_existing_instance', f'create-or-update-alarms-for-existing-instance-{canned.DEPLOYMENT_ID}',
+        dict(region,
+             **{name: value for name, value in function_specs_by_directory['check_for_instance_class'].environment.items()
+                if name in ['THRESHOLD', 'PERIOD', 'DATAPOINTS', 'EVALUATION_PERIODS', 'ACTION']},
+             DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME=canned.EVENT_BUS_NAME,
+             UPDATE_ALARMS_CONFIG_NOTIFICATION='Update Alarms Config Notification',
+             CREATE_ALARMS_FOR_EXISTING_INSTANCES_NOTIFICATION='Create Alarms For Existing Instances Notification',
+             UPDATE_ALARMS_OPERATION_TYPE='update',
+             CREATE_ALARMS_OPERATION_TYPE='create',
+             MAINTENANCE_MODE='events'), 300)
+    return function_specs_by_directory
+
+
+@dataclass
+class BudgetCase:
+    '''An invocation of a function and the calls it may make, keyed by service and operation.'''
+    name: str
+    directory: str
+    event: Dict[str, Any]
+    budget: Dict[str, Dict[str, int]]
+    environment: Dict[str, str] = field(default_factory=dict)
+    responses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Budget of a second invocation with the same event, which the caches of the warm environment serve.
+    warm_budget: Dict[str, Dict[str, int]] = None
+    # Module the function needs which may not be installed.
+    requires: str = None
+
+
+ONBOARDED_CHILD_ALARMS: Dict[str, Any] = {'cpu-credit-alarm-name': canned.credit_alarm_name(canned.INSTANCE_ID),
+                                          'cpu-utilization-alarm-name': canned.utilization_alarm_name(canned.INSTANCE_ID),
+                                          'instance-type': canned.INSTANCE_TYPE,
+                                          'app': 'app-1'}
+
+CASES: List[BudgetCase] = [
+    BudgetCase('check_for_instance_class', 'check_for_instance_class',
+               canned.state_change_event(canned.INSTANCE_ID, 'pending'),
+               {'ec2': {'DescribeInstances': 1},
+                'events': {'PutEvents': 1}},
+               warm_budget={'events': {'PutEvents': 1}}),
+    BudgetCase('check_for_instance_class-queued', 'check_for_instance_class',
+               canned.queued_state_change_event(QUEUED_INSTANCES, 'pending'),
+               {'ec2': {'DescribeInstances': 1},
+                'events': {'PutEvents': 1}}),
+    BudgetCase('check_for_instance_class-fused', 'check_for_instance_class',
+               canned.state_change_event(canned.INSTANCE_ID, 'pending'),
+               {'ec2': {'DescribeInstances': 1},
+                'ssm': {'GetParameters': 1},
+                'cloudwatch': {'DescribeAlarms': 1, 'PutMetricAlarm': 2, 'PutCompositeAlarm': 1},
+                'events': {'PutEvents': 1}},
+               environment={'ONBOARDING_MODE': 'fused'}),
+    BudgetCase('check_for_composite_alarm', 'check_for_composite_alarm',
+               canned.chained_event({}),
+               {'ec2': {'DescribeInstances': 1},
+                'cloudwatch': {'DescribeAlarms': 1},
+                'events': {'PutEvents': 1}}),
+    BudgetCase('create_cpu_credit_alarm', 'create_cpu_credit_alarm',
+               canned.chained_event({}),
+               {'ssm': {'GetParameters': 1},
+                'ec2': {'DescribeInstances': 1},
+                'cloudwatch': {'PutMetricAlarm': 1},
+                'events': {'PutEvents': 1}},
+               warm_budget={'cloudwatch': {'PutMetricAlarm': 1},
+                            'events': {'PutEvents': 1}}),
+    BudgetCase('create_cpu_utilization_alarm', 'create_cpu_utilization_alarm',
+               canned.chained_event({'cpu-credit-alarm-name': canned.credit_alarm_name(canned.INSTANCE_ID)}),
+               {'ssm': {'GetParameters': 1},
+                'ec2': {'DescribeInstances': 1},
+                'cloudwatch': {'PutMetricAlarm': 1},
+                'events': {'PutEvents': 1}},
+               warm_budget={'cloudwatch': {'PutMetricAlarm': 1},
+                            'events': {'PutEvents': 1}}),
+    BudgetCase('create_composite_alarm', 'create_composite_alarm',
+               canned.chained_event(ONBOARDED_CHILD_ALARMS),
+               {'cloudwatch': {'PutCompositeAlarm': 1}}),
+    BudgetCase('remove_cpu_credit_alarm', 'remove_cpu_credit_alarm',
+               canned.state_change_event(canned.INSTANCE_ID, 'terminated'),
+               {'cloudwatch': {'DescribeAlarms': 1, 'DeleteAlarms': 2}},
+               responses={'cloudwatch': {'DescribeAlarms': canned.instance_alarms}}),
+    BudgetCase('remove_cpu_credit_alarm-queued', 'remove_cpu_credit_alarm',
+               canned.queued_state_change_event(TERMINATED_INSTANCES, 'terminated'),
+               {'cloudwatch': {'DescribeAlarms': len(TERMINATED_INSTANCES), 'DeleteAlarms': 2}},
+               # The alarms of a large fleet in pages of 50, so a call not narrowed to an instance pages through most of them.
+               responses={'cloudwatch': {'DescribeAlarms': canned.fleet_alarms(LARGE_FLEET, page_size=50)}}),
+    BudgetCase('suppress_notification_or_generate_metric_images', 'suppress_notification_or_generate_metric_images',
+               canned.composite_alarm_sns_event([canned.INSTANCE_ID]),
+               {'ec2': {'DescribeInstances': 1},
+                'cloudwatch': {'DescribeAlarms': 1, 'ListMetrics': 1, 'GetMetricWidgetImage': 3},
+                's3': {'HeadObject': 3, 'PutObject': 3},
+                'secretsmanager': {'GetSecretValue': 1},
+                'events': {'PutEvents': 1}},
+               responses={'cloudwatch': {'DescribeAlarms': canned.child_alarms}}),
+    BudgetCase('suppress_notification_or_generate_metric_images-records', 'suppress_notification_or_generate_metric_images',
+               canned.composite_alarm_sns_event(QUEUED_INSTANCES[:3]),
+               {'ec2': {'DescribeInstances': 1},
+                'cloudwatch': {'DescribeAlarms': 3, 'ListMetrics': 3, 'GetMetricWidgetImage': 9},
+                's3': {'HeadObject': 9, 'PutObject': 9},
+                'secretsmanager': {'GetSecretValue': 1},
+                'events': {'PutEvents': 1}},
+               responses={'cloudwatch': {'DescribeAlarms': canned.child_alarms}}),
+    BudgetCase('post_alarm_state_to_email', 'post_alarm_state_to_email',
+               canned.notification_event(canned.INSTANCE_ID),
+               {'sns': {'Publish': 1}}),
+    BudgetCase('post_alarm_state_to_msteams', 'post_alarm_state_to_msteams',
+               canned.notification_event(canned.INSTANCE_ID),
+               {'ssm': {'GetParameters': 1}},
+               warm_budget={},
+               requires='pymsteams'),
+    BudgetCase('suppress_cpu_credit_alarm', 'suppress_cpu_credit_alarm',
+               {'instance-id': canned.INSTANCE_ID},
+               {'ec2': {'CreateTags': 1}}),
+    BudgetCase('collect_orphaned_alarms', 'collect_orphaned_alarms',
+               {},
+               {'cloudwatch': {'DescribeAlarms': 1, 'DeleteAlarms': 2},
+                'ec2': {'DescribeInstances': 1}},
+               responses={'cloudwatch': {'DescribeAlarms': canned.fleet_alarms(FLEET)},
+                          # The last instance of the fleet does not exist any more.
+                          'ec2': {'DescribeInstances': lambda params: canned.describe_instances(FLEET[:-1])({})}}),
+    BudgetCase('create_or_update_alarms_for_existing_instance', 'create_or_update_alarms_for_existing_instance',
+               canned.maintenance_event('create'),
+               {'ec2': {'DescribeInstances': 1},
+                'events': {'PutEvents': 3}}),
+]
+
+
+def run_case(case: BudgetCase, stubbed_aws: StubbedAws) -> Callable[[], Any]:
+    spec: FunctionSpec = specs()[case.directory]
+    spec.environment.update(case.environment)
+    modules: Dict[str, Any] = load_stubbed_function(case.directory, spec.environment, stubbed_aws)
+    if 'util.delivery_util' in modules:
+        # The MS teams card is posted to a fake webhook.
+        modules['util.delivery_util'].webhook_delivery.pool = FakeWebhookPool(FakeAws(), spec.name)
+    handler = modules['lambda_function'].lambda_handler
+    return lambda: handler(case.event, FakeContext(spec))
+
+
+def assert_within_budget(case: BudgetCase, stubbed_aws: StubbedAws, budget: Dict[str, Dict[str, int]], result: Any):
+    assert stubbed_aws.unanswered == [], f'{case.name} made calls without canned responses: {stubbed_aws.unanswered}'
+    assert not isinstance(result, Exception), f'{case.name} failed: {result!r}'
+    excess: List[str] = budget_excess(stubbed_aws.calls, budget)
+    assert excess == [], f'{case.name} is over its API call budget:\n' + '\n'.join(excess)
+
+
+@pytest.mark.parametrize('case', CASES, ids=[case.name for case in CASES])
+def test_api_call_budget(case: BudgetCase):
+    if case.requires is not None:
+        pytest.importorskip(case.requires)
+    responses: Dict[str, Dict[str, Any]] = canned.responses(FLEET if case.directory == 'create_or_update_alarms_for_existing_instance' else None)
+    for service_name, service_responses in case.responses.items():
+        responses[service_name].update(service_responses)
+    stubbed_aws = StubbedAws(responses)
+    invoke = run_case(case, stubbed_aws)
+
+    assert_within_budget(case, stubbed_aws, case.budget, invoke())
+    if case.warm_budget is not None:
+        stubbed_aws.reset()
+        assert_within_budget(case, stubbed_aws, case.warm_budget, invoke())
+
+
+def test_budget_excess_shows_the_operations():
+    calls = {('ssm', 'GetParameters'): 4, ('ec2', 'DescribeInstances'): 1}
+    excess: List[str] = budget_excess(calls, {'ssm': {'GetParameters': 1}, 'ec2': {'DescribeInstances': 1}})
+    assert excess == ['ssm: 4 calls, budget 1',
+                      '  ssm.GetParameters: 4 calls, budget 1 (+3)']
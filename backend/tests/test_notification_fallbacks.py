@@ -0,0 +1,109 @@
+'''
+The notification of an alarm goes out even when the suppress function could not describe its instance.
+The event it puts then has no platform, instance type or metric images, and the email and MS teams functions
+must still send it.
+'''
+import json
+from typing import List, Dict, Any
+
+import pytest
+
+import canned
+from simulator.fakes import FakeAws, FakeWebhookPool
+from simulator.pipeline import FakeContext, FunctionSpec, function_specs
+from stubbed_aws import StubbedAws, StubbedError, load_stubbed_function
+
+INSTANCE_LOOKUPS: Dict[str, Any] = {'failed': StubbedError('RequestLimitExceeded', 503),
+                                    'not-found': {'Reservations': []}}
+
+
+def specs() -> Dict[str, FunctionSpec]:
+    return function_specs(canned.DEPLOYMENT_ID,
+                          canned.EVENT_BUS_NAME,
+                          canned.COMPOSITE_ALARM_TOPIC_ARN,
+                          canned.END_SUBSCRIBERS_TOPIC_ARN,
+                          canned.BUCKET)
+
+
+def invoke(directory: str, event: Dict[str, Any], stubbed_aws: StubbedAws, webhook_pool: FakeWebhookPool = None) -> Any:
+    spec: FunctionSpec = specs()[directory]
+    modules: Dict[str, Any] = load_stubbed_function(directory, spec.environment, stubbed_aws)
+    if webhook_pool is not None:
+        modules['util.delivery_util'].webhook_delivery.pool = webhook_pool
+    return modules['lambda_function'].lambda_handler(event, FakeContext(spec))
+
+
+def notification_events(instance_lookup: str) -> List[Dict[str, Any]]:
+    '''The events the suppress function puts for an alarm whose instance lookup failed or found no instance.'''
+    put_entries: List[Dict[str, Any]] = []
+    responses: Dict[str, Dict[str, Any]] = canned.responses()
+    responses['ec2']['DescribeInstances'] = INSTANCE_LOOKUPS[instance_lookup]
+    responses['cloudwatch']['DescribeAlarms'] = canned.child_alarms
+    responses['events']['PutEvents'] = lambda params: put_entries.extend(params['Entries']) or canned.put_events(params)
+
+    result = invoke('suppress_notification_or_generate_metric_images',
+                    canned.composite_alarm_sns_event([canned.INSTANCE_ID]),
+                    StubbedAws(responses))
+
+    assert [record['instance-lookup'] for record in result['records']] == [instance_lookup]
+    assert [record['outcome'] for record in result['records']] == ['published']
+    return [dict(canned.chained_event({}), detail=json.loads(entry['Detail'])) for entry in put_entries]
+
+
+@pytest.mark.parametrize('instance_lookup', list(INSTANCE_LOOKUPS))
+def test_email_is_sent_without_the_instance(instance_lookup: str):
+    messages: List[str] = []
+    responses: Dict[str, Dict[str, Any]] = canned.responses()
+    responses['sns']['Publish'] = lambda params: messages.append(params['Message']) or {'MessageId': 'message-0'}
+
+    for event in notification_events(instance_lookup):
+        assert 'platform' not in event['detail'] and 'metric-images-urls' not in event['detail']
+        assert invoke('post_alarm_state_to_email', event, StubbedAws(responses)) == {'status_code': 200}
+
+    assert len(messages) == 1
+    assert canned.composite_alarm_name(canned.INSTANCE_ID) in messages[0]
+    assert 'Console: ' in messages[0] and 'CpuCreditBalance' not in messages[0]
+
+
+@pytest.mark.parametrize('instance_lookup', list(INSTANCE_LOOKUPS))
+def test_ms_teams_card_is_posted_without_the_instance(instance_lookup: str):
+    pytest.importorskip('pymsteams')
+    webhook_pool = FakeWebhookPool(FakeAws(), 'post-alarm-state-to-ms-teams')
+
+    for event in notification_events(instance_lookup):
+        result: Dict[str, Any] = invoke('post_alarm_state_to_msteams', event,
+                                        StubbedAws(canned.responses()), webhook_pool)
+        assert result['delivery']['ms-teams']['delivered']
+
+    assert len(webhook_pool.payloads) == 1
+    sections: List[Dict[str, Any]] = webhook_pool.payloads[0]['sections']
+    assert len(sections) == 1 and 'images' not in sections[0]
+
+
+def test_digest_keeps_the_alarm_without_the_instance():
+    put_entries: List[Dict[str, Any]] = []
+    messages: List[str] = []
+    missing_instance_id: str = canned.instance_ids(2)[1]
+    responses: Dict[str, Dict[str, Any]] = canned.responses()
+    responses['ec2']['DescribeInstances'] = {'Reservations': [{'Instances': [canned.instance(canned.INSTANCE_ID)]}]}
+    responses['cloudwatch']['DescribeAlarms'] = canned.child_alarms
+    responses['events']['PutEvents'] = lambda params: put_entries.extend(params['Entries']) or canned.put_events(params)
+    responses['sns']['Publish'] = lambda params: messages.append(params['Message']) or {'MessageId': 'message-0'}
+
+    spec: FunctionSpec = specs()['suppress_notification_or_generate_metric_images']
+    environment: Dict[str, str] = dict(spec.environment, NOTIFICATION_MODE='digest')
+    modules: Dict[str, Any] = load_stubbed_function(spec.directory, environment, StubbedAws(responses))
+    event: Dict[str, Any] = canned.queued_composite_alarm_event([canned.INSTANCE_ID, missing_instance_id])
+    result = modules['lambda_function'].lambda_handler(event, FakeContext(spec))
+
+    assert result == {'batchItemFailures': []}
+    digests: Dict[str, Dict[str, Any]] = {detail['app']: detail for detail in
+                                          [json.loads(entry['Detail']) for entry in put_entries]}
+    assert sorted(digests) == ['', 'app-1']
+    assert digests['app-1']['alarms'][0]['metric-images-urls'] != {}
+    missing_alarm: Dict[str, Any] = digests['']['alarms'][0]
+    assert missing_alarm['instance-id'] == missing_instance_id
+    assert missing_alarm['metric-images-urls'] == {} and 'instance-type' not in missing_alarm
+
+    invoke('post_alarm_state_to_email', dict(canned.chained_event({}), detail=digests['']), StubbedAws(responses))
+    assert len(messages) == 1 and missing_instance_id in messages[0]
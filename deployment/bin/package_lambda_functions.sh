@@ -0,0 +1,10 @@
+#!/bin/bash +xe
+### lambda-functions ###
+# The source of each function is copied to the src folder of its Terraform service by its package script.
+# The shared code is not copied, it is in the rift layer.
+SOURCE_PATH="../../backend/lambda"
+for PACKAGE_SCRIPT in $SOURCE_PATH/*/package/package.sh
+do
+    echo "### Package $(basename $(dirname $(dirname $PACKAGE_SCRIPT))). ###"
+    (cd $(dirname $PACKAGE_SCRIPT) && bash ./package.sh)
+done
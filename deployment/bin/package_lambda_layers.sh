@@ -19,3 +19,15 @@ pip3 install requests -t  $DEPLOYMENT_PATH/$SHARED_RESOURCE_CATEGORY/packages/$P
 
 echo "### Download pymsteams module. ###"
 pip3 install pymsteams -t  $DEPLOYMENT_PATH/$SHARED_RESOURCE_CATEGORY/packages/$PACKAGE/src/python/lib/python3.8/site-packages/
+
+### rift ###
+PACKAGE="rift"
+SOURCE_PATH="../../backend/lambda"
+echo "### Empty and create src folder for $PACKAGE. ###"
+rm -rf $DEPLOYMENT_PATH/$SHARED_RESOURCE_CATEGORY/packages/$PACKAGE/src/
+mkdir -p $DEPLOYMENT_PATH/$SHARED_RESOURCE_CATEGORY/packages/$PACKAGE/src/python/rift/
+mkdir -p $DEPLOYMENT_PATH/$SHARED_RESOURCE_CATEGORY/packages/$PACKAGE/src/python/util/
+
+echo "### Copy the rift package and the util modules. ###"
+cp -p $SOURCE_PATH/rift/*.py $DEPLOYMENT_PATH/$SHARED_RESOURCE_CATEGORY/packages/$PACKAGE/src/python/rift/
+cp -p $SOURCE_PATH/util/*.py $DEPLOYMENT_PATH/$SHARED_RESOURCE_CATEGORY/packages/$PACKAGE/src/python/util/
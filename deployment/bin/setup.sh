@@ -79,9 +79,10 @@ function deploy {
     
 }
 
-# Deploy lambda layer.
+# Package the lambda layers and functions.
 function package_binaries {
     ./package_lambda_layers.sh
+    ./package_lambda_functions.sh
 }
 
 # Confirm.
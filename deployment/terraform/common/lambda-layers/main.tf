@@ -13,4 +13,22 @@ data "archive_file" "aws_lambda_powertools_and_more_layer_lambda_zip" {
 
 output "layer_arn" {
   value = aws_lambda_layer_version.lambda_layer_aws_lambda_powertools_and_more.arn
-}
\ No newline at end of file
+}
+
+resource "aws_lambda_layer_version" "lambda_layer_rift" {
+  filename            = data.archive_file.rift_layer_lambda_zip.output_path
+  layer_name          = "${local.name-prefix}-rift"
+  description         = "The rift package and the util modules shared by the riFT functions."
+  compatible_runtimes = ["python3.8"]
+  source_code_hash    = data.archive_file.rift_layer_lambda_zip.output_base64sha256
+}
+
+data "archive_file" "rift_layer_lambda_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/packages/rift/src/"
+  output_path = "${path.module}/packages/rift/dist/rift.zip"
+}
+
+output "rift_layer_arn" {
+  value = aws_lambda_layer_version.lambda_layer_rift.arn
+}
@@ -34,6 +34,12 @@ resource "aws_ssm_parameter" "maintenance_sns_topic" {
   value = var.maintenance-topic-arn
 }
 
+resource "aws_ssm_parameter" "maintenance_function" {
+  name  = "/rift/${var.resource-id}/lambda/maintenance"
+  type  = "String"
+  value = var.maintenance-function-name
+}
+
 output "threshold_param_name" {
   value = aws_ssm_parameter.cpu_credit_alarm_threshold_ssm_parameter.name
 }
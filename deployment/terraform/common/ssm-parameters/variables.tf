@@ -25,3 +25,7 @@ variable "ms-teams-webhook-url" {
 variable "maintenance-topic-arn" {
 
 }
+
+variable "maintenance-function-name" {
+
+}
@@ -50,6 +50,7 @@ module "ssm_parameters_for_alarm_configuration" {
   evaluation-periods = var.number-of-evaluation-periods
   ms-teams-webhook-url = var.placeholder-ms-teams-web-hook-url
   maintenance-topic-arn = module.sns_topic_to_create_or_update_alarms_for_existing_ec2.sns_topic_arn
+  maintenance-function-name = "${var.maintenance-operations-lambda-and-event-rule}-${var.deployment-id}"
 
 }
 
@@ -61,6 +62,22 @@ module "create_lambda_to_check_instance_class" {
   outcome-of-this-fn-for-next-trigger      = var.outcome-to-trigger-check-composite-alarm-fn
   notification-of-this-fn-for-next-trigger = var.notification-from-check-instance-class-fn
   logs-retention-days          = var.logs-retention-period
+  onboarding-mode                                           = var.onboarding-mode
+  outcome-of-this-fn-when-instance-is-onboarded             = var.outcome-when-instance-is-onboarded
+  sns-topic-which-receive-notification-from-composite-alarm = module.sns_topic_for_composite_alarm_action.sns_topic_arn
+  period                                                    = module.ssm_parameters_for_alarm_configuration.period_param_name
+  datapoints                                                = module.ssm_parameters_for_alarm_configuration.datapoints_param_name
+  evaluation-periods                                        = module.ssm_parameters_for_alarm_configuration.evaluation_period_param_name
+  threshold                                                 = module.ssm_parameters_for_alarm_configuration.threshold_param_name
+  additional-datapoints                                     = 6
+  additional-evaluation-periods                             = 6
+  compute-intensive-workloads-regix-list                    = var.compute-intensive-workloads-regix-list
+  intake-mode                                               = var.intake-mode
+  batch-size                                                = var.intake-batch-size
+  maximum-batching-window-in-seconds                        = var.intake-maximum-batching-window-in-seconds
+  lambda-layer-rift-arn                    = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 # This module deploys a lambda function which check for composite alarm.
@@ -74,6 +91,9 @@ module "create_lambda_to_check_composite_alarm" {
   source-notification-which-invoke-this-fn = var.notification-from-check-instance-class-fn
   notification-of-this-fn-for-next-trigger = var.notification-from-check-composite-alarm-fn
   logs-retention-days          = var.logs-retention-period
+  lambda-layer-rift-arn                    = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 # This module deploys a lambda function which creates a cpu credit alarm.
@@ -94,6 +114,9 @@ module "create_lambda_for_cpu_credit_alarm" {
   source-notification-which-invoke-this-fn = var.notification-from-check-composite-alarm-fn
   notification-of-this-fn-for-next-trigger = var.notification-from-create-cpu-credit-balance-alarm-fn
   logs-retention-days          = var.logs-retention-period
+  lambda-layer-rift-arn                    = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 # This module deploys a lambda function which creates a cpu utilization alarm.
@@ -113,6 +136,9 @@ module "create_lambda_for_cpu_utlization_alarm" {
   source-notification-which-invoke-this-fn = var.notification-from-create-cpu-credit-balance-alarm-fn
   notification-of-this-fn-for-next-trigger = var.notification-from-create-cpu-utilization-alarm-fn
 logs-retention-days          = var.logs-retention-period
+  lambda-layer-rift-arn                    = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 # This module deploys a lambda function which creates a composite alarm.
@@ -125,6 +151,9 @@ module "create_lambda_for_cpu_credit_composite_alarm" {
   outcome-which-trigger-this-fn                        = var.outcome-to-trigger-create-cpu-credit-composite-alarm-fn
   source-notification-which-invoke-this-fn             = var.notification-from-create-cpu-utilization-alarm-fn
   logs-retention-days          = var.logs-retention-period
+  lambda-layer-rift-arn                                = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 # This module deploys a lambda function which deletes all the alarms when an instance is terminated or it's class changes to non burstable type.
@@ -132,6 +161,23 @@ module "create_lambda_to_remove_cpu_credit_alarm" {
   source      = "./services/remove-cpu-credit-alarm"
   resource-id = "${var.remove-alarms-fn}-${var.deployment-id}"
   logs-retention-days          = var.logs-retention-period
+  intake-mode                        = var.intake-mode
+  batch-size                         = var.intake-batch-size
+  maximum-batching-window-in-seconds = var.intake-maximum-batching-window-in-seconds
+  lambda-layer-rift-arn = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
+}
+
+# This module deploys a lambda function which deletes the alarms of instances which are terminated or resized, on a schedule.
+module "create_lambda_to_collect_orphaned_alarms" {
+  source              = "./services/collect-orphaned-alarms"
+  resource-id         = "${var.collect-orphaned-alarms-fn}-${var.deployment-id}"
+  logs-retention-days = var.logs-retention-period
+  schedule-expression = var.orphaned-alarms-collection-schedule
+  lambda-layer-rift-arn = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 #This module creates s3 bucket to store generated metric images.
@@ -151,6 +197,10 @@ module "create_lambda_to_send_composite_alarm_notification_to_email_group" {
   event-rule-name-which-trigger-this-fn                 = module.create_lambda_to_suppress_alarm_or_generate_metric_images.post_alarm_state_notification_event_rule_name
   event-rule-arn-which-trigger-this-fn                  = module.create_lambda_to_suppress_alarm_or_generate_metric_images.post_alarm_state_notification_event_rule_arn
   logs-retention-days          = var.logs-retention-period
+  notification-delivery                                 = var.notification-delivery
+  lambda-layer-rift-arn                                 = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 
@@ -164,6 +214,12 @@ module "create_lambda_to_send_composite_alarm_notification_to_ms_teams" {
   event-rule-name-which-trigger-this-fn    = module.create_lambda_to_suppress_alarm_or_generate_metric_images.post_alarm_state_notification_event_rule_name
   event-rule-arn-which-trigger-this-fn     = module.create_lambda_to_suppress_alarm_or_generate_metric_images.post_alarm_state_notification_event_rule_arn
   logs-retention-days          = var.logs-retention-period
+  notification-delivery                                 = var.notification-delivery
+  sns-topic-to-which-this-function-publish-notification = module.sns_topic_for_end_subscribers.sns_topic_arn
+  webhook-max-attempts                                  = var.webhook-max-attempts
+  lambda-layer-rift-arn                    = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 
@@ -184,6 +240,9 @@ module "create_lambda_to_suppress_cpu_credit_balance_alarm" {
   api-gateway-id               = module.create_apigateway_to_post_cpu_credit_alarm_config_changes.api_gateway_id
   api-gateway-root-resource-id = module.create_apigateway_to_post_cpu_credit_alarm_config_changes.api_gateway_root_resource_id
   suppress-api-uri             = var.suppress-api-uri
+  lambda-layer-rift-arn = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 # This module deploys a lambda function to suppress notification, generate metric images and create suppress api url.
@@ -202,6 +261,17 @@ module "create_lambda_to_suppress_alarm_or_generate_metric_images" {
   outcome-of-this-fn-for-next-trigger                               = var.outcome-to-trigger-downstream-send-alarm-notification-fns
   notification-of-this-fn-for-next-trigger                          = var.notification-from-suppress-notification-or-generate-metric-images-fn
   logs-retention-days          = var.logs-retention-period
+  metric-image-cache-window-seconds  = var.metric-image-cache-window-seconds
+  metric-image-cache-max-age-seconds = var.metric-image-cache-max-age-seconds
+  processes-image-top-k              = var.processes-image-top-k
+  signing-credentials-ttl-seconds    = var.signing-credentials-ttl-seconds
+  notification-mode                  = var.notification-mode
+  digest-window-seconds              = var.digest-window-seconds
+  digest-top-images                  = var.digest-top-images
+  notification-cooldown-seconds      = var.notification-cooldown-seconds
+  lambda-layer-rift-arn                                             = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
 
 #This module deploys the SNS topic to triggers the downstream logic to create or update alarms for existing ec2.
@@ -223,4 +293,19 @@ module "create_lambda_and_event_rule_to_create_or_update_alarms_for_existing_ec2
   update-operation                               = var.operation-type-to-update-alarm
   create-operation                               = var.operation-type-to-create-alarm
   name-of-fn-which-is-invoked-by-this-event-rule = module.create_lambda_for_cpu_credit_alarm.function_name
+  publish-workers                                = var.maintenance-publish-workers
+  maintenance-mode                               = var.maintenance-mode
+  alarm-writer-workers                           = var.maintenance-alarm-writer-workers
+  alarm-writes-per-second                        = var.maintenance-alarm-writes-per-second
+  sns-topic-which-receive-notification-from-composite-alarm = module.sns_topic_for_composite_alarm_action.sns_topic_arn
+  threshold                                      = module.ssm_parameters_for_alarm_configuration.threshold_param_name
+  period                                         = module.ssm_parameters_for_alarm_configuration.period_param_name
+  datapoints                                     = module.ssm_parameters_for_alarm_configuration.datapoints_param_name
+  evaluation-periods                             = module.ssm_parameters_for_alarm_configuration.evaluation_period_param_name
+  additional-datapoints                          = 6
+  additional-evaluation-periods                  = 6
+  compute-intensive-workloads-regix-list         = var.compute-intensive-workloads-regix-list
+  lambda-layer-rift-arn                          = module.aws_lamda_power_tools_layer_for_automated_cpu_credit_alarms.rift_layer_arn
+  api-metrics           = var.api-metrics
+  deployment-id         = var.deployment-id
 }
@@ -58,6 +58,7 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "check_composite_alarm_lambda_function" {
   function_name    = local.name-prefix
   description      = "This lambda to check if a composite already exists. It is triggered from the event bus rule."
+  layers           = [var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
@@ -71,6 +72,8 @@ resource "aws_lambda_function" "check_composite_alarm_lambda_function" {
       FN_OUTCOME                         = var.outcome-of-this-fn-for-next-trigger
       NOTIFICATION_FROM_FN               = var.notification-of-this-fn-for-next-trigger
       DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME = var.ec2-event-bus-name
+      API_METRICS                        = var.api-metrics
+      DEPLOYMENT_ID                      = var.deployment-id
     }
   }
 
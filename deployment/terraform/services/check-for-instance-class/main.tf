@@ -7,8 +7,16 @@ data "aws_iam_policy_document" "iam_resource_policy_for_lambda" {
       "logs:CreateLogGroup",
       "logs:CreateLogStream",
       "logs:PutLogEvents",
+      "sqs:ReceiveMessage",
+      "sqs:DeleteMessage",
+      "sqs:GetQueueAttributes",
       "ec2:DescribeInstances",
-      "events:PutEvents"
+      "events:PutEvents",
+      "cloudwatch:DescribeAlarms",
+      "cloudwatch:PutMetricAlarm",
+      "cloudwatch:PutCompositeAlarm",
+      "cloudwatch:TagResource",
+      "ssm:GetParameters"
     ]
 
     resources = [
@@ -56,18 +64,31 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "check_instance_class_lambda_function" {
   function_name    = local.name-prefix
   description      = "This lambda program checks if the instance is of T class or not. It is triggered from eventbridge."
+  layers           = [var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
   handler          = "lambda_function.lambda_handler"
   runtime          = "python3.8"
-  timeout          = "5"
-  memory_size      = "128"
+  timeout          = var.onboarding-mode == "fused" ? "300" : "30"
+  memory_size      = var.onboarding-mode == "fused" ? "256" : "128"
   environment {
     variables = {
-      FN_OUTCOME                         = var.outcome-of-this-fn-for-next-trigger
-      NOTIFICATION_FROM_FN               = var.notification-of-this-fn-for-next-trigger
-      DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME = var.ec2-event-bus-name
+      FN_OUTCOME                             = var.outcome-of-this-fn-for-next-trigger
+      NOTIFICATION_FROM_FN                   = var.notification-of-this-fn-for-next-trigger
+      DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME     = var.ec2-event-bus-name
+      ONBOARDING_MODE                        = var.onboarding-mode
+      ONBOARDED_FN_OUTCOME                   = var.outcome-of-this-fn-when-instance-is-onboarded
+      ACTION                                 = var.sns-topic-which-receive-notification-from-composite-alarm
+      DATAPOINTS                             = var.datapoints
+      EVALUATION_PERIODS                     = var.evaluation-periods
+      PERIOD                                 = var.period
+      THRESHOLD                              = var.threshold
+      ADDITIONAL_DATAPOINTS                  = var.additional-datapoints
+      ADDITIONAL_EVALUATION_PERIODS          = var.additional-evaluation-periods
+      COMPUTE_INTENSIVE_WORKLOADS_REGIX_LIST = var.compute-intensive-workloads-regix-list
+      API_METRICS                            = var.api-metrics
+      DEPLOYMENT_ID                          = var.deployment-id
     }
   }
 
@@ -95,6 +116,7 @@ EOF
 }
 
 resource "aws_cloudwatch_event_target" "check_instance_class_rule_target" {
+  count = var.intake-mode == "batch" ? 0 : 1
   rule = aws_cloudwatch_event_rule.check_instance_class_event_rule.name
   arn  = aws_lambda_function.check_instance_class_lambda_function.arn
 }
@@ -18,3 +18,67 @@ variable "logs-retention-days" {
   
 }
 
+
+variable "onboarding-mode" {
+  description = "chain to create the alarms through the downstream functions or fused to create them in this function."
+}
+
+variable "outcome-of-this-fn-when-instance-is-onboarded" {
+
+}
+
+variable "sns-topic-which-receive-notification-from-composite-alarm" {
+
+}
+
+variable "period" {
+  description = "Metric evaluation period"
+}
+
+variable "datapoints" {
+  description = "Datapoints to trigger alarm"
+}
+
+variable "evaluation-periods" {
+  description = "Number of evalaution periods"
+}
+
+variable "threshold" {
+  description = "Threshold to breach for alarm to trigger"
+}
+
+variable "additional-datapoints" {
+  description = "Datapoints to trigger alarm for cpu intensive applications."
+}
+
+variable "additional-evaluation-periods" {
+  description = "Number of evalaution periods for cpu intensive applications."
+}
+
+variable "compute-intensive-workloads-regix-list" {
+  description = "list of regix pattern of compute intensive workloads."
+}
+
+variable "intake-mode" {
+  description = "direct to invoke the function for each state change notification or batch to buffer the notifications in a queue."
+}
+
+variable "batch-size" {
+  description = "Maximum number of state change notifications processed in one invocation in the batch intake mode."
+}
+
+variable "maximum-batching-window-in-seconds" {
+  description = "Maximum time to gather notifications before invoking the function in the batch intake mode."
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
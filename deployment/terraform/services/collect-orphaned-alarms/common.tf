@@ -0,0 +1,6 @@
+locals {
+  name-prefix = var.resource-id
+}
+data "aws_caller_identity" "current" {}
+
+data "aws_region" "current" {}
\ No newline at end of file
@@ -0,0 +1,102 @@
+data "aws_iam_policy_document" "iam_resource_policy_for_lambda" {
+  statement {
+    effect = "Allow"
+
+    actions = [
+      "logs:CreateLogGroup",
+      "logs:CreateLogStream",
+      "logs:PutLogEvents",
+      "cloudwatch:DescribeAlarms",
+      "cloudwatch:DeleteAlarms",
+      "ec2:DescribeInstances"
+    ]
+
+    resources = [
+      "*",
+    ]
+  }
+}
+
+data "aws_iam_policy_document" "iam_trust_policy_for_lambda" {
+  statement {
+    actions = ["sts:AssumeRole"]
+
+    principals {
+      type        = "Service"
+      identifiers = ["lambda.amazonaws.com"]
+    }
+  }
+}
+
+resource "aws_iam_policy" "iam_policy_for_lambda" {
+  name        = local.name-prefix
+  description = local.name-prefix
+  path        = "/"
+  policy      = data.aws_iam_policy_document.iam_resource_policy_for_lambda.json
+}
+
+resource "aws_iam_role" "iam_role_for_lambda" {
+  name               = local.name-prefix
+  description        = local.name-prefix
+  path               = "/"
+  assume_role_policy = data.aws_iam_policy_document.iam_trust_policy_for_lambda.json
+}
+
+resource "aws_iam_role_policy_attachment" "iam_role_policy_attachment1" {
+  role       = aws_iam_role.iam_role_for_lambda.name
+  policy_arn = aws_iam_policy.iam_policy_for_lambda.arn
+}
+
+data "archive_file" "lambda_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/src"
+  output_path = "${path.module}/dist/lambda.zip"
+}
+
+resource "aws_lambda_function" "collect_orphaned_alarms_lambda_function" {
+  function_name    = local.name-prefix
+  description      = "This lambda program deletes the alarms of instances which are terminated or changed their instance type. It is triggered by a schedule."
+  layers           = [var.lambda-layer-rift-arn]
+  filename         = data.archive_file.lambda_zip.output_path
+  source_code_hash = data.archive_file.lambda_zip.output_base64sha256
+  role             = aws_iam_role.iam_role_for_lambda.arn
+  handler          = "lambda_function.lambda_handler"
+  runtime          = "python3.8"
+  timeout          = "300"
+  memory_size      = "256"
+
+  environment {
+    variables = {
+      API_METRICS   = var.api-metrics
+      DEPLOYMENT_ID = var.deployment-id
+    }
+  }
+
+}
+resource "aws_cloudwatch_log_group" "cloudwatch_log_group" {
+  name              = "/aws/lambda/${aws_lambda_function.collect_orphaned_alarms_lambda_function.function_name}"
+  retention_in_days = var.logs-retention-days
+}
+
+resource "aws_cloudwatch_event_rule" "collect_orphaned_alarms_event_rule" {
+  name                = local.name-prefix
+  description         = "Collect orphaned alarms."
+  schedule_expression = var.schedule-expression
+}
+
+resource "aws_cloudwatch_event_target" "collect_orphaned_alarms_rule_target" {
+  rule = aws_cloudwatch_event_rule.collect_orphaned_alarms_event_rule.name
+  arn  = aws_lambda_function.collect_orphaned_alarms_lambda_function.arn
+}
+
+resource "aws_lambda_permission" "lambda_permission_for_lambda" {
+  statement_id  = "${local.name-prefix}-lambda-exec"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.collect_orphaned_alarms_lambda_function.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.collect_orphaned_alarms_event_rule.arn
+}
+
+output "function_name" {
+  value = aws_lambda_function.collect_orphaned_alarms_lambda_function.function_name
+}
@@ -0,0 +1,23 @@
+variable "resource-id" {
+  description = "Name of the functionality/application"
+}
+
+variable "logs-retention-days" {
+  
+}
+
+variable "schedule-expression" {
+  description = "Schedule of the collection of orphaned alarms."
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
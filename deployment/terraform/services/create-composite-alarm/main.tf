@@ -57,6 +57,7 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "create_cpu_credit_composite_alarm_lambda_function" {
   function_name    = local.name-prefix
   description      = "This lambda program creates composite alarm for cpu credits balance and cpu utlization."
+  layers           = [var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
@@ -67,7 +68,9 @@ resource "aws_lambda_function" "create_cpu_credit_composite_alarm_lambda_functio
 
   environment {
     variables = {
-      ACTION = var.sns-topic-which-receive-notification-from-this-alarm
+      ACTION        = var.sns-topic-which-receive-notification-from-this-alarm
+      API_METRICS   = var.api-metrics
+      DEPLOYMENT_ID = var.deployment-id
     }
   }
 }
@@ -56,4 +56,16 @@ variable "notification-of-this-fn-for-next-trigger" {
 
 variable "logs-retention-days" {
   
-}
\ No newline at end of file
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
@@ -8,7 +8,13 @@ data "aws_iam_policy_document" "iam_resource_policy_for_lambda" {
       "logs:CreateLogStream",
       "logs:PutLogEvents",
       "ec2:DescribeInstances",
-      "events:PutEvents"
+      "events:PutEvents",
+      "cloudwatch:DescribeAlarms",
+      "cloudwatch:PutMetricAlarm",
+      "cloudwatch:PutCompositeAlarm",
+      "cloudwatch:DeleteAlarms",
+      "cloudwatch:TagResource",
+      "ssm:GetParameters"
     ]
 
     resources = [
@@ -56,20 +62,35 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "create_or_update_alarms_lambda_function" {
   function_name    = var.resource-id
   description      = "The lambda puts events to update confirm of existing alarms or create alarms for existing instances. "
+  layers           = [var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
   handler          = "lambda_function.lambda_handler"
   runtime          = "python3.8"
-  timeout          = "5"
-  memory_size      = "128"
+  timeout          = "900"
+  memory_size      = "256"
   environment {
     variables = {
+      PUBLISH_WORKERS                                   = var.publish-workers
+      MAINTENANCE_MODE                                  = var.maintenance-mode
+      ALARM_WRITER_WORKERS                              = var.alarm-writer-workers
+      ALARM_WRITES_PER_SECOND                           = var.alarm-writes-per-second
       UPDATE_ALARMS_CONFIG_NOTIFICATION                 = var.update-alarm-notification
       CREATE_ALARMS_FOR_EXISTING_INSTANCES_NOTIFICATION = var.create-alarm-notification
       UPDATE_ALARMS_OPERATION_TYPE                      = var.update-operation
       CREATE_ALARMS_OPERATION_TYPE                      = var.create-operation
       DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME                = var.ec2-event-bus-name
+      ACTION                                            = var.sns-topic-which-receive-notification-from-composite-alarm
+      THRESHOLD                                         = var.threshold
+      PERIOD                                            = var.period
+      DATAPOINTS                                        = var.datapoints
+      EVALUATION_PERIODS                                = var.evaluation-periods
+      ADDITIONAL_DATAPOINTS                             = var.additional-datapoints
+      ADDITIONAL_EVALUATION_PERIODS                     = var.additional-evaluation-periods
+      COMPUTE_INTENSIVE_WORKLOADS_REGIX_LIST            = var.compute-intensive-workloads-regix-list
+      API_METRICS                                       = var.api-metrics
+      DEPLOYMENT_ID                                     = var.deployment-id
     }
   }
 
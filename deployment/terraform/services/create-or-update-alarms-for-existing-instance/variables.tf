@@ -37,4 +37,64 @@ variable "sns-topic-which-invoke-this-fn" {
 
 variable "name-of-fn-which-is-invoked-by-this-event-rule" {
 
-}
\ No newline at end of file
+}
+
+variable "publish-workers" {
+  description = "Number of PutEvents calls sent in parallel while publishing events for the existing instances."
+}
+
+variable "sns-topic-which-receive-notification-from-composite-alarm" {
+  description = "Action of the composite alarms which are reconciled."
+}
+
+variable "threshold" {
+  description = "Name of the parameter of the number of CPU credits used per vCPU-hour."
+}
+
+variable "period" {
+  description = "Name of the parameter of the period of evaluation for each datapoint."
+}
+
+variable "datapoints" {
+  description = "Name of the parameter of the number of datapoints to evaluate."
+}
+
+variable "evaluation-periods" {
+  description = "Name of the parameter of the number of evaluation periods."
+}
+
+variable "additional-datapoints" {
+  description = "Datapoints to trigger alarm for cpu intensive applications."
+}
+
+variable "additional-evaluation-periods" {
+  description = "Number of evalaution periods for cpu intensive applications."
+}
+
+variable "compute-intensive-workloads-regix-list" {
+  description = "list of regix pattern of compute intensive workloads."
+}
+
+variable "maintenance-mode" {
+  description = "events to publish an event per instance for the create alarm functions or direct to write the alarms from this function."
+}
+
+variable "alarm-writer-workers" {
+  description = "Number of threads writing alarms in the direct maintenance mode and when alarms are reconciled."
+}
+
+variable "alarm-writes-per-second" {
+  description = "Maximum number of PutMetricAlarm and PutCompositeAlarm calls per second."
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
@@ -58,7 +58,7 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "post_alarm_notification_state_to_email_lambda_function" {
   function_name    = local.name-prefix
   description      = "This program checks if an instance is tagged to suppress cpu credit alarm. Notification is not sent to the SNS topic if the instance is tagged as SuppressCpuCreditAlarm=True."
-  layers           = [var.lambda-layer-aws-powertools-and-more-arn]
+  layers           = [var.lambda-layer-aws-powertools-and-more-arn, var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
@@ -70,6 +70,8 @@ resource "aws_lambda_function" "post_alarm_notification_state_to_email_lambda_fu
   environment {
     variables = {
       END_SUBSCRIBERS_SNS_TOPIC = var.sns-topic-to-which-this-function-publish-notification
+      API_METRICS               = var.api-metrics
+      DEPLOYMENT_ID             = var.deployment-id
     }
   }
 
@@ -79,13 +81,16 @@ resource "aws_cloudwatch_log_group" "cloudwatch_log_group" {
   retention_in_days = var.logs-retention-days
 }
 
+# The MS teams function sends the email in the combined notification delivery.
 resource "aws_cloudwatch_event_target" "post_alarm_notification_state_to_email_rule_target" {
+  count          = var.notification-delivery == "combined" ? 0 : 1
   event_bus_name = var.ec2-event-bus-name
   rule           = var.event-rule-name-which-trigger-this-fn
   arn            = aws_lambda_function.post_alarm_notification_state_to_email_lambda_function.arn
 }
 
 resource "aws_lambda_permission" "lambda_permission_for_lambda" {
+  count         = var.notification-delivery == "combined" ? 0 : 1
   statement_id  = "${local.name-prefix}-lambda-exec"
   action        = "lambda:InvokeFunction"
   function_name = aws_lambda_function.post_alarm_notification_state_to_email_lambda_function.function_name
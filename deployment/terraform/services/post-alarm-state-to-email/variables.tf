@@ -24,4 +24,20 @@ variable "ec2-event-bus-name" {
 
 variable "logs-retention-days" {
   
-}
\ No newline at end of file
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "notification-delivery" {
+  description = "separate to send the email from this function or combined to send it from the MS teams function."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
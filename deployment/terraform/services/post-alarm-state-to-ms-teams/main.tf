@@ -15,7 +15,8 @@ data "aws_iam_policy_document" "iam_resource_policy_for_lambda" {
       "cloudwatch:ListMetrics",
       "s3:PutObject",
       "ec2:DescribeImages",
-      "secretsmanager:GetSecretValue"
+      "secretsmanager:GetSecretValue",
+      "ssm:GetParameters"
     ]
 
     resources = [
@@ -63,18 +64,24 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "post_alarm_notification_state_to_ms_teams_lambda_function" {
   function_name    = local.name-prefix
   description      = "This lambda function sends alarm state change notifications to MS Teams channel if the alarm notification is not required to be suppressed."
-  layers           = [var.lambda-layer-aws-powertools-and-more-arn]
+  layers           = [var.lambda-layer-aws-powertools-and-more-arn, var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
   handler          = "lambda_function.lambda_handler"
   runtime          = "python3.8"
-  timeout          = "5"
+  timeout          = "30"
   memory_size      = "128"
 
   environment {
     variables = {
-      MS_TEAMS_WEB_HOOK_URL = var.ms-teams-web-hook-url
+      MS_TEAMS_WEB_HOOK_URL     = var.ms-teams-web-hook-url
+      DELIVER_EMAIL             = var.notification-delivery == "combined" ? "true" : "false"
+      END_SUBSCRIBERS_SNS_TOPIC = var.sns-topic-to-which-this-function-publish-notification
+      WEBHOOK_DEADLINE_SECONDS  = 20
+      WEBHOOK_MAX_ATTEMPTS      = var.webhook-max-attempts
+      API_METRICS               = var.api-metrics
+      DEPLOYMENT_ID             = var.deployment-id
     }
   }
 
@@ -23,4 +23,28 @@ variable "ec2-event-bus-name" {
 
 variable "logs-retention-days" {
   
-}
\ No newline at end of file
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "notification-delivery" {
+  description = "separate to send only the MS teams card from this function or combined to send the email concurrently with it."
+}
+
+variable "sns-topic-to-which-this-function-publish-notification" {
+  description = "The SNS topic to send emails to the users in the combined notification delivery."
+}
+
+variable "webhook-max-attempts" {
+  description = "Number of times a card is posted to the webhook when it throttles or fails."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
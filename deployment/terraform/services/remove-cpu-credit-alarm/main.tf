@@ -7,6 +7,9 @@ data "aws_iam_policy_document" "iam_resource_policy_for_lambda" {
       "logs:CreateLogGroup",
       "logs:CreateLogStream",
       "logs:PutLogEvents",
+      "sqs:ReceiveMessage",
+      "sqs:DeleteMessage",
+      "sqs:GetQueueAttributes",
       "cloudwatch:DeleteAlarms",
       "ec2:DescribeInstances",
       "cloudwatch:DescribeAlarmsForMetric",
@@ -58,14 +61,22 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "remove_alarms_lambda_function" {
   function_name    = local.name-prefix
   description      = "This lambda program deletes all alarms for instance. It is triggered from the CloudWatch, based on instance state change notification events."
+  layers           = [var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
   handler          = "lambda_function.lambda_handler"
   runtime          = "python3.8"
-  timeout          = "5"
+  timeout          = "30"
   memory_size      = "128"
 
+  environment {
+    variables = {
+      API_METRICS   = var.api-metrics
+      DEPLOYMENT_ID = var.deployment-id
+    }
+  }
+
 }
 resource "aws_cloudwatch_log_group" "cloudwatch_log_group" {
   name              = "/aws/lambda/${aws_lambda_function.remove_alarms_lambda_function.function_name}"
@@ -88,6 +99,7 @@ EOF
 }
 
 resource "aws_cloudwatch_event_target" "remove_alarms_rule_target" {
+  count = var.intake-mode == "batch" ? 0 : 1
   rule = aws_cloudwatch_event_rule.remove_alarms_event_rule.name
   arn  = aws_lambda_function.remove_alarms_lambda_function.arn
 }
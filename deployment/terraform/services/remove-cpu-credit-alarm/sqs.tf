@@ -0,0 +1,49 @@
+# In the batched intake mode the state change notifications are buffered in a queue
+# and the function processes up to batch-size instances per invocation.
+resource "aws_sqs_queue" "state_change_notifications_queue" {
+  count                      = var.intake-mode == "batch" ? 1 : 0
+  name                       = local.name-prefix
+  visibility_timeout_seconds = 180
+}
+
+data "aws_iam_policy_document" "state_change_notifications_queue_policy" {
+  count = var.intake-mode == "batch" ? 1 : 0
+  statement {
+    effect  = "Allow"
+    actions = ["sqs:SendMessage"]
+
+    principals {
+      type        = "Service"
+      identifiers = ["events.amazonaws.com"]
+    }
+
+    resources = [aws_sqs_queue.state_change_notifications_queue[0].arn]
+
+    condition {
+      test     = "ArnEquals"
+      variable = "aws:SourceArn"
+      values   = [aws_cloudwatch_event_rule.remove_alarms_event_rule.arn]
+    }
+  }
+}
+
+resource "aws_sqs_queue_policy" "state_change_notifications_queue_policy" {
+  count     = var.intake-mode == "batch" ? 1 : 0
+  queue_url = aws_sqs_queue.state_change_notifications_queue[0].id
+  policy    = data.aws_iam_policy_document.state_change_notifications_queue_policy[0].json
+}
+
+resource "aws_cloudwatch_event_target" "remove_alarms_queue_target" {
+  count = var.intake-mode == "batch" ? 1 : 0
+  rule  = aws_cloudwatch_event_rule.remove_alarms_event_rule.name
+  arn   = aws_sqs_queue.state_change_notifications_queue[0].arn
+}
+
+resource "aws_lambda_event_source_mapping" "state_change_notifications_queue_mapping" {
+  count                              = var.intake-mode == "batch" ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.state_change_notifications_queue[0].arn
+  function_name                      = aws_lambda_function.remove_alarms_lambda_function.arn
+  batch_size                         = var.batch-size
+  maximum_batching_window_in_seconds = var.maximum-batching-window-in-seconds
+  function_response_types            = ["ReportBatchItemFailures"]
+}
@@ -5,4 +5,28 @@ variable "resource-id" {
 
 variable "logs-retention-days" {
   
-}
\ No newline at end of file
+}
+
+variable "intake-mode" {
+  description = "direct to invoke the function for each state change notification or batch to buffer the notifications in a queue."
+}
+
+variable "batch-size" {
+  description = "Maximum number of state change notifications processed in one invocation in the batch intake mode."
+}
+
+variable "maximum-batching-window-in-seconds" {
+  description = "Maximum time to gather notifications before invoking the function in the batch intake mode."
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
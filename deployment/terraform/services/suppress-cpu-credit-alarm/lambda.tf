@@ -58,6 +58,7 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "suppress_cpu_alarm_lambda_function" {
   function_name    = local.name-prefix
   description      = "This program tags an instance as SuppressCpuCreditAlarm=true."
+  layers           = [var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
@@ -70,6 +71,8 @@ resource "aws_lambda_function" "suppress_cpu_alarm_lambda_function" {
     variables = {
       SUPPRESS_TAG_NAME  = var.suppress-tag-name
       SUPPRESS_TAG_VALUE = var.suppress-tag-value
+      API_METRICS        = var.api-metrics
+      DEPLOYMENT_ID      = var.deployment-id
     }
   }
 
@@ -9,12 +9,18 @@ data "aws_iam_policy_document" "iam_resource_policy_for_lambda" {
       "logs:PutLogEvents",
       "ec2:DescribeInstances",
       "events:PutEvents",
+      "cloudwatch:DescribeAlarms",
       "cloudwatch:DescribeAlarmHistory",
       "cloudwatch:GetMetricWidgetImage",
       "cloudwatch:ListMetrics",
+      "cloudwatch:GetMetricData",
       "s3:PutObject",
+      "s3:GetObject",
       "ec2:DescribeImages",
-      "secretsmanager:GetSecretValue"
+      "secretsmanager:GetSecretValue",
+      "sqs:ReceiveMessage",
+      "sqs:DeleteMessage",
+      "sqs:GetQueueAttributes"
     ]
 
     resources = [
@@ -62,15 +68,16 @@ data "archive_file" "lambda_zip" {
 resource "aws_lambda_function" "generate_metric_images_lambda_function" {
   function_name    = local.name-prefix
   description      = "This lambda function generate images of the metric which are part of the alarm. "
-  layers           = [var.lambda-layer-aws-powertools-and-more-arn]
+  layers           = [var.lambda-layer-aws-powertools-and-more-arn, var.lambda-layer-rift-arn]
   filename         = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   role             = aws_iam_role.iam_role_for_lambda.arn
   handler          = "lambda_function.lambda_handler"
   runtime          = "python3.8"
-  timeout          = "5"
-  memory_size      = "128"
-  #reserved_concurrent_executions = 1
+  timeout          = var.notification-mode == "digest" ? "60" : "15"
+  memory_size      = "256"
+  # One execution environment processes the digests so it holds the notification cooldown of all the alarms.
+  reserved_concurrent_executions = var.notification-mode == "digest" ? 1 : -1
 
   environment {
     variables = {
@@ -82,7 +89,18 @@ resource "aws_lambda_function" "generate_metric_images_lambda_function" {
       FN_OUTCOME                          = var.outcome-of-this-fn-for-next-trigger
       NOTIFICATION_FROM_FN                = var.notification-of-this-fn-for-next-trigger
       DYNAMIC_EC2_MONITOR_EVENT_BUS_NAME  = var.ec2-event-bus-name
+      # Keep the cached tags fresh as the suppress tag is read from them.
+      INSTANCE_CACHE_TTL_SECONDS          = 60
       SUPPRESS_TAG_NAME                   = var.suppress-tag-name
+      METRIC_IMAGE_DEADLINE_SECONDS       = 8
+      PROCESSES_IMAGE_TOP_K               = var.processes-image-top-k
+      METRIC_IMAGE_CACHE_WINDOW_SECONDS   = var.metric-image-cache-window-seconds
+      METRIC_IMAGE_CACHE_MAX_AGE_SECONDS  = var.metric-image-cache-max-age-seconds
+      SIGNING_CREDENTIALS_TTL_SECONDS     = var.signing-credentials-ttl-seconds
+      DIGEST_TOP_IMAGES                   = var.digest-top-images
+      NOTIFICATION_COOLDOWN_SECONDS       = var.notification-cooldown-seconds
+      API_METRICS                         = var.api-metrics
+      DEPLOYMENT_ID                       = var.deployment-id
     }
   }
 }
@@ -94,6 +112,7 @@ resource "aws_cloudwatch_log_group" "cloudwatch_log_group" {
 
 
 resource "aws_lambda_permission" "lambda_permission_for_lambda" {
+  count         = var.notification-mode == "digest" ? 0 : 1
   statement_id  = "${local.name-prefix}-lambda-exec"
   action        = "lambda:InvokeFunction"
   function_name = aws_lambda_function.generate_metric_images_lambda_function.function_name
@@ -103,6 +122,7 @@ resource "aws_lambda_permission" "lambda_permission_for_lambda" {
 
 #Subscribe to SNS topic which trigger the lambda function.
 resource "aws_sns_topic_subscription" "send_notification_to_lambda" {
+  count     = var.notification-mode == "digest" ? 0 : 1
   topic_arn = var.sns-topic-which-invoke-this-function
   protocol  = "lambda"
   endpoint  = aws_lambda_function.generate_metric_images_lambda_function.arn
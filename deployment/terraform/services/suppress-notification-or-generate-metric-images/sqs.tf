@@ -0,0 +1,50 @@
+# In the digest notification mode the alarm notifications are buffered in a queue for the digest window
+# and the function sends one digest per application for all the alarms of the window.
+resource "aws_sqs_queue" "alarm_notifications_queue" {
+  count                      = var.notification-mode == "digest" ? 1 : 0
+  name                       = local.name-prefix
+  visibility_timeout_seconds = 360
+}
+
+data "aws_iam_policy_document" "alarm_notifications_queue_policy" {
+  count = var.notification-mode == "digest" ? 1 : 0
+  statement {
+    effect  = "Allow"
+    actions = ["sqs:SendMessage"]
+
+    principals {
+      type        = "Service"
+      identifiers = ["sns.amazonaws.com"]
+    }
+
+    resources = [aws_sqs_queue.alarm_notifications_queue[0].arn]
+
+    condition {
+      test     = "ArnEquals"
+      variable = "aws:SourceArn"
+      values   = [var.sns-topic-which-invoke-this-function]
+    }
+  }
+}
+
+resource "aws_sqs_queue_policy" "alarm_notifications_queue_policy" {
+  count     = var.notification-mode == "digest" ? 1 : 0
+  queue_url = aws_sqs_queue.alarm_notifications_queue[0].id
+  policy    = data.aws_iam_policy_document.alarm_notifications_queue_policy[0].json
+}
+
+resource "aws_sns_topic_subscription" "send_notification_to_queue" {
+  count     = var.notification-mode == "digest" ? 1 : 0
+  topic_arn = var.sns-topic-which-invoke-this-function
+  protocol  = "sqs"
+  endpoint  = aws_sqs_queue.alarm_notifications_queue[0].arn
+}
+
+resource "aws_lambda_event_source_mapping" "alarm_notifications_queue_mapping" {
+  count                              = var.notification-mode == "digest" ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.alarm_notifications_queue[0].arn
+  function_name                      = aws_lambda_function.generate_metric_images_lambda_function.arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = var.digest-window-seconds
+  function_response_types            = ["ReportBatchItemFailures"]
+}
@@ -49,4 +49,48 @@ variable "suppress-tag-name" {
 
 variable "logs-retention-days" {
     
-}
\ No newline at end of file
+}
+
+variable "metric-image-cache-window-seconds" {
+  description = "Alarms of the same instance within this window reuse the same metric images."
+}
+
+variable "metric-image-cache-max-age-seconds" {
+  description = "Maximum age of a metric image in the bucket to be reused."
+}
+
+variable "processes-image-top-k" {
+  description = "Number of processes with the highest cpu usage shown in the processes metric image."
+}
+
+variable "signing-credentials-ttl-seconds" {
+  description = "Seconds the credentials which sign the suppress api url are cached before they are read again."
+}
+
+variable "lambda-layer-rift-arn" {
+  description = "ARN of the layer with the rift package and the util modules shared by the functions."
+}
+
+variable "notification-mode" {
+  description = "single to notify each alarm as it happens or digest to send one notification per application for the alarms of the digest window."
+}
+
+variable "digest-window-seconds" {
+  description = "Time the alarm notifications are buffered before a digest is sent in the digest notification mode."
+}
+
+variable "digest-top-images" {
+  description = "Number of alarms of a digest, the earliest ones, for which metric images are generated."
+}
+
+variable "notification-cooldown-seconds" {
+  description = "A repeat notification of an alarm in the same state within this time is dropped in the digest notification mode."
+}
+
+variable "deployment-id" {
+  description = "Logical name of the deployment, the API call metrics are tagged with it."
+}
+
+variable "api-metrics" {
+  description = "true to record the AWS API calls of the function and emit them as metrics per operation."
+}
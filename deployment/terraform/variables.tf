@@ -28,6 +28,10 @@ variable "remove-alarms-fn" {
   default = "remove-cpu-credits-balance-alarm"
 }
 
+variable "collect-orphaned-alarms-fn" {
+  default = "collect-orphaned-cpu-credit-alarms"
+}
+
 variable "check-composite-alarm-fn" {
   default = "check-for-cpu-credit-composite-alarm"
 }
@@ -131,6 +135,30 @@ variable "outcome-to-trigger-check-composite-alarm-fn" {
   default = "Instance Is Of Burstable Class"
 }
 
+variable "onboarding-mode" {
+  default     = "chain"
+  description = "chain creates the alarms through the EventBridge chain of functions. fused creates all the alarms in the check-for-instance-class function."
+}
+
+variable "intake-mode" {
+  default     = "direct"
+  description = "direct invokes the check-for-instance-class and remove-alarms functions per state change notification. batch buffers the notifications in a queue and processes them in batches."
+}
+
+variable "intake-batch-size" {
+  default     = 50
+  description = "Maximum number of state change notifications processed in one invocation in the batch intake mode."
+}
+
+variable "intake-maximum-batching-window-in-seconds" {
+  default     = 10
+  description = "Maximum time to gather state change notifications before invoking the function in the batch intake mode."
+}
+
+variable "outcome-when-instance-is-onboarded" {
+  default = "Instance Is Onboarded. CPU-Credit, CPU-Utilization And Composite Alarms Exist."
+}
+
 variable "notification-from-check-instance-class-fn" {
   default = "Checked Instance Class Function Notification"
 }
@@ -191,3 +219,82 @@ variable "operation-type-to-update-alarm" {
   default = "ec2-update-alarm"
 }
 
+variable "maintenance-publish-workers" {
+  default     = 8
+  description = "Number of PutEvents calls sent in parallel when alarms of the existing instances are created or updated."
+}
+
+variable "maintenance-mode" {
+  default     = "events"
+  description = "events fans the create and update maintenance operations out to the create alarm functions, one event per instance. direct writes the alarms from the maintenance function."
+}
+
+variable "maintenance-alarm-writer-workers" {
+  default     = 8
+  description = "Number of threads writing alarms in the direct maintenance mode and when alarms are reconciled."
+}
+
+variable "maintenance-alarm-writes-per-second" {
+  default     = 10
+  description = "Maximum number of PutMetricAlarm and PutCompositeAlarm calls per second of the maintenance function. Set it to the CloudWatch quota of the account."
+}
+
+variable "orphaned-alarms-collection-schedule" {
+  default     = "rate(1 day)"
+  description = "Schedule expression of the function which deletes the alarms of terminated or resized instances."
+}
+
+variable "metric-image-cache-window-seconds" {
+  default     = 300
+  description = "Notifications of a flapping composite alarm within this window reuse the metric images already in the bucket."
+}
+
+variable "metric-image-cache-max-age-seconds" {
+  default     = 900
+  description = "Maximum age of a metric image in the bucket to be reused by a later notification."
+}
+
+variable "signing-credentials-ttl-seconds" {
+  default     = 300
+  description = "Seconds the credentials which sign the suppress api url are cached. A rotated secret is picked up after this time."
+}
+
+variable "processes-image-top-k" {
+  default     = 10
+  description = "Number of processes with the highest cpu usage in the alarm window shown in the processes metric image."
+}
+
+variable "notification-mode" {
+  default     = "single"
+  description = "single notifies each alarm as it happens. digest buffers the alarm notifications for the digest window and sends one notification per application, which keeps an alarm storm to a few messages."
+}
+
+variable "digest-window-seconds" {
+  default     = 60
+  description = "Time the alarm notifications are buffered before a digest is sent in the digest notification mode. At most 300 seconds."
+}
+
+variable "digest-top-images" {
+  default     = 3
+  description = "Number of alarms of a digest, the earliest ones, for which metric images are generated."
+}
+
+variable "notification-cooldown-seconds" {
+  default     = 900
+  description = "A repeat notification of an alarm in the same state within this time is dropped in the digest notification mode."
+}
+
+variable "notification-delivery" {
+  default     = "separate"
+  description = "separate sends the email and the MS teams card from two functions. combined sends both concurrently from the MS teams function."
+}
+
+variable "webhook-max-attempts" {
+  default     = 5
+  description = "Number of times a card is posted to the MS teams webhook when it throttles or fails. The Retry-After of the webhook is honoured."
+}
+
+variable "api-metrics" {
+  default     = "false"
+  description = "true to record the AWS API calls of the functions and emit the calls, retries, throttles, errors, request bytes and latency per operation as metrics."
+}